@@ -0,0 +1,212 @@
+# /home/marcos/projeto1/radio_player/audio/buffer_tuner.py
+"""
+Ajuste automático do cache de rede (network-caching) por estação.
+
+O RadioPlayer informa cada sessão de reprodução ao AdaptiveBufferController:
+início, primeiro áudio (estado Playing), quedas do buffer depois de já estar
+tocando (underruns) e fim. Ao final da sessão o controlador aumenta o cache das
+estações que travaram e reduz aos poucos o das que tocaram estáveis por algum
+tempo; o valor aprendido é usado na próxima vez que a estação for aberta e é
+lembrado entre execuções (buffer_tuning.json no diretório de dados do usuário).
+"""
+import json
+import logging
+import os
+import pathlib
+import time
+
+logger = logging.getLogger(__name__)
+
+# Arquivo (em USER_DATA_DIR) com os valores aprendidos
+BUFFER_TUNING_FILE_NAME = "buffer_tuning.json"
+# Limites do cache de rede ajustado, em milissegundos
+MIN_CACHING_MS = 100
+MAX_CACHING_MS = 15000
+# Multiplicador aplicado por sessão com travamentos (e teto do aumento por underrun)
+RAISE_FACTOR = 1.5
+MAX_RAISE_FACTOR = 3.0
+# Multiplicador aplicado após uma sessão estável
+LOWER_FACTOR = 0.85
+# Sessão sem travamentos por pelo menos este tempo (s) permite reduzir o cache
+STABLE_SESSION_SECONDS = 120
+# Máximo de estações lembradas (as usadas há mais tempo são descartadas)
+MAX_ENTRIES = 2000
+
+
+class StationBufferStats:
+    """Histórico de reprodução de uma estação e o cache de rede aprendido."""
+
+    __slots__ = ("base_ms", "caching_ms", "sessions", "underruns", "stable_sessions", "ttfa_ms", "last_used")
+
+    def __init__(self, base_ms: int, caching_ms: int | None = None, sessions: int = 0, underruns: int = 0,
+                 stable_sessions: int = 0, ttfa_ms: float | None = None, last_used: float = 0.0):
+        self.base_ms = base_ms # Cache do perfil quando o aprendizado começou
+        self.caching_ms = caching_ms if caching_ms is not None else base_ms
+        self.sessions = sessions
+        self.underruns = underruns # Total de quedas do buffer depois de começar a tocar
+        self.stable_sessions = stable_sessions
+        self.ttfa_ms = ttfa_ms # Tempo até o primeiro áudio (média móvel)
+        self.last_used = last_used # time.time()
+
+    def to_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StationBufferStats":
+        return cls(**{key: data[key] for key in cls.__slots__ if key in data})
+
+
+class AdaptiveBufferController:
+    """Aprende o cache de rede de cada estação a partir dos travamentos observados."""
+
+    def __init__(self, state_path=None, min_ms: int = MIN_CACHING_MS, max_ms: int = MAX_CACHING_MS,
+                 stable_seconds: float = STABLE_SESSION_SECONDS):
+        """
+        Args:
+            state_path: Arquivo onde os valores aprendidos são persistidos (None = não persiste).
+            min_ms: Menor cache de rede que o ajuste pode escolher.
+            max_ms: Maior cache de rede que o ajuste pode escolher.
+            stable_seconds: Duração mínima sem travamentos para reduzir o cache.
+        """
+        self.state_path = pathlib.Path(state_path) if state_path else None
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.stable_seconds = stable_seconds
+        self._stations: dict[str, StationBufferStats] = {} # URL -> histórico
+        self._dirty = False
+        # Sessão em andamento
+        self._url = None
+        self._started_at = 0.0
+        self._opened = False # Viu o Opening desta sessão (eventos da mídia anterior são ignorados)
+        self._playing_at = None # time.monotonic() do primeiro Playing
+        self._session_underruns = 0
+        self._underrun_armed = False # Buffer já chegou a 100% depois do Playing
+        self._in_underrun = False
+        self._load_state()
+
+    # --- Estado persistido ---
+
+    def _load_state(self):
+        if not self.state_path or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            for url, data in state.get("stations", {}).items():
+                self._stations[url] = StationBufferStats.from_dict(data)
+            logger.debug(f"Ajustes de buffer de {len(self._stations)} estação(ões) carregados de '{self.state_path}'.")
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Não foi possível ler '{self.state_path}': {e}")
+
+    def save(self):
+        """Grava os valores aprendidos, se algo mudou desde a última gravação."""
+        if not self.state_path or not self._dirty:
+            return
+        if len(self._stations) > MAX_ENTRIES:
+            by_use = sorted(self._stations, key=lambda url: self._stations[url].last_used)
+            for url in by_use[:len(self._stations) - MAX_ENTRIES]:
+                del self._stations[url]
+        state = {"stations": {url: stats.to_dict() for url, stats in self._stations.items()}}
+        tmp_path = self.state_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar os ajustes de buffer em '{self.state_path}': {e}")
+
+    # --- Consulta ---
+
+    def caching_for(self, url: str, base_ms: int) -> int:
+        """
+        Cache de rede (ms) a usar ao abrir 'url'. Sem histórico, ou se o perfil
+        da estação mudou desde o aprendizado, é o próprio 'base_ms' do perfil.
+        """
+        stats = self._stations.get(url)
+        if stats is None or stats.base_ms != base_ms:
+            return base_ms
+        return stats.caching_ms
+
+    def stats(self, url: str) -> StationBufferStats | None:
+        """Histórico da estação, se houver."""
+        return self._stations.get(url)
+
+    # --- Sessões (chamados na thread do Tkinter, via RadioPlayer.drain_events) ---
+
+    def start_session(self, url: str, base_ms: int, prebuffered: bool = False):
+        """
+        Começa a acompanhar a reprodução de 'url' (encerra a sessão anterior).
+        'prebuffered' indica um player pré-aquecido: já está aberto e o tempo
+        até o primeiro áudio não reflete o cache.
+        """
+        self.end_session()
+        stats = self._stations.get(url)
+        if stats is None or stats.base_ms != base_ms:
+            stats = self._stations[url] = StationBufferStats(base_ms)
+        stats.sessions += 1
+        stats.last_used = time.time()
+        self._dirty = True
+        self._url = url
+        self._started_at = time.monotonic()
+        self._opened = prebuffered
+        self._playing_at = self._started_at if prebuffered else None
+        self._session_underruns = 0
+        self._underrun_armed = False # Buffer já chegou a 100% depois do Playing
+        self._in_underrun = False
+
+    def on_opening(self):
+        if self._url:
+            self._opened = True
+
+    def on_playing(self):
+        """Primeiro áudio da sessão: registra o tempo de início."""
+        if not self._url or not self._opened or self._playing_at is not None:
+            return
+        self._playing_at = time.monotonic()
+        stats = self._stations[self._url]
+        ttfa_ms = (self._playing_at - self._started_at) * 1000
+        stats.ttfa_ms = ttfa_ms if stats.ttfa_ms is None else 0.7 * stats.ttfa_ms + 0.3 * ttfa_ms
+        logger.debug(f"Primeiro áudio de {self._url} em {ttfa_ms:.0f} ms (cache {stats.caching_ms} ms).")
+
+    def on_buffering(self, percent: float):
+        """
+        Progresso do buffer. Uma queda abaixo de 100% só conta como travamento
+        depois que o buffer encheu após o Playing: o libVLC 3 pode anunciar
+        Playing antes de terminar de encher o cache inicial.
+        """
+        if self._playing_at is None:
+            return
+        if not self._underrun_armed:
+            self._underrun_armed = percent >= 100
+            return
+        if percent < 100:
+            if not self._in_underrun:
+                self._in_underrun = True
+                self._session_underruns += 1
+                logger.debug(f"Buffer esvaziou durante a reprodução de {self._url} ({self._session_underruns}x).")
+        else:
+            self._in_underrun = False
+
+    def end_session(self, failed: bool = False):
+        """
+        Encerra a sessão em andamento e ajusta o cache da estação para a próxima vez.
+        'failed' indica erro de reprodução (não conta como sessão estável).
+        """
+        url, self._url = self._url, None
+        if url is None:
+            return
+        stats = self._stations[url]
+        played = 0.0 if self._playing_at is None else time.monotonic() - self._playing_at
+        previous = stats.caching_ms
+        if self._session_underruns:
+            stats.underruns += self._session_underruns
+            factor = min(MAX_RAISE_FACTOR, RAISE_FACTOR ** self._session_underruns)
+            stats.caching_ms = min(self.max_ms, int(stats.caching_ms * factor))
+        elif not failed and self._playing_at is not None and played >= self.stable_seconds:
+            stats.stable_sessions += 1
+            stats.caching_ms = max(self.min_ms, int(stats.caching_ms * LOWER_FACTOR))
+        if stats.caching_ms != previous:
+            logger.info(f"Cache de rede de {url} ajustado de {previous} para {stats.caching_ms} ms "
+                        f"({self._session_underruns} travamento(s) em {played:.0f} s).")
+            self.save() # Contadores sem mudança de cache são gravados no próximo ajuste ou ao sair
@@ -1,21 +1,112 @@
 import vlc
-import time
 import logging
+import queue
+import threading
+from collections import OrderedDict
+
+from radio_player.constants import BUFFER_PROFILES, DEFAULT_BUFFER_PROFILE
 
 # A configuração de logging é feita no ponto de entrada (main.py)
 logger = logging.getLogger(__name__)
 
+# Tipos de evento entregues por drain_events(): (geração, tipo, valor)
+EVENT_STATE = "state" # valor: vlc.State
+EVENT_BUFFERING = "buffering" # valor: porcentagem do buffer (float)
+EVENT_META = "meta" # valor: None (metadados da mídia mudaram; ver get_now_playing())
+
+# Eventos do libVLC observados -> estado correspondente
+_STATE_EVENTS = {
+    "MediaPlayerOpening": vlc.State.Opening,
+    "MediaPlayerPlaying": vlc.State.Playing,
+    "MediaPlayerPaused": vlc.State.Paused,
+    "MediaPlayerStopped": vlc.State.Stopped,
+    "MediaPlayerEndReached": vlc.State.Ended,
+    "MediaPlayerEncounteredError": vlc.State.Error,
+}
+
+# Pré-aquecimento (zapping rápido): players secundários, mudos, que já abrem e
+# bufferizam as estações vizinhas para serem trocados pelo principal no Anterior/Próxima
+PREWARM_MAX_SLOTS = 2 # Máximo de estações pré-aquecidas ao mesmo tempo (0 desativa)
+PREWARM_BUDGET_KBPS = 384 # Soma máxima dos bitrates das estações pré-aquecidas
+PREWARM_DEFAULT_KBPS = 128 # Bitrate assumido quando a estação não informa o seu
+# Estados em que um player pré-aquecido ainda pode assumir a reprodução
+_WARM_STATES = (vlc.State.Opening, vlc.State.Buffering, vlc.State.Playing)
+# Máximo de objetos vlc.Media reaproveitados (por URL e opções de buffer); 0 desativa
+MEDIA_CACHE_SIZE = 8
+
+def _forget_event_manager(obj):
+    """
+    Descarta o EventManager memoizado do objeto. O python-vlc guarda o retorno
+    de Media.event_manager()/MediaPlayer.event_manager() (memoize_parameterless)
+    em um dict que nunca é limpo: sem isto, cada mídia ou player liberado
+    continuaria na memória do Python, com seu EventManager e callback ctypes.
+    """
+    for klass in type(obj).__mro__:
+        memo = klass.__dict__.get("event_manager")
+        if memo is not None:
+            cache = getattr(memo, "_cache", None)
+            if isinstance(cache, dict):
+                cache.pop(obj, None)
+            return
+
+
 class RadioPlayer:
     """
     Gerencia a reprodução de streams de rádio online usando VLC.
     """
-    def __init__(self):
-        """Inicializa a instância do VLC e o player."""
+    def __init__(self, prewarm_slots: int = PREWARM_MAX_SLOTS, prewarm_budget_kbps: int = PREWARM_BUDGET_KBPS,
+                 buffer_profile: str = DEFAULT_BUFFER_PROFILE, buffer_tuner=None,
+                 media_cache_size: int = MEDIA_CACHE_SIZE):
+        """
+        Inicializa a instância do VLC e o player.
+
+        Args:
+            prewarm_slots: Máximo de estações vizinhas mantidas pré-aquecidas (0 desativa).
+            prewarm_budget_kbps: Banda máxima (soma dos bitrates) gasta com pré-aquecimento.
+            buffer_profile: Perfil de buffer global (chave de BUFFER_PROFILES),
+                            usado nas estações sem perfil próprio.
+            buffer_tuner: AdaptiveBufferController que ajusta o cache de cada
+                          estação a partir dos travamentos (None = sem ajuste).
+            media_cache_size: Máximo de mídias mantidas para reuso ao voltar a
+                              uma estação (0 desativa).
+        """
+        self.prewarm_slots = prewarm_slots
+        self.prewarm_budget_kbps = prewarm_budget_kbps
+        self.buffer_profile = buffer_profile if buffer_profile in BUFFER_PROFILES else DEFAULT_BUFFER_PROFILE
+        self.buffer_tuner = buffer_tuner
+        self._current_url = None
+        self._current_media_key = None # Chave de _media_key() da mídia em reprodução
+        # URL -> (player mudo, bitrate estimado em kbps, chave de _media_key()),
+        # do mais ao menos prioritário
+        self._warm: OrderedDict[str, tuple] = OrderedDict()
+        # Objetos nativos do libVLC: cada vlc.Media criado aqui tem uma única
+        # referência nativa, liberada quando nenhum dono (player ou cache) a usa
+        self.media_cache_size = media_cache_size
+        self._media_cache: OrderedDict[tuple, object] = OrderedDict() # (URL, opções) -> Media, LRU
+        self._media_refs: dict[int, list] = {} # id(Media) -> [Media, nº de donos]
+        self._player_media: dict[int, object] = {} # id(MediaPlayer) -> Media atual
+        self._live_players = 0
+        self._media_created = 0
+        # Eventos do libVLC chegam em threads do próprio VLC: são apenas enfileirados
+        # aqui e consumidos pela thread do Tkinter via drain_events(). O aviso ao
+        # Tkinter sai de uma thread própria: o callback do VLC nunca pode esperar
+        # pelo Tkinter, que pode estar em stop()/set_media() esperando pelo VLC
+        self._events = queue.SimpleQueue()
+        self._event_callback = None
+        self._notify_lock = threading.Lock()
+        self._notify_pending = False
+        self._notify_wakeup = threading.Event()
+        self._notifier_stopped = False
+        self._notifier = threading.Thread(target=self._notify_loop, name="PlayerEvents", daemon=True)
+        self._notifier.start()
+        # Incrementada a cada troca de mídia: eventos da mídia anterior ficam com a geração antiga
+        self._play_generation = 0
         try:
             # '--no-xlib' pode ser útil em ambientes sem GUI direta (como alguns Linux)
             # Você pode adicionar outras opções do VLC aqui se necessário
             self._instance = vlc.Instance('--no-xlib --quiet')
-            self._player = self._instance.media_player_new()
+            self._player = self._new_player()
+            self._attach_player_events(self._player)
             logger.info("Instância VLC e player criados com sucesso.")
         except Exception as e:
             logger.error(f"Erro ao inicializar o VLC: {e}", exc_info=True)
@@ -24,12 +115,247 @@ class RadioPlayer:
             self._player = None
             raise RuntimeError("Falha ao inicializar o backend de áudio VLC.") from e
 
-    def play(self, stream_url) -> bool:
+    # --- Eventos ---
+
+    def _attach_player_events(self, player):
+        """Assina os eventos de estado do player no gerenciador de eventos do libVLC."""
+        event_manager = player.event_manager()
+        for event_name, state in _STATE_EVENTS.items():
+            event_manager.event_attach(getattr(vlc.EventType, event_name), self._on_vlc_event, EVENT_STATE, state)
+        event_manager.event_attach(vlc.EventType.MediaPlayerBuffering, self._on_vlc_buffering)
+
+    def _detach_player_events(self, player):
+        event_manager = player.event_manager()
+        event_manager.event_detach(vlc.EventType.MediaPlayerBuffering)
+        for event_name in _STATE_EVENTS:
+            event_manager.event_detach(getattr(vlc.EventType, event_name))
+
+    def _attach_media_events(self, media):
+        # Título da música em streams (ICY) chega como alteração de metadados
+        media.event_manager().event_attach(vlc.EventType.MediaMetaChanged, self._on_vlc_event, EVENT_META, None)
+
+    def _detach_media_events(self, player):
+        media = self._player_media.get(id(player))
+        if media:
+            media.event_manager().event_detach(vlc.EventType.MediaMetaChanged)
+
+    def _on_vlc_event(self, event, kind, value):
+        """Callback do libVLC (thread do VLC): não chama o libVLC, só enfileira."""
+        self._post_event(kind, value)
+
+    def _on_vlc_buffering(self, event):
+        self._post_event(EVENT_BUFFERING, event.u.new_cache)
+
+    def _post_event(self, kind, value):
+        """Enfileira o evento e acorda a thread de aviso (não bloqueia a thread do VLC)."""
+        self._events.put((self._play_generation, kind, value))
+        self._notify_wakeup.set()
+
+    def _notify_loop(self):
+        """Thread de aviso: chama o callback uma vez por rajada de eventos."""
+        while True:
+            self._notify_wakeup.wait()
+            self._notify_wakeup.clear()
+            if self._notifier_stopped:
+                return
+            callback = self._event_callback
+            with self._notify_lock:
+                # Um único aviso por rajada de eventos: o próximo só depois de drain_events()
+                if self._notify_pending or callback is None:
+                    continue
+                self._notify_pending = True
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Aviso de evento do player não entregue: {e}")
+
+    def set_event_callback(self, callback):
+        """
+        Define callback() chamado quando há eventos novos para drain_events().
+        É chamado na thread de aviso do RadioPlayer (nem na do VLC, nem na do
+        Tkinter); deve apenas agendar o consumo na thread do Tkinter
+        (ex: widget.after(0, ...)).
+        """
+        self._event_callback = callback
+        if callback is not None and not self._events.empty():
+            self._notify_wakeup.set()
+
+    @property
+    def play_generation(self) -> int:
+        """Geração da mídia atual; eventos com outra geração são de uma mídia anterior."""
+        return self._play_generation
+
+    def drain_events(self) -> list[tuple]:
+        """
+        Retorna (e remove) os eventos pendentes, em ordem, como (geração, tipo,
+        valor). Chamar na thread do Tkinter.
+        """
+        with self._notify_lock:
+            self._notify_pending = False
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        if self.buffer_tuner:
+            for generation, kind, value in events:
+                if generation == self._play_generation:
+                    self._feed_buffer_tuner(kind, value)
+        return events
+
+    def _feed_buffer_tuner(self, kind, value):
+        """Repassa ao ajuste de buffer o que interessa da sessão em andamento."""
+        if kind == EVENT_BUFFERING:
+            self.buffer_tuner.on_buffering(value)
+        elif kind == EVENT_STATE:
+            if value == vlc.State.Opening:
+                self.buffer_tuner.on_opening()
+            elif value == vlc.State.Playing:
+                self.buffer_tuner.on_playing()
+            elif value in (vlc.State.Error, vlc.State.Ended):
+                self.buffer_tuner.end_session(failed=value == vlc.State.Error)
+
+    def get_now_playing(self) -> str | None:
+        """Metadados da mídia atual (música tocando, artista - título, ou a URL), se houver."""
+        if not self._player:
+            return None
+        # Não usa get_media(): cada chamada criaria mais uma referência nativa à mídia
+        media = self._player_media.get(id(self._player))
+        if not media:
+            return None
+        now_playing = media.get_meta(vlc.Meta.NowPlaying) # Comum em streams
+        if now_playing:
+            return now_playing
+        title = media.get_meta(vlc.Meta.Title)
+        artist = media.get_meta(vlc.Meta.Artist)
+        if title and artist:
+            return f"{artist} - {title}"
+        return title or None
+
+    # --- Buffer ---
+
+    def set_buffer_profile(self, profile: str) -> bool:
+        """Troca o perfil de buffer global; vale a partir da próxima estação aberta."""
+        if profile not in BUFFER_PROFILES:
+            logger.warning(f"Perfil de buffer desconhecido: '{profile}'")
+            return False
+        self.buffer_profile = profile
+        logger.info(f"Perfil de buffer global: '{profile}' ({BUFFER_PROFILES[profile]} ms).")
+        return True
+
+    def _resolve_profile(self, buffer_profile: str | None) -> str:
+        return buffer_profile if buffer_profile in BUFFER_PROFILES else self.buffer_profile
+
+    def _media_key(self, stream_url, buffer_profile: str | None = None) -> tuple:
+        """(URL, cache de rede em ms, reconexão HTTP): o que define as opções da mídia."""
+        profile = self._resolve_profile(buffer_profile)
+        caching_ms = BUFFER_PROFILES[profile]
+        if self.buffer_tuner:
+            caching_ms = self.buffer_tuner.caching_for(stream_url, caching_ms)
+        return (stream_url, caching_ms, profile == "flaky-network")
+
+    def _new_media(self, stream_url, buffer_profile: str | None = None):
+        """
+        Retorna a mídia do stream com o cache de rede do perfil (da estação ou
+        o global), ou com o valor aprendido para a estação pelo buffer_tuner.
+        Reaproveita a do cache LRU quando a URL e as opções são as mesmas.
+        O chamador recebe uma referência: deve entregá-la a _set_player_media()
+        ou devolvê-la com _release_media().
+        """
+        key = self._media_key(stream_url, buffer_profile)
+        _, caching_ms, flaky = key
+        media = self._media_cache.get(key)
+        if media is not None:
+            self._media_cache.move_to_end(key)
+            self._retain_media(media)
+            logger.debug(f"Mídia reaproveitada do cache para {stream_url}.")
+            return media
+
+        media = self._instance.media_new(stream_url)
+        media.add_option(f":network-caching={caching_ms}")
+        media.add_option(f":live-caching={caching_ms}")
+        if flaky:
+            media.add_option(":http-reconnect") # Reabre a conexão HTTP se o servidor a derrubar
+        self._media_refs[id(media)] = [media, 1]
+        self._media_created += 1
+        logger.debug(f"Mídia criada para {stream_url} com perfil de buffer '{self._resolve_profile(buffer_profile)}' "
+                     f"({caching_ms} ms).")
+        if self.media_cache_size > 0:
+            self._media_cache[key] = media
+            self._retain_media(media)
+            while len(self._media_cache) > self.media_cache_size:
+                _, evicted = self._media_cache.popitem(last=False)
+                self._release_media(evicted)
+        return media
+
+    # --- Ciclo de vida dos objetos nativos ---
+
+    def _retain_media(self, media):
+        self._media_refs[id(media)][1] += 1
+
+    def _release_media(self, media):
+        """Devolve uma referência; a mídia nativa é liberada quando não resta nenhum dono."""
+        entry = self._media_refs.get(id(media))
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self._media_refs[id(media)]
+            _forget_event_manager(media)
+            media.release()
+
+    def _set_player_media(self, player, media):
+        """Troca a mídia do player, assumindo a referência recebida e devolvendo a da mídia anterior."""
+        previous = self._player_media.get(id(player))
+        player.set_media(media) # O libVLC solta a mídia anterior aqui
+        self._player_media[id(player)] = media
+        if previous is not None:
+            self._release_media(previous)
+
+    def _new_player(self):
+        player = self._instance.media_player_new()
+        self._live_players += 1
+        return player
+
+    def _release_player(self, player):
+        """Para e libera o player e a referência à sua mídia."""
+        player.stop()
+        _forget_event_manager(player)
+        player.release()
+        self._live_players -= 1
+        media = self._player_media.pop(id(player), None)
+        if media is not None:
+            self._release_media(media)
+
+    def clear_media_cache(self):
+        """Solta as mídias guardadas para reuso (as em uso continuam vivas até serem trocadas)."""
+        while self._media_cache:
+            _, media = self._media_cache.popitem(last=False)
+            self._release_media(media)
+
+    def native_object_counts(self) -> dict[str, int]:
+        """
+        Objetos nativos do libVLC vivos sob controle do RadioPlayer (para
+        diagnóstico de vazamentos): devem ficar estáveis com o zapping.
+        """
+        return {
+            "instances": 1 if self._instance else 0,
+            "players": self._live_players,
+            "media": len(self._media_refs),
+            "media_cached": len(self._media_cache),
+            "media_created": self._media_created, # Total desde o início
+        }
+
+    # --- Reprodução ---
+
+    def play(self, stream_url, buffer_profile: str | None = None) -> bool:
         """
         Toca um stream de rádio a partir da URL fornecida.
 
         Args:
             stream_url (str): A URL do stream de rádio online.
+            buffer_profile: Perfil de buffer da estação (None = perfil global).
 
         Returns:
             bool: True se o comando play foi enviado com sucesso, False caso contrário.
@@ -40,24 +366,164 @@ class RadioPlayer:
 
         logger.info(f"Tentando tocar URL: {stream_url}")
         try:
-            media = self._instance.media_new(stream_url)
-            # Opcional: Ajustar o cache de rede (em milissegundos)
-            # media.add_option('network-caching=1000')
-            self._player.set_media(media)
-            self._player.play()
-            # Pequena pausa para dar tempo ao VLC de iniciar o buffering/play
-            time.sleep(0.5) # Considerar usar eventos VLC para mais robustez
-            logger.debug(f"Comando play enviado para: {stream_url}")
+            if self._promote_warm(stream_url, buffer_profile):
+                self._start_tuner_session(stream_url, buffer_profile, prebuffered=True)
+                return True
+            media = self._new_media(stream_url, buffer_profile)
+            self._current_media_key = self._media_key(stream_url, buffer_profile)
+            self._detach_media_events(self._player)
+            self._attach_media_events(media)
+            # set_media() encerra a mídia anterior: o que ela ainda emitir fica com a geração antiga
+            self._set_player_media(self._player, media)
+            self._play_generation += 1
+            self._player.play() # Assíncrono: o progresso chega pelos eventos
+            self._current_url = stream_url
+            self._start_tuner_session(stream_url, buffer_profile)
+            logger.debug(f"Comando play enviado para: {stream_url} (objetos nativos: {self.native_object_counts()})")
             return True
         except Exception as e:
             logger.error(f"Erro ao tentar tocar {stream_url}: {e}", exc_info=True)
             return False
 
+    def _start_tuner_session(self, stream_url, buffer_profile: str | None, prebuffered: bool = False):
+        if self.buffer_tuner:
+            base_ms = BUFFER_PROFILES[self._resolve_profile(buffer_profile)]
+            self.buffer_tuner.start_session(stream_url, base_ms, prebuffered=prebuffered)
+
     def stop(self):
-        """Para a reprodução atual."""
+        """Para a reprodução atual (e o pré-aquecimento, que não faz sentido sem ela)."""
+        if self.buffer_tuner:
+            self.buffer_tuner.end_session()
+        self.clear_prewarm()
+        self._current_url = None
+        self._current_media_key = None
         if self._player:
             logger.info("Parando a reprodução.")
             self._player.stop()
+            self._play_generation += 1
+
+    # --- Pré-aquecimento das estações vizinhas ---
+
+    def prewarm(self, candidates: list[tuple[str, int | None, str | None]]):
+        """
+        Mantém pré-aquecidas (abertas e bufferizando, sem som) as estações
+        indicadas, para que play() com uma delas troque de estação quase
+        instantaneamente. Respeita prewarm_slots e prewarm_budget_kbps; slots de
+        estações que não estão mais na lista são liberados.
+
+        Args:
+            candidates: (URL, bitrate em kbps ou None, perfil de buffer ou None),
+                        do mais ao menos prioritário.
+        """
+        if not self._player:
+            return
+        wanted: OrderedDict[str, tuple] = OrderedDict()
+        budget = self.prewarm_budget_kbps
+        for url, bitrate, buffer_profile in candidates:
+            if len(wanted) >= self.prewarm_slots:
+                break
+            if not url or url == self._current_url or url in wanted:
+                continue
+            kbps = bitrate or PREWARM_DEFAULT_KBPS
+            if kbps > budget:
+                logger.debug(f"Pré-aquecimento de {url} ignorado: {kbps} kbps excede a banda restante ({budget} kbps).")
+                continue
+            budget -= kbps
+            wanted[url] = (kbps, buffer_profile, self._media_key(url, buffer_profile))
+
+        for url in list(self._warm):
+            player, _, media_key = self._warm[url]
+            # Perfil de buffer mudou desde que foi aberto: reabre com as opções atuais
+            if url not in wanted or wanted[url][2] != media_key or player.get_state() not in _WARM_STATES:
+                self._release_warm(url)
+        for url, (kbps, buffer_profile, media_key) in wanted.items():
+            if url not in self._warm:
+                try:
+                    self._warm[url] = (self._open_warm(url, buffer_profile), kbps, media_key)
+                except Exception as e:
+                    logger.warning(f"Não foi possível pré-aquecer {url}: {e}")
+        # Mantém a ordem de prioridade pedida
+        for url in wanted:
+            if url in self._warm:
+                self._warm.move_to_end(url)
+        if wanted:
+            logger.debug(f"Estações pré-aquecidas: {list(self._warm)} ({self.prewarm_budget_kbps - budget} kbps).")
+
+    def clear_prewarm(self):
+        """Libera todos os players pré-aquecidos."""
+        for url in list(self._warm):
+            self._release_warm(url)
+
+    def _open_warm(self, url, buffer_profile: str | None = None):
+        player = self._new_player()
+        try:
+            player.audio_set_mute(True) # Só bufferiza; o som vem quando assumir a reprodução
+            self._set_player_media(player, self._new_media(url, buffer_profile))
+            player.play()
+        except Exception:
+            self._release_player(player)
+            raise
+        return player
+
+    def _release_warm(self, url):
+        player, _, _ = self._warm.pop(url)
+        try:
+            self._release_player(player)
+        except Exception as e:
+            logger.debug(f"Erro ao liberar player pré-aquecido de {url}: {e}")
+
+    def _promote_warm(self, stream_url, buffer_profile: str | None = None) -> bool:
+        """
+        Se 'stream_url' está pré-aquecida com as mesmas opções de mídia que
+        play() usaria agora (perfil de buffer / valor do buffer_tuner), troca o
+        player principal pelo dela. O player anterior fica pré-aquecido no
+        lugar (voltar à estação também é instantâneo) enquanto houver slot; o
+        próximo prewarm() o descarta se não for mais vizinho.
+        """
+        entry = self._warm.pop(stream_url, None)
+        if entry is None:
+            return False
+        warm, kbps, media_key = entry
+        wanted_key = self._media_key(stream_url, buffer_profile)
+        if media_key != wanted_key:
+            logger.debug(f"Player pré-aquecido de {stream_url} aberto com outro cache de rede "
+                         f"({media_key[1:]} != {wanted_key[1:]}); abrindo do zero.")
+            self._warm[stream_url] = entry
+            self._release_warm(stream_url)
+            return False
+        state = warm.get_state()
+        if state not in _WARM_STATES:
+            logger.debug(f"Player pré-aquecido de {stream_url} inutilizável ({state}); abrindo do zero.")
+            self._warm[stream_url] = entry
+            self._release_warm(stream_url)
+            return False
+
+        old, old_url, old_key = self._player, self._current_url, self._current_media_key
+        volume = old.audio_get_volume()
+        self._detach_player_events(old)
+        self._detach_media_events(old)
+        old.audio_set_mute(True)
+
+        self._player, self._current_url, self._current_media_key = warm, stream_url, media_key
+        self._play_generation += 1
+        self._attach_player_events(warm)
+        media = self._player_media.get(id(warm))
+        if media:
+            self._attach_media_events(media)
+        if volume >= 0:
+            warm.audio_set_volume(volume)
+        warm.audio_set_mute(False)
+
+        if old_url and old_key and 0 < self.prewarm_slots and old.get_state() in _WARM_STATES:
+            self._warm[old_url] = (old, PREWARM_DEFAULT_KBPS, old_key)
+            while len(self._warm) > self.prewarm_slots:
+                self._release_warm(next(iter(self._warm)))
+        else:
+            self._release_player(old)
+        # O novo player já passou de Opening: a UI recebe o estado atual como evento
+        self._post_event(EVENT_STATE, state)
+        logger.info(f"Estação pré-aquecida assumiu a reprodução: {stream_url} ({state}).")
+        return True
 
     def get_state(self):
         """Retorna o estado atual do player VLC."""
@@ -98,14 +564,29 @@ class RadioPlayer:
 
     def release(self):
         """Libera os recursos do VLC quando não for mais necessário."""
+        # Encerra a thread de aviso sem esperá-la: ela pode estar aguardando o
+        # Tkinter, que é quem chama release()
+        self._event_callback = None
+        self._notifier_stopped = True
+        self._notify_wakeup.set()
+        self.clear_prewarm()
+        if self.buffer_tuner:
+            self.buffer_tuner.end_session()
+            self.buffer_tuner.save()
         if self._player:
             # Garante que parou antes de liberar
             current_state = self._player.get_state()
             if current_state != vlc.State.Stopped and current_state != vlc.State.Error:
                  self.stop()
-            self._player.release()
+            self._detach_player_events(self._player)
+            self._detach_media_events(self._player)
+            self._event_callback = None
+            self._release_player(self._player)
             self._player = None
             logger.info("Player VLC liberado.")
+        self.clear_media_cache()
+        if self._media_refs or self._live_players:
+            logger.warning(f"Objetos do libVLC ainda vivos ao liberar: {self.native_object_counts()}")
         if self._instance:
             self._instance.release()
             self._instance = None
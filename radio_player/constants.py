@@ -16,6 +16,25 @@ INSTALLED_DATA_DIR = pathlib.Path('/usr/share') / PACKAGE_NAME
 # Caminho base para dados do usuário (padrão Freedesktop)
 USER_DATA_DIR = pathlib.Path.home() / ".local" / "share" / PACKAGE_NAME
 
+# Backend de persistência das estações do usuário: "json" (stations.json + journal)
+# ou "sqlite" (stations.db, migrado automaticamente do JSON na primeira execução)
+STATION_STORAGE_BACKEND = os.environ.get("RADIO_PLAYER_STORAGE", "json")
+# Grava o stations.json no formato compacto (envelope com schema_version) em vez
+# da lista de {"name", "url"}. Opcional: versões antigas do app não leem esse
+# formato e começariam com a lista vazia após um downgrade
+STATIONS_COMPACT_FORMAT = os.environ.get("RADIO_PLAYER_COMPACT_STATIONS", "0") == "1"
+
+# Perfis de buffer: milissegundos de network-caching/live-caching passados ao VLC.
+# Cada estação pode ter o seu; as demais usam o perfil global (DEFAULT_BUFFER_PROFILE)
+BUFFER_PROFILES = {
+    "low-latency": 150, # CDNs rápidas: começa a tocar em poucas centenas de ms
+    "balanced": 1000, # Padrão do VLC
+    "flaky-network": 5000, # Conexões instáveis: buffer grande e reconexão HTTP
+}
+DEFAULT_BUFFER_PROFILE = os.environ.get("RADIO_PLAYER_BUFFER_PROFILE", "balanced")
+if DEFAULT_BUFFER_PROFILE not in BUFFER_PROFILES:
+    DEFAULT_BUFFER_PROFILE = "balanced"
+
 def is_running_from_source():
     """Verifica se o script está rodando do código fonte."""
     # Verifica se um arquivo/diretório típico do source tree existe no nível superior
@@ -0,0 +1,189 @@
+# /home/marcos/projeto1/radio_player/core/importer.py
+"""
+Leitura incremental de arquivos grandes de estações (ex: dumps do Radio Browser).
+
+Os registros são lidos um a um, com memória limitada ao tamanho do bloco de
+leitura mais o maior registro, independente do tamanho do arquivo. Formatos
+aceitos: array JSON de objetos, NDJSON (um objeto por linha) e, para arquivos
+pequenos, os formatos do stations.json (mapeamento/envelope).
+"""
+import json
+import logging
+import pathlib
+
+from radio_player.core.station import Station
+from radio_player.core.storage import JsonStationStorage
+
+logger = logging.getLogger(__name__)
+
+# Tamanho do bloco lido do disco a cada vez
+READ_CHUNK_SIZE = 64 * 1024
+# Limite de tamanho de um único registro (protege contra arquivos malformados)
+MAX_RECORD_SIZE = 1024 * 1024
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+
+
+def iter_station_records(path, chunk_size: int = READ_CHUNK_SIZE):
+    """
+    Itera sobre os registros (dicts) de um arquivo de estações sem carregá-lo inteiro.
+
+    Args:
+        path: Caminho do arquivo (.json com array, .ndjson/.jsonl, ou stations.json).
+        chunk_size: Bytes lidos por vez.
+
+    Yields:
+        Cada registro do arquivo, como dict (registros que não são objetos são
+        ignorados); para arquivos no formato do stations.json, como Station.
+
+    Raises:
+        ValueError: Se o arquivo não estiver em um formato reconhecido.
+        json.JSONDecodeError: Se o conteúdo estiver malformado.
+    """
+    path = pathlib.Path(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        first_char = _peek_first_char(f)
+        if not first_char:
+            return
+        if path.suffix.lower() in NDJSON_SUFFIXES:
+            yield from _iter_ndjson(f)
+        elif first_char == "[":
+            yield from _iter_json_array(f, chunk_size)
+        elif first_char == "{":
+            yield from _iter_object_file(f, path)
+        else:
+            raise ValueError(f"Formato de arquivo de estações não reconhecido: '{path}'")
+
+
+def station_from_record(record) -> Station | None:
+    """
+    Converte um registro em Station, aceitando o formato do StationManager
+    ({"name", "url", ...}) e o do Radio Browser (prefere "url_resolved",
+    mapeia "countrycode" para country e "stationuuid" para uuid).
+    Retorna None se o registro não tiver nome ou URL http(s) válida.
+    """
+    if isinstance(record, Station):
+        record = record.to_dict()
+    name = record.get("name")
+    url = record.get("url_resolved") or record.get("url")
+    if not isinstance(name, str) or not isinstance(url, str):
+        return None
+    name = name.strip()
+    url = url.strip()
+    if not name or not url.startswith(("http://", "https://")):
+        return None
+    bitrate = record.get("bitrate")
+    return Station(
+        name,
+        url,
+        tags=record.get("tags") or None,
+        country=record.get("country") or record.get("countrycode") or None,
+        codec=record.get("codec") or None,
+        bitrate=bitrate if isinstance(bitrate, int) and bitrate > 0 else None,
+        uuid=record.get("stationuuid") or record.get("uuid") or None,
+    )
+
+
+def _peek_first_char(f) -> str:
+    """Retorna o primeiro caractere não-branco do arquivo e volta ao início."""
+    while True:
+        chunk = f.read(1024)
+        if not chunk:
+            f.seek(0)
+            return ""
+        stripped = chunk.lstrip("\ufeff \t\r\n")
+        if stripped:
+            f.seek(0)
+            return stripped[0]
+
+
+def _iter_ndjson(f):
+    """Um objeto JSON por linha; linhas vazias ou inválidas são ignoradas."""
+    for line_number, line in enumerate(f, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Linha {line_number} inválida ignorada na importação.")
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def _iter_json_array(f, chunk_size: int):
+    """Decodifica os elementos de um array JSON de nível superior, um por vez."""
+    decoder = json.JSONDecoder()
+    # O BOM/espa\u00e7os iniciais podem ocupar mais de um bloco
+    buffer = ""
+    while not buffer:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            raise json.JSONDecodeError("Array JSON n\u00e3o terminado", "", 0)
+        buffer = chunk.lstrip("\ufeff \t\r\n")
+    pos = 1 # Pula o '['
+    eof = False
+
+    while True:
+        # Pula espaços e vírgulas entre os elementos
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) or eof:
+                break
+            buffer, pos = f.read(chunk_size), 0
+            eof = not buffer
+
+        if pos >= len(buffer):
+            raise json.JSONDecodeError("Array JSON não terminado", buffer, pos)
+        if buffer[pos] == "]":
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Registro incompleto no buffer: lê mais e tenta de novo
+            if eof or len(buffer) - pos > MAX_RECORD_SIZE:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        if isinstance(record, dict):
+            yield record
+        pos = end
+        # Descarta a parte já consumida para manter a memória limitada
+        if pos > chunk_size:
+            buffer, pos = buffer[pos:], 0
+
+
+def _iter_object_file(f, path):
+    """
+    Arquivo começando com '{': NDJSON sem a extensão, ou um stations.json
+    (mapeamento/envelope, lido inteiro pois é o formato do próprio app).
+    É NDJSON se a primeira linha já é um objeto completo e há outras linhas
+    depois dela. Com uma linha só (o json.dump grava o stations.json assim),
+    é um registro único se tiver URL, e um stations.json se não.
+    """
+    first_line = f.readline().strip()
+    try:
+        first_record = json.loads(first_line)
+    except json.JSONDecodeError:
+        first_record = None
+
+    if isinstance(first_record, dict):
+        if any(line.strip() for line in f):
+            f.seek(0)
+            yield from _iter_ndjson(f)
+            return
+        if "url" in first_record or "url_resolved" in first_record:
+            yield first_record
+            return
+
+    f.seek(0)
+    stations = JsonStationStorage.parse_stations_data(json.load(f), path)
+    if stations is None:
+        raise ValueError(f"Formato de arquivo de estações não reconhecido: '{path}'")
+    yield from stations
@@ -0,0 +1,156 @@
+# /home/marcos/projeto1/radio_player/core/saver.py
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo (s) que close() espera pela última gravação e pela thread de trabalho
+CLOSE_TIMEOUT = 10.0
+
+
+class BackgroundSaver:
+    """
+    Gravação adiada (write-behind) das alterações de estações.
+
+    As operações enviadas por submit() são acumuladas e gravadas por uma thread
+    de trabalho depois de um pequeno intervalo sem novas alterações, de modo
+    que várias edições seguidas resultam em uma única escrita no disco e a
+    thread do Tkinter nunca espera pelo sistema de arquivos.
+    """
+
+    def __init__(self, commit_fn, delay: float = 0.5, max_delay: float = 5.0, on_error=None):
+        """
+        Args:
+            commit_fn: Função que grava uma lista de operações e retorna True/False.
+                       É sempre chamada a partir da thread de trabalho.
+            delay: Segundos sem novas alterações antes de gravar.
+            max_delay: Tempo máximo que uma alteração pode esperar pela gravação,
+                       mesmo que novas alterações continuem chegando.
+            on_error: Callback opcional on_error(mensagem), chamado na thread de
+                      trabalho quando uma gravação falha.
+        """
+        self._commit_fn = commit_fn
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_error = on_error
+
+        self._condition = threading.Condition()
+        self._pending: list[dict] = []
+        self._first_pending_at = None # Quando chegou a alteração mais antiga ainda não gravada
+        self._last_submit_at = None
+        self._writing = False
+        self._flush_requested = False
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name="StationSaver", daemon=True)
+        self._thread.start()
+        logger.debug(f"Gravação em segundo plano iniciada (atraso={delay}s).")
+
+    def submit(self, operations: list[dict]):
+        """Enfileira operações para gravação. Pode ser chamado de qualquer thread."""
+        if not operations:
+            return
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("BackgroundSaver já foi encerrado.")
+            now = time.monotonic()
+            if not self._pending:
+                self._first_pending_at = now
+            self._pending.extend(operations)
+            self._last_submit_at = now
+            self._condition.notify_all()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Grava imediatamente as operações pendentes e espera a conclusão.
+        Retorna True se nada ficou pendente (gravação concluída com sucesso).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending or self._writing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+                if self._flush_requested is False and self._pending and not self._writing:
+                    # A última tentativa falhou e as operações voltaram para a fila
+                    break
+            self._flush_requested = False
+            return not self._pending and not self._writing
+
+    def close(self, timeout: float | None = CLOSE_TIMEOUT) -> bool:
+        """
+        Grava o que estiver pendente e encerra a thread de trabalho, esperando no
+        máximo 'timeout' segundos por etapa (a thread é daemon: um disco travado
+        não impede a saída). Falhas nesta última gravação não chamam on_error.
+        """
+        self.on_error = None # Quem fecha não está mais ouvindo (ex: a janela já está fechando)
+        flushed = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("A thread de gravação não terminou dentro do tempo limite.")
+        logger.debug("Gravação em segundo plano encerrada.")
+        return flushed
+
+    def _run(self):
+        """Laço da thread de trabalho."""
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending and self._closed:
+                    return
+                # Agrupa alterações próximas: espera até 'delay' sem novidades
+                # (ou 'max_delay' no total), a menos que um flush tenha sido pedido
+                while not self._flush_requested and not self._closed:
+                    now = time.monotonic()
+                    quiet_until = self._last_submit_at + self.delay
+                    hard_until = self._first_pending_at + self.max_delay
+                    wait_for = min(quiet_until, hard_until) - now
+                    if wait_for <= 0:
+                        break
+                    self._condition.wait(wait_for)
+                operations, self._pending = self._pending, []
+                self._writing = True
+
+            saved = False
+            try:
+                saved = self._commit_fn(operations)
+            except Exception as e:
+                logger.error(f"Erro inesperado na gravação em segundo plano: {e}", exc_info=True)
+
+            with self._condition:
+                self._writing = False
+                if not saved:
+                    # Devolve as operações para a fila; serão regravadas na próxima
+                    # alteração ou no próximo flush
+                    self._pending[:0] = operations
+                    self._first_pending_at = time.monotonic()
+                    self._flush_requested = False
+                self._condition.notify_all()
+
+            if saved:
+                continue
+
+            on_error = self.on_error
+            if on_error:
+                try:
+                    on_error(f"Falha ao salvar {len(operations)} alteração(ões) de estações. Verifique os logs.")
+                except Exception as e:
+                    logger.error(f"Erro no callback de falha de gravação: {e}", exc_info=True)
+
+            with self._condition:
+                if self._closed:
+                    # Encerrando: não há a quem entregar novas tentativas
+                    logger.error(f"{len(self._pending)} alteração(ões) de estações não puderam ser gravadas.")
+                    return
+                # Aguarda um novo submit()/flush() antes de tentar de novo
+                failed_at = self._first_pending_at
+                while not self._flush_requested and not self._closed and self._last_submit_at <= failed_at:
+                    self._condition.wait()
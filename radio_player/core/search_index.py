@@ -0,0 +1,289 @@
+# /home/marcos/projeto1/radio_player/core/search_index.py
+"""
+Índice de busca aproximada (fuzzy) sobre as estações do StationManager.
+
+Os nomes são normalizados (minúsculas, sem acentos nem pontuação) e
+quebrados em trigramas; "radio uniao" encontra "Rádio União" e tolera erros
+de digitação. A construção completa roda uma vez (de preferência em segundo
+plano, ver build_async()); depois disso o índice acompanha as alterações do
+StationManager uma a uma, sem reconstruir. A busca exata intersecta as listas
+de trigramas a partir da mais curta, e a aproximada só parte dos trigramas
+raros, o que limita os candidatos avaliados mesmo com ~100 mil estações.
+"""
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+# Trigramas presentes em mais estações que isto não geram candidatos na busca aproximada
+# (a menos que a busca só tenha trigramas assim); também limita os candidatos nesse caso
+MAX_CANDIDATES = 5000
+# Fração mínima dos trigramas da busca que o nome precisa conter (busca aproximada)
+MIN_SIMILARITY = 0.5
+# Entradas removidas acumuladas (além de 1/4 das vivas) que disparam a reconstrução em segundo plano
+MIN_DEAD_FOR_COMPACTION = 1000
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sem acentos e com pontuação trocada por espaços ("Rádio-União!" -> "radio uniao")."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", without_accents).strip()
+
+
+def trigrams(normalized: str, partial_last: bool = False) -> set[str]:
+    """
+    Trigramas de um texto normalizado, com as palavras delimitadas por espaço.
+    Com 'partial_last' (texto digitado na busca), a última palavra pode estar
+    incompleta: fica sem o trigrama do fim da palavra, então "radio f" ainda
+    encontra "Radio FM".
+    """
+    grams = set()
+    words = normalized.split()
+    for position, word in enumerate(words):
+        if partial_last and position == len(words) - 1:
+            padded = f" {word}"
+        else:
+            padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class StationSearchIndex:
+    """
+    Índice de trigramas dos nomes das estações. Recebe cada alteração do
+    StationManager (add_change_listener) e só reconstrói tudo se perder alguma,
+    ou se as remoções acumuladas deixarem entradas mortas demais.
+    """
+
+    def __init__(self, station_manager):
+        self.station_manager = station_manager
+        self._lock = threading.Lock() # Protege as estruturas abaixo (as alterações podem vir de outra thread)
+        self._generation = None # Geração do StationManager refletida no índice
+        self._names: list[str | None] = [] # Por id; None = estação removida (entrada morta)
+        self._padded: list[str | None] = [] # " nome normalizado " (para testar trigramas com 'in')
+        self._gram_counts: list[int] = []
+        self._postings: dict[str, list[int]] = {}
+        self._ids_by_name: dict[str, list[int]] = {}
+        self._dead = 0
+        # Construção completa em andamento: alterações recebidas enquanto isso
+        self._building = False
+        self._pending: list[tuple[int, str | None, str | None]] = []
+        self._build_thread = None
+        station_manager.add_change_listener(self._on_station_change)
+
+    # --- Construção ---
+
+    def build_async(self):
+        """Começa a construção completa em segundo plano (a busca espera por ela se chegar antes)."""
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+            self._pending = []
+        self._build_thread = threading.Thread(target=self._build, name="SearchIndex", daemon=True)
+        self._build_thread.start()
+
+    def _ensure_current(self):
+        """Garante que o índice reflete as estações atuais (reconstrói só se perdeu alterações)."""
+        thread = self._build_thread
+        if thread is not None:
+            thread.join()
+            self._build_thread = None
+        if self._generation == self.station_manager.generation:
+            return
+        with self._lock:
+            self._building = True
+            self._pending = []
+        self._build()
+
+    def _build(self):
+        """Constrói o índice a partir de uma cópia consistente dos nomes e aplica as alterações que chegaram durante a construção."""
+        start = time.perf_counter()
+        generation, names = self.station_manager.get_station_names_snapshot()
+        names = list(names)
+        padded = []
+        gram_counts = []
+        postings: dict[str, list[int]] = {}
+        ids_by_name: dict[str, list[int]] = {}
+        words_cache: dict[str, tuple[str, frozenset]] = {} # palavra original -> (normalizada, trigramas)
+        for station_id, name in enumerate(names):
+            # Normaliza palavra a palavra: os nomes repetem muito as mesmas palavras
+            words = []
+            grams = set()
+            for word in name.split():
+                cached = words_cache.get(word)
+                if cached is None:
+                    normalized = normalize(word)
+                    cached = words_cache[word] = (normalized, frozenset(trigrams(normalized)))
+                if cached[0]:
+                    words.append(cached[0])
+                    grams |= cached[1]
+            padded.append(f" {' '.join(words)} ")
+            gram_counts.append(len(grams))
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [station_id]
+                else:
+                    posting.append(station_id)
+            ids_by_name.setdefault(name, []).append(station_id)
+
+        with self._lock:
+            self._names, self._padded, self._gram_counts = names, padded, gram_counts
+            self._postings, self._ids_by_name = postings, ids_by_name
+            self._dead = 0
+            self._generation = generation
+            pending, self._pending = self._pending, []
+            self._building = False
+            for change in pending:
+                if change[0] > generation:
+                    self._apply_change(*change)
+        logger.debug(f"Índice de busca reconstruído: {len(names)} estações, {len(postings)} trigramas "
+                     f"em {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+    # --- Atualização incremental ---
+
+    def _on_station_change(self, generation: int, removed: str | None, added: str | None):
+        """Listener do StationManager (chamado na thread que alterou a lista)."""
+        with self._lock:
+            if self._building:
+                self._pending.append((generation, removed, added))
+                return
+            self._apply_change(generation, removed, added)
+            compact = self._dead > max(MIN_DEAD_FOR_COMPACTION, (len(self._names) - self._dead) // 4)
+        if compact:
+            self.build_async()
+
+    def _apply_change(self, generation: int, removed: str | None, added: str | None):
+        """Aplica uma alteração se o índice estava em dia até a anterior (deve ser chamado com _lock)."""
+        if self._generation != generation - 1:
+            return # Perdeu alguma alteração: a próxima busca reconstrói tudo
+        if removed is not None:
+            ids = self._ids_by_name.get(removed)
+            if ids:
+                station_id = ids.pop()
+                if not ids:
+                    del self._ids_by_name[removed]
+                # Remoção preguiçosa: a entrada continua nas listas de trigramas e é ignorada na busca
+                self._names[station_id] = None
+                self._padded[station_id] = None
+                self._dead += 1
+        if added is not None:
+            station_id = len(self._names)
+            normalized = normalize(added)
+            grams = trigrams(normalized)
+            self._names.append(added)
+            self._padded.append(f" {normalized} ")
+            self._gram_counts.append(len(grams))
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(station_id)
+            self._ids_by_name.setdefault(added, []).append(station_id)
+        self._generation = generation
+
+    # --- Busca ---
+
+    def search(self, query: str, limit: int = 50) -> list[str]:
+        """
+        Retorna os nomes das estações mais parecidos com 'query', do mais ao
+        menos relevante. Correspondências exatas (prefixo, trecho ou todas as
+        palavras, ignorando acentos e maiúsculas; a última palavra pode estar
+        incompleta) vêm antes das aproximadas.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        self._ensure_current()
+        query_grams = trigrams(normalized, partial_last=True)
+        with self._lock:
+            by_rarity = sorted(query_grams, key=lambda g: len(self._postings.get(g, ())))
+
+            scored = self._exact_matches(normalized, by_rarity, limit)
+            if len(scored) < limit and query_grams:
+                exact_ids = {station_id for _, station_id in scored}
+                scored.extend(item for item in self._fuzzy_matches(query_grams, by_rarity) if item[1] not in exact_ids)
+
+            best = heapq.nlargest(limit, scored)
+            return [self._names[station_id] for _, station_id in best]
+
+    def _exact_matches(self, normalized: str, by_rarity: list[str], limit: int) -> list[tuple[float, int]]:
+        """
+        Até 'limit' estações que contêm todas as palavras da busca (interseção
+        das listas de trigramas): primeiro as que começam pela busca, depois as
+        que a contêm como trecho contínuo e por fim as que têm todas as palavras
+        em qualquer ordem; em cada grupo, os nomes mais curtos primeiro.
+        """
+        padded = self._padded
+        if not by_rarity:
+            # Busca curta demais para ter trigramas (ex: "f"): testa todos os nomes
+            candidates = set(range(len(padded)))
+        elif by_rarity[0] not in self._postings:
+            return []
+        else:
+            candidates = set(self._postings[by_rarity[0]])
+            for gram in by_rarity[1:]:
+                if not candidates:
+                    return []
+                candidates.intersection_update(self._postings.get(gram, ()))
+        candidates = [i for i in candidates if padded[i] is not None]
+
+        padded_query = f" {normalized}"
+        prefix = [i for i in candidates if padded[i].startswith(padded_query)]
+        scored = self._shortest(prefix, 3.0, limit)
+        if len(scored) < limit:
+            contains = [i for i in candidates if padded_query in padded[i] and not padded[i].startswith(padded_query)]
+            scored.extend(self._shortest(contains, 2.0, limit - len(scored)))
+        words = normalized.split()
+        if len(scored) < limit and len(words) > 1:
+            # Palavras completas entre espaços; a última pode ser só o começo de uma palavra
+            needles = [f" {word} " for word in words[:-1]] + [f" {words[-1]}"]
+            scattered = [i for i in candidates
+                         if padded_query not in padded[i] and all(needle in padded[i] for needle in needles)]
+            scored.extend(self._shortest(scattered, 1.0, limit - len(scored)))
+        return scored
+
+    def _shortest(self, station_ids: list[int], rank: float, limit: int) -> list[tuple[float, int]]:
+        """Os 'limit' nomes mais curtos, pontuados com 'rank' mais um desempate pelo tamanho."""
+        gram_counts = self._gram_counts
+        shortest = heapq.nsmallest(limit, station_ids, key=gram_counts.__getitem__)
+        return [(rank + 1.0 / (gram_counts[i] + 1), i) for i in shortest]
+
+    def _fuzzy_matches(self, query_grams: set[str], by_rarity: list[str]) -> list[tuple[float, int]]:
+        """
+        Estações que compartilham boa parte dos trigramas da busca (tolera erros
+        de digitação). Trigramas comuns demais para distinguir nomes não geram
+        candidatos, o que limita o trabalho em bibliotecas grandes; se a busca
+        só tem trigramas comuns (ex: "rok", "radoi"), os candidatos vêm dos
+        menos comuns deles, até MAX_CANDIDATES.
+        """
+        candidates = set()
+        for gram in by_rarity:
+            posting = self._postings.get(gram, ())
+            if 0 < len(posting) <= MAX_CANDIDATES:
+                candidates.update(posting)
+        if not candidates:
+            for gram in by_rarity:
+                candidates.update(itertools.islice(self._postings.get(gram, ()), MAX_CANDIDATES - len(candidates)))
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+
+        needed = MIN_SIMILARITY * len(query_grams)
+        scored = []
+        for station_id in candidates:
+            padded = self._padded[station_id]
+            if padded is None:
+                continue
+            shared = sum(1 for gram in query_grams if gram in padded)
+            if shared < needed:
+                continue
+            # Semelhança de Jaccard entre os conjuntos de trigramas (sempre < 1)
+            scored.append((shared / (len(query_grams) + self._gram_counts[station_id] - shared), station_id))
+        return scored
@@ -0,0 +1,81 @@
+# /home/marcos/projeto1/radio_player/core/station.py
+import logging
+
+from radio_player.constants import BUFFER_PROFILES
+
+logger = logging.getLogger(__name__)
+
+
+class Station:
+    """
+    Registro compacto de uma estação de rádio.
+
+    Usa __slots__ para evitar um dict por estação (importante com dezenas de
+    milhares de estações). A serialização (to_dict/from_dict) é compatível com o
+    formato {"name", "url"} do stations.json; campos opcionais só são gravados
+    quando preenchidos.
+    """
+
+    __slots__ = ("name", "url", "tags", "country", "codec", "bitrate", "uuid", "buffer_profile")
+
+    # Campos opcionais, na ordem em que são serializados (e dos argumentos do construtor)
+    OPTIONAL_FIELDS = ("tags", "country", "codec", "bitrate", "uuid", "buffer_profile")
+
+    def __init__(self, name: str, url: str, tags: str | None = None, country: str | None = None,
+                 codec: str | None = None, bitrate: int | None = None, uuid: str | None = None,
+                 buffer_profile: str | None = None):
+        self.name = name
+        self.url = url
+        self.tags = tags
+        self.country = country
+        self.codec = codec
+        self.bitrate = bitrate
+        self.uuid = uuid # stationuuid do Radio Browser, quando a estação veio de lá
+        self.buffer_profile = buffer_profile # Chave de BUFFER_PROFILES (None = perfil global)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Station":
+        """
+        Cria uma Station a partir de um dict no formato do stations.json.
+        Chaves desconhecidas são ignoradas.
+        """
+        bitrate = data.get("bitrate")
+        buffer_profile = data.get("buffer_profile")
+        return cls(
+            data["name"],
+            data["url"],
+            tags=data.get("tags") or None,
+            country=data.get("country") or None,
+            codec=data.get("codec") or None,
+            bitrate=bitrate if isinstance(bitrate, int) and bitrate > 0 else None,
+            uuid=data.get("uuid") or None,
+            buffer_profile=buffer_profile if isinstance(buffer_profile, str) and buffer_profile in BUFFER_PROFILES else None,
+        )
+
+    def to_dict(self) -> dict:
+        """Serializa para o formato do stations.json (omite campos opcionais vazios)."""
+        data = {"name": self.name, "url": self.url}
+        for field in self.OPTIONAL_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
+
+    def has_metadata(self) -> bool:
+        """Indica se algum campo opcional está preenchido."""
+        return any(getattr(self, field) is not None for field in self.OPTIONAL_FIELDS)
+
+    def copy(self) -> "Station":
+        """Retorna uma cópia independente do registro."""
+        return Station(self.name, self.url, self.tags, self.country, self.codec, self.bitrate, self.uuid,
+                       self.buffer_profile)
+
+    def __eq__(self, other):
+        if not isinstance(other, Station):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    __hash__ = None # Mutável: não deve ser usada como chave
+
+    def __repr__(self):
+        return f"Station(name={self.name!r}, url={self.url!r})"
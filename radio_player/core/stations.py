@@ -1,11 +1,13 @@
 # /home/marcos/projeto1/radio_player/core/stations.py
-import json
+import contextlib
 import logging
-import os
-import pathlib # Usar pathlib para manipulação de caminhos mais moderna
+import threading
 
-# Importar constantes e as funções de busca de caminho
-from radio_player.constants import get_data_path, get_user_data_path # <<< Importar novas funções
+from radio_player.constants import BUFFER_PROFILES
+from radio_player.core.importer import iter_station_records, station_from_record
+from radio_player.core.saver import CLOSE_TIMEOUT, BackgroundSaver
+from radio_player.core.station import Station
+from radio_player.core.storage import StationStorage, create_station_storage
 
 logger = logging.getLogger(__name__)
 
@@ -13,156 +15,212 @@ logger = logging.getLogger(__name__)
 class StationManager:
     """Gerencia o carregamento, salvamento e acesso às estações de rádio."""
 
-    def __init__(self):
+    def __init__(self, storage: StationStorage | None = None, write_behind: bool = False, save_delay: float = 0.5):
         """
         Inicializa o StationManager.
-        Define os caminhos corretos e carrega as estações.
+        Carrega as estações do backend de persistência.
+
+        Args:
+            storage: Backend de persistência. Por padrão usa o definido em
+                     constants.STATION_STORAGE_BACKEND (stations.json com journal).
+            write_behind: Se True, as gravações são agrupadas e feitas por uma
+                          thread de trabalho (ver BackgroundSaver). Nesse modo os
+                          métodos de alteração retornam assim que a memória é
+                          atualizada; falhas de gravação são informadas pelo
+                          callback de set_save_error_callback(). É obrigatório
+                          chamar close() (ou flush()) antes de sair.
+            save_delay: Intervalo (s) sem alterações antes de gravar no modo write_behind.
         """
-        # Define os caminhos usando as funções de constants.py
-        self.user_stations_path = get_user_data_path("stations.json") # Onde salvar/ler dados do usuário
-        self.default_stations_path = get_data_path("assets/stations.json") # De onde carregar o padrão
+        self.storage = storage if storage is not None else create_station_storage()
+        self._data_lock = threading.RLock() # Protege lista/índices contra leitura pela thread de gravação
+        self._io_lock = threading.Lock() # Serializa o acesso ao backend
+        self._save_error_callback = None
+
+        self.stations = self.storage.load() # Carrega as estações (do usuário ou padrão)
+
+        # Índices em memória para buscas O(1) (a lista mantém a ordem da combobox)
+        self._stations_by_name: dict[str, Station] = {} # nome -> registro da estação
+        self._names_by_url: dict[str, set[str]] = {} # url -> nomes que usam essa URL
+        # Visões derivadas da lista, reconstruídas sob demanda quando 'generation' muda
+        self.generation = 0 # Incrementado a cada alteração da lista
+        self._names_cache: list[str] | None = None
+        self._positions_cache: dict[str, int] | None = None
+        self._change_listeners = [] # Ver add_change_listener()
+        self._rebuild_index()
+
+        # Estado dos batches (ver batch())
+        self._batch_depth = 0
+        self._pending_operations: list[dict] = []
+        self.last_batch_saved = True
+
+        self._saver = None
+        if write_behind:
+            self._saver = BackgroundSaver(self._write_now, delay=save_delay, on_error=self._on_save_error)
 
-        logger.info(f"Caminho padrão das estações (pacote): {self.default_stations_path}")
-        logger.info(f"Caminho das estações do usuário: {self.user_stations_path}")
+    # --- Índices ---
 
-        # A função get_user_data_path já garante que o diretório exista
+    def _rebuild_index(self):
+        """Reconstrói os índices nome->registro e url->nomes a partir de self.stations."""
+        self._stations_by_name = {}
+        self._names_by_url = {}
+        for station in self.stations:
+            self._index_add(station)
+        self._invalidate_views()
+        logger.debug(f"Índice de estações reconstruído com {len(self._stations_by_name)} entradas.")
+
+    def _index_add(self, station: Station):
+        """Registra uma estação nos índices."""
+        name = station.name
+        url = station.url
+        if name in self._stations_by_name:
+            # Nome duplicado no arquivo: mantém a primeira ocorrência, como a busca linear fazia
+            logger.warning(f"Nome de estação duplicado ignorado no índice: '{name}'")
+            return
+        self._stations_by_name[name] = station
+        self._names_by_url.setdefault(url, set()).add(name)
 
-        self.stations = self._load_stations() # Carrega as estações (do usuário ou padrão)
+    def _index_remove(self, station: Station):
+        """Remove uma estação dos índices."""
+        name = station.name
+        url = station.url
+        if self._stations_by_name.get(name) is station:
+            del self._stations_by_name[name]
+        names = self._names_by_url.get(url)
+        if names is not None:
+            names.discard(name)
+            if not names:
+                del self._names_by_url[url]
 
+    def _invalidate_views(self):
+        """Marca a lista como alterada: as visões em cache serão reconstruídas no próximo acesso."""
+        self.generation += 1
+        self._names_cache = None
+        self._positions_cache = None
 
-    def _load_stations(self) -> list[dict]:
+    def add_change_listener(self, callback):
         """
-        Carrega as estações do arquivo do usuário.
-        Se não existir, tenta copiar do arquivo padrão do pacote.
-        Retorna uma lista de dicionários de estações ou uma lista vazia em caso de erro.
+        Registra callback(generation, removed_name, added_name), chamado após
+        cada alteração de uma estação (add: só added_name; remove: só
+        removed_name; renomear: ambos), na thread que fez a alteração e com a
+        lista travada. Quem receber gerações com intervalo perdeu alterações
+        (ex: recarga completa) e deve reconstruir o que deriva da lista.
         """
-        stations_data = []
-        try:
-            # 1. Tenta carregar do arquivo do usuário
-            logger.debug(f"Tentando carregar estações de: {self.user_stations_path}")
-            with open(self.user_stations_path, 'r', encoding='utf-8') as f:
-                stations_data = json.load(f)
-            logger.info(f"Estações carregadas com sucesso de '{self.user_stations_path}'.")
-
-        except FileNotFoundError:
-            logger.info(f"Arquivo de estações do usuário '{self.user_stations_path}' não encontrado.")
-            # 2. Se o arquivo do usuário não existe, tenta carregar do padrão do pacote
+        self._change_listeners.append(callback)
+
+    def _notify_change(self, removed: str | None, added: str | None):
+        for callback in self._change_listeners:
             try:
-                logger.debug(f"Tentando carregar estações padrão de: {self.default_stations_path}")
-                if self.default_stations_path.exists(): # Usa .exists() de pathlib
-                    with open(self.default_stations_path, 'r', encoding='utf-8') as f_default:
-                        stations_data = json.load(f_default)
-                    logger.info(f"Estações padrão carregadas de '{self.default_stations_path}'.")
-
-                    # 3. Tenta copiar o arquivo padrão para o local do usuário na primeira vez
-                    try:
-                        # Garante que o diretório pai exista antes de escrever
-                        self.user_stations_path.parent.mkdir(parents=True, exist_ok=True)
-                        with open(self.user_stations_path, 'w', encoding='utf-8') as f_user:
-                            json.dump(stations_data, f_user, indent=4, ensure_ascii=False)
-                        logger.info(f"Estações padrão copiadas para '{self.user_stations_path}'.")
-                    except IOError as e_copy:
-                        logger.error(f"Falha ao copiar estações padrão para '{self.user_stations_path}': {e_copy}")
-                        # Continua com os dados carregados do padrão, mas não foram salvos para o usuário
-                else:
-                    logger.warning(f"Arquivo de estações padrão '{self.default_stations_path}' também não encontrado. Iniciando com lista vazia.")
-                    stations_data = [] # Inicia vazio se nem o padrão existe
-
-            except json.JSONDecodeError as e_json_default:
-                logger.error(f"Erro ao decodificar JSON do arquivo padrão '{self.default_stations_path}': {e_json_default}. Iniciando com lista vazia.")
-                stations_data = []
-            except IOError as e_io_default:
-                logger.error(f"Erro de I/O ao ler arquivo padrão '{self.default_stations_path}': {e_io_default}. Iniciando com lista vazia.")
-                stations_data = []
-            except Exception as e: # Captura outras exceções ao carregar o padrão
-                logger.error(f"Erro inesperado ao carregar/copiar estações padrão de '{self.default_stations_path}': {e}", exc_info=True)
-                stations_data = []
-
-
-        except json.JSONDecodeError as e_json:
-            logger.error(f"Erro ao decodificar JSON do arquivo do usuário '{self.user_stations_path}': {e_json}. Backup pode estar corrompido ou arquivo inválido. Iniciando com lista vazia.")
-            # Poderia tentar carregar um backup aqui se implementado
-            stations_data = []
-        except IOError as e_io:
-            logger.error(f"Erro de I/O ao ler arquivo do usuário '{self.user_stations_path}': {e_io}. Iniciando com lista vazia.")
-            stations_data = []
-        except Exception as e:
-            logger.error(f"Erro inesperado ao carregar estações de '{self.user_stations_path}': {e}", exc_info=True)
-            stations_data = []
-
-        # Validação básica da estrutura carregada
-        if not isinstance(stations_data, list) or not all(isinstance(item, dict) and "name" in item and "url" in item for item in stations_data):
-            logger.warning(f"Dados carregados de '{self.user_stations_path}' não são uma lista de dicionários válida (esperado 'name' e 'url'). Resetando para lista vazia.")
-            stations_data = []
-            # Tenta salvar a lista vazia para corrigir o arquivo corrompido (se possível)
-            self._save_stations(stations_data)
-
-
-        return stations_data
-
-    def _save_stations(self, stations_list=None):
-        """
-        Salva a lista de estações atual no arquivo do usuário.
-        Sempre salva em ~/.local/share/..., nunca em /usr/share/...
-        """
-        if stations_list is None:
-            stations_list = self.stations
-
-        logger.debug(f"Tentando salvar {len(stations_list)} estações em: {self.user_stations_path}")
-        try:
-            # Garante que o diretório pai exista antes de escrever
-            self.user_stations_path.parent.mkdir(parents=True, exist_ok=True)
-            # Cria um arquivo temporário para escrita segura (evita corromper em caso de falha)
-            temp_file_path = self.user_stations_path.with_suffix(".tmp")
-            with open(temp_file_path, 'w', encoding='utf-8') as f:
-                json.dump(stations_list, f, indent=4, ensure_ascii=False) # ensure_ascii=False para nomes com acentos
-
-            # Renomeia o arquivo temporário para o final (operação atômica na maioria dos sistemas)
-            os.replace(temp_file_path, self.user_stations_path) # Use os.replace para atomicidade
-            logger.info(f"Estações salvas com sucesso em '{self.user_stations_path}'.")
-            return True
-        except IOError as e:
-            logger.error(f"Erro de I/O ao salvar estações em '{self.user_stations_path}': {e}", exc_info=True)
-            # Tenta remover o arquivo temporário se ele existir
-            if temp_file_path.exists():
-                try:
-                    temp_file_path.unlink()
-                except OSError:
-                    pass
-            return False
-        except Exception as e:
-            logger.error(f"Erro inesperado ao salvar estações: {e}", exc_info=True)
-            if 'temp_file_path' in locals() and temp_file_path.exists():
-                try:
-                    temp_file_path.unlink()
-                except OSError:
-                    pass
-            return False
+                callback(self.generation, removed, added)
+            except Exception as e:
+                logger.error(f"Erro no listener de alterações das estações: {e}", exc_info=True)
+
+    # --- Consultas ---
 
     def get_station_names(self) -> list[str]:
-        """Retorna uma lista com os nomes de todas as estações."""
-        return [station.get("name", "Nome Inválido") for station in self.stations]
+        """
+        Retorna os nomes de todas as estações, na ordem da lista.
+        A lista é um cache compartilhado, reconstruído apenas quando as estações
+        mudam (ver 'generation'): não deve ser modificada por quem a recebe.
+        """
+        if self._names_cache is None:
+            self._names_cache = [station.name for station in self.stations]
+        return self._names_cache
+
+    def get_station_names_snapshot(self) -> tuple[int, list[str]]:
+        """(generation, nomes) lidos juntos, para quem lê a lista fora da thread que a altera."""
+        with self._data_lock:
+            return self.generation, self.get_station_names()
+
+    @property
+    def station_count(self) -> int:
+        """Número de estações (O(1), sem copiar a lista de nomes)."""
+        return len(self.stations)
+
+    def index_of(self, name: str) -> int | None:
+        """Retorna a posição da estação na lista (ordem da combobox), ou None se não existir."""
+        if self._positions_cache is None:
+            positions = {}
+            for position, station in enumerate(self.stations):
+                positions.setdefault(station.name, position)
+            self._positions_cache = positions
+        return self._positions_cache.get(name)
+
+    def get_station_name_at(self, index: int) -> str:
+        """Retorna o nome da estação na posição indicada (aceita índices negativos)."""
+        return self.stations[index].name
 
     def get_station_url(self, name: str) -> str | None:
         """Retorna a URL da estação com o nome fornecido, ou None se não encontrada."""
-        for station in self.stations:
-            if station.get("name") == name:
-                return station.get("url")
-        return None
+        station = self._stations_by_name.get(name)
+        if station is None:
+            return None
+        return station.url
+
+    def get_station(self, name: str) -> Station | None:
+        """Retorna o registro da estação com o nome fornecido, ou None se não encontrada."""
+        return self._stations_by_name.get(name)
+
+    def has_station(self, name: str) -> bool:
+        """Verifica se existe uma estação com o nome fornecido."""
+        return name in self._stations_by_name
+
+    def get_station_names_by_url(self, url: str) -> list[str]:
+        """Retorna os nomes das estações que usam a URL fornecida."""
+        return sorted(self._names_by_url.get(url, ()))
 
-    def add_station(self, name: str, url: str) -> bool:
-        """Adiciona uma nova estação à lista e salva. Retorna False se o nome já existe."""
+    # --- Mutações ---
+    # Os métodos _apply_* alteram apenas a memória (lista + índices); os métodos
+    # públicos validam, aplicam e persistem a operação correspondente.
+
+    def _apply_add(self, station: Station) -> Station:
+        """Anexa uma nova estação à lista e aos índices."""
+        with self._data_lock:
+            self.stations.append(station)
+            self._index_add(station)
+            self._invalidate_views()
+            self._notify_change(None, station.name)
+        return station
+
+    def _apply_update(self, station: Station, new_name: str, new_url: str):
+        """Atualiza o registro no lugar (mantém a posição na lista) e reindexa."""
+        with self._data_lock:
+            self._index_remove(station)
+            old_name = station.name
+            station.name = new_name
+            station.url = new_url
+            self._index_add(station)
+            self._invalidate_views()
+            self._notify_change(old_name, new_name)
+
+    def _apply_remove(self, station: Station):
+        """Remove o registro da lista e dos índices."""
+        with self._data_lock:
+            self._index_remove(station)
+            # Usa a posição em cache se ainda for válida; senão procura pela identidade
+            # do registro (o índice garante que ele está na lista)
+            position = self._positions_cache.get(station.name) if self._positions_cache is not None else None
+            if position is None or self.stations[position] is not station:
+                position = next(i for i, item in enumerate(self.stations) if item is station)
+            del self.stations[position]
+            self._invalidate_views()
+            self._notify_change(station.name, None)
+
+    def add_station(self, name: str, url: str, **metadata) -> bool:
+        """
+        Adiciona uma nova estação à lista e salva. Retorna False se o nome já existe.
+        Campos opcionais de Station (tags, country, codec, bitrate, uuid,
+        buffer_profile) podem ser passados como argumentos nomeados.
+        """
         if not name or not url:
             logger.warning("Tentativa de adicionar estação com nome ou URL vazios.")
             return False
-        if self.get_station_url(name) is not None:
+        if self.has_station(name):
             logger.warning(f"Tentativa de adicionar estação com nome duplicado: '{name}'")
             return False
 
-        new_station = {"name": name, "url": url}
-        self.stations.append(new_station)
+        station = self._apply_add(Station(name, url, **metadata))
         logger.info(f"Estação '{name}' adicionada à lista em memória.")
-        return self._save_stations() # Salva a lista atualizada
+        return self._persist({"op": "add", **station.to_dict()})
 
     def update_station(self, old_name: str, new_name: str, new_url: str) -> bool:
         """Atualiza o nome e/ou URL de uma estação existente e salva."""
@@ -171,33 +229,241 @@ class StationManager:
              return False
 
         # Verifica duplicidade do novo nome (se for diferente do antigo)
-        if new_name != old_name and self.get_station_url(new_name) is not None:
+        if new_name != old_name and self.has_station(new_name):
              logger.warning(f"Tentativa de renomear para nome duplicado: '{new_name}'")
              return False
 
-        updated = False
-        for station in self.stations:
-            if station.get("name") == old_name:
-                station["name"] = new_name
-                station["url"] = new_url
-                updated = True
-                logger.info(f"Estação '{old_name}' atualizada para '{new_name}' em memória.")
-                break # Para após encontrar e atualizar
-
-        if updated:
-            return self._save_stations() # Salva a lista atualizada
-        else:
+        station = self._stations_by_name.get(old_name)
+        if station is None:
             logger.error(f"Estação '{old_name}' não encontrada para atualização.")
             return False
 
+        self._apply_update(station, new_name, new_url)
+        logger.info(f"Estação '{old_name}' atualizada para '{new_name}' em memória.")
+        return self._persist({"op": "update", "old_name": old_name, "name": new_name, "url": new_url})
+
     def remove_station(self, name: str) -> bool:
         """Remove uma estação pelo nome e salva."""
-        original_length = len(self.stations)
-        self.stations = [station for station in self.stations if station.get("name") != name]
-
-        if len(self.stations) < original_length:
-            logger.info(f"Estação '{name}' removida da lista em memória.")
-            return self._save_stations() # Salva a lista atualizada
-        else:
+        station = self._stations_by_name.get(name)
+        if station is None:
             logger.warning(f"Estação '{name}' não encontrada para remoção.")
             return False
+
+        self._apply_remove(station)
+        logger.info(f"Estação '{name}' removida da lista em memória.")
+        return self._persist({"op": "remove", "name": name})
+
+    def set_buffer_profile(self, name: str, profile: str | None) -> bool:
+        """
+        Define o perfil de buffer da estação (chave de BUFFER_PROFILES, ou None
+        para usar o perfil global) e salva.
+        """
+        if profile is not None and profile not in BUFFER_PROFILES:
+            logger.warning(f"Perfil de buffer desconhecido: '{profile}'")
+            return False
+        station = self._stations_by_name.get(name)
+        if station is None:
+            logger.error(f"Estação '{name}' não encontrada para definir o perfil de buffer.")
+            return False
+        if station.buffer_profile == profile:
+            return True
+        with self._data_lock:
+            station.buffer_profile = profile
+        logger.info(f"Perfil de buffer da estação '{name}' definido como '{profile or 'global'}'.")
+        return self._persist({"op": "set_buffer_profile", "name": name, "buffer_profile": profile})
+
+    def import_stations(self, path, batch_size: int = 5000, dedupe_urls: bool = True, progress_callback=None) -> tuple[int, int]:
+        """
+        Importa estações de um arquivo potencialmente enorme (array JSON ou NDJSON,
+        ex: dump do Radio Browser), lendo registro a registro.
+
+        Cada registro é validado e deduplicado na hora (por nome e, opcionalmente,
+        por URL, usando os índices), e as estações são gravadas a cada
+        'batch_size' registros aceitos, então a memória usada pela leitura não
+        depende do tamanho do arquivo. O armazenamento é consolidado uma única
+        vez, ao final da importação.
+
+        Args:
+            path: Arquivo a importar.
+            batch_size: Estações aceitas por gravação.
+            dedupe_urls: Se True, ignora registros cuja URL já existe na lista.
+            progress_callback: Opcional, chamado como progress_callback(adicionadas, ignoradas)
+                               após cada lote gravado.
+
+        Returns:
+            Tupla (adicionadas, ignoradas).
+
+        Raises:
+            OSError, ValueError, json.JSONDecodeError: Se o arquivo não puder ser lido.
+        """
+        added = 0
+        skipped = 0
+        in_batch = 0
+        logger.info(f"Importando estações de '{path}' (lotes de {batch_size}).")
+        records = iter_station_records(path)
+        # Os lotes só crescem o journal; o snapshot é reescrito uma vez no final
+        with self.storage.suspend_compaction():
+            while True:
+                with self.batch():
+                    for record in records:
+                        station = station_from_record(record)
+                        if station is None:
+                            skipped += 1
+                            continue
+                        if self.has_station(station.name) or (dedupe_urls and station.url in self._names_by_url):
+                            skipped += 1
+                            continue
+                        self._apply_add(station)
+                        self._persist({"op": "add", **station.to_dict()})
+                        added += 1
+                        in_batch += 1
+                        if in_batch >= batch_size:
+                            break
+                    else:
+                        # Arquivo esgotado: grava o último lote ao sair do batch()
+                        in_batch = -1
+                if progress_callback:
+                    progress_callback(added, skipped)
+                if in_batch < 0:
+                    break
+                in_batch = 0
+            self.flush() # Os lotes entregues à thread de gravação ainda sem compactação
+        if added:
+            self.compact()
+
+        logger.info(f"Importação de '{path}' concluída: {added} adicionada(s), {skipped} ignorada(s).")
+        return added, skipped
+
+    # --- Persistência ---
+
+    def _persist(self, operation: dict) -> bool:
+        """
+        Persiste no backend uma operação já aplicada em memória.
+        Dentro de um batch() a operação apenas é enfileirada para a gravação única no final.
+        """
+        if self._batch_depth > 0:
+            self._pending_operations.append(operation)
+            return True
+        return self._write([operation])
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Agrupa várias alterações em uma única gravação no disco.
+
+        Uso:
+            with station_manager.batch():
+                station_manager.add_station(...)
+                station_manager.remove_station(...)
+
+        As validações (nome duplicado, estação inexistente) continuam imediatas,
+        feitas pelos índices em memória; apenas a persistência é adiada para a
+        saída do bloco. Batches aninhados gravam apenas ao sair do mais externo.
+        Se o bloco levantar uma exceção, as alterações já aplicadas em memória
+        são gravadas mesmo assim, para que memória e disco não divirjam.
+        O resultado da gravação fica em self.last_batch_saved.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self.last_batch_saved = self._commit_pending()
+
+    def _commit_pending(self) -> bool:
+        """Grava de uma vez as operações acumuladas pelo batch."""
+        operations, self._pending_operations = self._pending_operations, []
+        if not operations:
+            return True
+        logger.info(f"Gravando {len(operations)} alteração(ões) de estações em lote.")
+        saved = self._write(operations)
+        if not saved:
+            logger.error(f"Falha ao gravar {len(operations)} alteração(ões) em lote.")
+        return saved
+
+    def add_stations(self, stations: list) -> int:
+        """
+        Adiciona várias estações com uma única gravação. Cada item pode ser um
+        par (nome, url) ou uma Station (cujos campos opcionais são preservados).
+        Entradas inválidas ou com nome duplicado são ignoradas.
+        Retorna o número de estações adicionadas.
+        """
+        added = 0
+        with self.batch():
+            for item in stations:
+                if isinstance(item, Station):
+                    metadata = {field: getattr(item, field) for field in Station.OPTIONAL_FIELDS
+                                if getattr(item, field) is not None}
+                    ok = self.add_station(item.name, item.url, **metadata)
+                else:
+                    name, url = item
+                    ok = self.add_station(name, url)
+                if ok:
+                    added += 1
+        logger.info(f"{added} de {len(stations)} estação(ões) adicionada(s) em lote.")
+        return added
+
+    def _write(self, operations: list[dict]) -> bool:
+        """Grava as operações agora ou as entrega à thread de gravação (write-behind)."""
+        if self._saver:
+            self._saver.submit(operations)
+            return True
+        return self._write_now(operations)
+
+    def _write_now(self, operations: list[dict]) -> bool:
+        """Grava as operações no backend (na thread de gravação, no modo write-behind)."""
+        def get_stations():
+            if not self._saver:
+                return self.stations
+            # A thread principal pode continuar alterando a lista: grava uma cópia.
+            # Só é pedida quando o backend reescreve tudo (compactação), não a cada journal
+            with self._data_lock:
+                return [station.copy() for station in self.stations]
+
+        with self._io_lock:
+            return self.storage.commit(operations, get_stations)
+
+    def set_save_error_callback(self, callback):
+        """
+        Define callback(mensagem) chamado quando uma gravação em segundo plano falha.
+        Atenção: o callback é executado na thread de gravação, não na do Tkinter.
+        """
+        self._save_error_callback = callback
+
+    def _on_save_error(self, message: str):
+        """Repassa falhas da thread de gravação para o callback registrado."""
+        logger.error(message)
+        if self._save_error_callback:
+            self._save_error_callback(message)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Espera a gravação das alterações pendentes. Retorna True se tudo foi salvo."""
+        if self._saver:
+            return self._saver.flush(timeout)
+        return True
+
+    def compact(self) -> bool:
+        """Consolida o armazenamento (ex: incorpora o journal ao stations.json)."""
+        self.flush()
+        with self._io_lock:
+            return self.storage.compact(self.stations)
+
+    def close(self):
+        """
+        Grava o que estiver pendente, consolida e libera o backend (chamar ao sair).
+        Nunca espera indefinidamente pela thread de gravação.
+        """
+        if self._saver:
+            self._save_error_callback = None # Falhas ao fechar vão só para o log
+            if not self._saver.close(CLOSE_TIMEOUT):
+                logger.error("Nem todas as alterações de estações puderam ser gravadas ao fechar.")
+            self._saver = None
+        if not self._io_lock.acquire(timeout=CLOSE_TIMEOUT):
+            logger.error("Gravação de estações ainda em andamento; encerrando sem consolidar o armazenamento.")
+            return
+        try:
+            self.storage.compact(self.stations)
+            self.storage.close()
+        finally:
+            self._io_lock.release()
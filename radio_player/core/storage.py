@@ -0,0 +1,549 @@
+# /home/marcos/projeto1/radio_player/core/storage.py
+"""
+Backends de persistência das estações.
+
+O StationManager mantém a lista e os índices em memória e delega a gravação a
+um StationStorage. Cada alteração é descrita por uma operação (dict com a chave
+"op" = "add" | "update" | "remove" | "set_buffer_profile"), o que permite a
+cada backend persistir de forma incremental.
+"""
+import contextlib
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+
+from radio_player.constants import BUFFER_PROFILES, STATION_STORAGE_BACKEND, STATIONS_COMPACT_FORMAT, get_data_path, get_user_data_path
+from radio_player.core.station import Station
+
+logger = logging.getLogger(__name__)
+
+
+class StationStorage:
+    """Interface comum dos backends de persistência de estações."""
+
+    def load(self) -> list[Station]:
+        """Carrega as estações persistidas, na ordem em que devem ser exibidas."""
+        raise NotImplementedError
+
+    def commit(self, operations: list[dict], get_stations) -> bool:
+        """
+        Persiste operações já aplicadas em memória.
+
+        Args:
+            operations: As operações a persistir, em ordem.
+            get_stations: Função que retorna a lista completa atual, chamada só
+                          quando o backend precisa reescrever tudo (montar a
+                          lista pode exigir uma cópia cara).
+
+        Returns:
+            True se a gravação foi bem sucedida.
+        """
+        raise NotImplementedError
+
+    def compact(self, stations: list[Station]) -> bool:
+        """Consolida o armazenamento (ex: ao fechar a aplicação)."""
+        return True
+
+    @contextlib.contextmanager
+    def suspend_compaction(self):
+        """
+        Adia a consolidação automática durante uma sequência longa de gravações
+        (ex: importação em lotes); quem chama consolida uma vez no final.
+        """
+        yield self
+
+    def close(self):
+        """Libera recursos do backend."""
+
+
+class JsonStationStorage(StationStorage):
+    """
+    Armazena as estações em stations.json.
+
+    Com o journal ativo, cada alteração é anexada a stations.journal em vez de
+    reescrever o arquivo inteiro; o journal é compactado no snapshot quando
+    atinge JOURNAL_COMPACT_THRESHOLD operações.
+    """
+
+    # Número de operações no journal que dispara a compactação no snapshot
+    JOURNAL_COMPACT_THRESHOLD = 500
+    # Versão do envelope gravado no formato compacto (ver parse_stations_data)
+    SCHEMA_VERSION = 2
+
+    def __init__(self, user_stations_path=None, default_stations_path=None, journal_path=None, use_journal: bool = True, compact_format: bool = False):
+        """
+        Args:
+            user_stations_path: Snapshot do usuário (padrão: ~/.local/share/.../stations.json).
+            default_stations_path: Estações padrão do pacote, copiadas na primeira execução.
+            journal_path: Log de alterações (padrão: stations.journal ao lado do snapshot).
+            use_journal: Se False, toda alteração reescreve o snapshot completo.
+            compact_format: Se True, grava o envelope versionado com o mapeamento
+                            {nome: url}; se False (padrão), grava a lista de
+                            {"name", "url"}, que versões antigas do app também leem.
+                            Os dois formatos são sempre aceitos na leitura.
+        """
+        self.user_stations_path = pathlib.Path(user_stations_path) if user_stations_path else get_user_data_path("stations.json")
+        self.default_stations_path = pathlib.Path(default_stations_path) if default_stations_path else get_data_path("assets/stations.json")
+        self.user_journal_path = pathlib.Path(journal_path) if journal_path else self.user_stations_path.with_name("stations.journal")
+        self.use_journal = use_journal
+        self.compact_format = compact_format
+        self._journal_entries = 0 # Operações no journal desde a última compactação
+        self._compaction_suspended = 0 # > 0 dentro de suspend_compaction()
+
+        logger.info(f"Caminho padrão das estações (pacote): {self.default_stations_path}")
+        logger.info(f"Caminho das estações do usuário: {self.user_stations_path}")
+
+    def load(self) -> list[Station]:
+        """Carrega o snapshot e reaplica sobre ele as operações do journal."""
+        stations = self._load_snapshot()
+        if self.use_journal:
+            operations = self._read_journal()
+            self._journal_entries = len(operations)
+            if operations:
+                stations = self._replay(stations, operations)
+                if self._journal_entries >= self.JOURNAL_COMPACT_THRESHOLD:
+                    self._compact_journal(stations)
+        return stations
+
+    def _load_snapshot(self) -> list[Station]:
+        """
+        Carrega as estações do arquivo do usuário.
+        Se não existir, tenta copiar do arquivo padrão do pacote.
+        Retorna uma lista de estações ou uma lista vazia em caso de erro.
+        """
+        stations_data = []
+        try:
+            # 1. Tenta carregar do arquivo do usuário
+            logger.debug(f"Tentando carregar estações de: {self.user_stations_path}")
+            with open(self.user_stations_path, 'r', encoding='utf-8') as f:
+                stations_data = self.parse_stations_data(json.load(f), self.user_stations_path)
+            logger.info(f"Estações carregadas com sucesso de '{self.user_stations_path}'.")
+
+        except FileNotFoundError:
+            logger.info(f"Arquivo de estações do usuário '{self.user_stations_path}' não encontrado.")
+            # 2. Se o arquivo do usuário não existe, tenta carregar do padrão do pacote
+            try:
+                logger.debug(f"Tentando carregar estações padrão de: {self.default_stations_path}")
+                if self.default_stations_path.exists(): # Usa .exists() de pathlib
+                    with open(self.default_stations_path, 'r', encoding='utf-8') as f_default:
+                        stations_data = self.parse_stations_data(json.load(f_default), self.default_stations_path)
+                    if stations_data is None:
+                        logger.warning(f"Formato não reconhecido no arquivo padrão '{self.default_stations_path}'. Iniciando com lista vazia.")
+                        stations_data = []
+                    logger.info(f"Estações padrão carregadas de '{self.default_stations_path}'.")
+
+                    # 3. Tenta copiar o arquivo padrão para o local do usuário na primeira vez
+                    # (save_snapshot já registra o erro; em caso de falha continua com os dados do padrão)
+                    if self.save_snapshot(stations_data):
+                        logger.info(f"Estações padrão copiadas para '{self.user_stations_path}'.")
+                    return stations_data
+                else:
+                    logger.warning(f"Arquivo de estações padrão '{self.default_stations_path}' também não encontrado. Iniciando com lista vazia.")
+                    stations_data = [] # Inicia vazio se nem o padrão existe
+
+            except json.JSONDecodeError as e_json_default:
+                logger.error(f"Erro ao decodificar JSON do arquivo padrão '{self.default_stations_path}': {e_json_default}. Iniciando com lista vazia.")
+                stations_data = []
+            except IOError as e_io_default:
+                logger.error(f"Erro de I/O ao ler arquivo padrão '{self.default_stations_path}': {e_io_default}. Iniciando com lista vazia.")
+                stations_data = []
+            except Exception as e: # Captura outras exceções ao carregar o padrão
+                logger.error(f"Erro inesperado ao carregar/copiar estações padrão de '{self.default_stations_path}': {e}", exc_info=True)
+                stations_data = []
+
+
+        except json.JSONDecodeError as e_json:
+            logger.error(f"Erro ao decodificar JSON do arquivo do usuário '{self.user_stations_path}': {e_json}. Backup pode estar corrompido ou arquivo inválido. Iniciando com lista vazia.")
+            # Poderia tentar carregar um backup aqui se implementado
+            stations_data = []
+        except IOError as e_io:
+            logger.error(f"Erro de I/O ao ler arquivo do usuário '{self.user_stations_path}': {e_io}. Iniciando com lista vazia.")
+            stations_data = []
+        except Exception as e:
+            logger.error(f"Erro inesperado ao carregar estações de '{self.user_stations_path}': {e}", exc_info=True)
+            stations_data = []
+
+        # A estrutura já foi validada durante a conversão; None indica formato desconhecido
+        if stations_data is None:
+            logger.warning(f"Dados carregados de '{self.user_stations_path}' não estão em um formato de estações reconhecido. Resetando para lista vazia.")
+            stations_data = []
+            # Tenta salvar a lista vazia para corrigir o arquivo corrompido (se possível)
+            self.save_snapshot(stations_data)
+
+
+        return stations_data
+
+    @classmethod
+    def parse_stations_data(cls, data, source="") -> list[Station] | None:
+        """
+        Converte o conteúdo de um stations.json em lista de estações, em uma única passada.
+
+        Formatos aceitos:
+            - Lista de {"name", "url"} (formato original, versão 1).
+            - Mapeamento compacto {nome: url} (formato do assets/stations.json).
+            - Envelope versionado {"schema_version": N, "stations": <lista ou mapeamento>};
+              no mapeamento, o valor pode ser a URL ou um dict com "url" e campos extras.
+
+        Entradas inválidas são descartadas individualmente (com aviso), sem
+        invalidar o arquivo inteiro. Retorna None se o formato não for reconhecido.
+        """
+        if isinstance(data, dict) and "schema_version" in data:
+            version = data.get("schema_version")
+            if not isinstance(version, int) or version > cls.SCHEMA_VERSION:
+                logger.warning(f"Versão de esquema {version!r} em '{source}' é mais nova que a suportada ({cls.SCHEMA_VERSION}). Tentando ler mesmo assim.")
+            data = data.get("stations")
+
+        stations = []
+        skipped = 0
+        if isinstance(data, dict):
+            for name, value in data.items():
+                if isinstance(value, str):
+                    if name and value:
+                        stations.append(Station(name, value))
+                        continue
+                elif isinstance(value, dict) and isinstance(value.get("url"), str) and name and value["url"]:
+                    value["name"] = name
+                    stations.append(Station.from_dict(value))
+                    continue
+                skipped += 1
+        elif isinstance(data, list):
+            for item in data:
+                if isinstance(item, dict) and isinstance(item.get("name"), str) and isinstance(item.get("url"), str) and item["name"] and item["url"]:
+                    stations.append(Station.from_dict(item))
+                else:
+                    skipped += 1
+        else:
+            return None
+
+        if skipped:
+            logger.warning(f"{skipped} entrada(s) inválida(s) ignorada(s) em '{source}'.")
+        return stations
+
+    def _serialize(self, stations_list: list[Station]):
+        """Monta o conteúdo a gravar no stations.json no formato configurado."""
+        if not self.compact_format:
+            return [station.to_dict() for station in stations_list]
+        compact = {}
+        for station in stations_list:
+            if not station.has_metadata():
+                # Apenas nome e URL: grava só a URL como valor
+                compact[station.name] = station.url
+            else:
+                extra = station.to_dict()
+                del extra["name"]
+                compact[station.name] = extra
+        return {"schema_version": self.SCHEMA_VERSION, "stations": compact}
+
+    def save_snapshot(self, stations_list: list[Station]) -> bool:
+        """
+        Salva a lista de estações fornecida no arquivo do usuário.
+        Sempre salva em ~/.local/share/..., nunca em /usr/share/...
+        """
+
+        logger.debug(f"Tentando salvar {len(stations_list)} estações em: {self.user_stations_path}")
+        try:
+            # Garante que o diretório pai exista antes de escrever
+            self.user_stations_path.parent.mkdir(parents=True, exist_ok=True)
+            # Cria um arquivo temporário para escrita segura (evita corromper em caso de falha)
+            temp_file_path = self.user_stations_path.with_suffix(".tmp")
+            with open(temp_file_path, 'w', encoding='utf-8') as f:
+                # ensure_ascii=False para nomes com acentos; o formato compacto dispensa indentação
+                indent = None if self.compact_format else 4
+                json.dump(self._serialize(stations_list), f, indent=indent, ensure_ascii=False)
+
+            # Renomeia o arquivo temporário para o final (operação atômica na maioria dos sistemas)
+            os.replace(temp_file_path, self.user_stations_path) # Use os.replace para atomicidade
+            logger.info(f"Estações salvas com sucesso em '{self.user_stations_path}'.")
+            return True
+        except IOError as e:
+            logger.error(f"Erro de I/O ao salvar estações em '{self.user_stations_path}': {e}", exc_info=True)
+            # Tenta remover o arquivo temporário se ele existir
+            if temp_file_path.exists():
+                try:
+                    temp_file_path.unlink()
+                except OSError:
+                    pass
+            return False
+        except Exception as e:
+            logger.error(f"Erro inesperado ao salvar estações: {e}", exc_info=True)
+            if 'temp_file_path' in locals() and temp_file_path.exists():
+                try:
+                    temp_file_path.unlink()
+                except OSError:
+                    pass
+            return False
+
+    def commit(self, operations: list[dict], get_stations) -> bool:
+        """
+        Anexa as operações ao journal e compacta quando o limite é atingido.
+        Sem journal (ou se ele não puder ser escrito), reescreve o snapshot inteiro.
+        """
+        if not self.use_journal:
+            return self.save_snapshot(get_stations())
+
+        if not self._compaction_suspended and self._journal_entries + len(operations) >= self.JOURNAL_COMPACT_THRESHOLD:
+            # Lote grande (ou journal já cheio): reescrever o snapshot uma vez é
+            # mais barato que anexar tudo ao journal e compactar em seguida
+            logger.info(f"Journal atingiria {self._journal_entries + len(operations)} operações. Compactando.")
+            return self._compact_journal(get_stations())
+
+        if not self._append_journal(operations):
+            # Sem journal utilizável: cai para a reescrita completa do snapshot
+            return self._compact_journal(get_stations())
+        return True
+
+    def compact(self, stations: list[Station]) -> bool:
+        """Incorpora o journal ao stations.json, se houver algo pendente."""
+        if not self.use_journal or self._journal_entries == 0:
+            return True
+        return self._compact_journal(stations)
+
+    @contextlib.contextmanager
+    def suspend_compaction(self):
+        """
+        Só anexa ao journal, sem compactar ao atingir o limite: numa importação
+        em lotes, reescrever o snapshot a cada lote custaria O(n²).
+        """
+        self._compaction_suspended += 1
+        try:
+            yield self
+        finally:
+            self._compaction_suspended -= 1
+
+    def _append_journal(self, operations: list[dict]) -> bool:
+        """Anexa operações ao journal (uma linha JSON por operação)."""
+        try:
+            lines = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in operations)
+            self.user_journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.user_journal_path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+            self._journal_entries += len(operations)
+            logger.debug(f"{len(operations)} operação(ões) anexada(s) ao journal '{self.user_journal_path}'.")
+            return True
+        except (IOError, OSError) as e:
+            logger.error(f"Erro de I/O ao escrever no journal '{self.user_journal_path}': {e}", exc_info=True)
+            return False
+
+    def _compact_journal(self, stations: list[Station]) -> bool:
+        """Grava o snapshot completo e descarta o journal já incorporado."""
+        if not self.save_snapshot(stations):
+            return False
+        try:
+            self.user_journal_path.unlink(missing_ok=True)
+        except OSError as e:
+            # O replay é idempotente, então um journal antigo não corrompe os dados
+            logger.warning(f"Não foi possível remover o journal '{self.user_journal_path}': {e}")
+        self._journal_entries = 0
+        logger.info("Journal de estações compactado no snapshot.")
+        return True
+
+    def _read_journal(self) -> list[dict]:
+        """Lê as operações do journal, ignorando linhas corrompidas."""
+        operations = []
+        if not self.user_journal_path.exists():
+            return operations
+        try:
+            with open(self.user_journal_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        operations.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Tipicamente a última linha, truncada por uma queda durante a escrita
+                        logger.warning(f"Linha {line_number} inválida no journal '{self.user_journal_path}'. Ignorando.")
+        except (IOError, OSError) as e:
+            logger.error(f"Erro de I/O ao ler o journal '{self.user_journal_path}': {e}", exc_info=True)
+        logger.info(f"{len(operations)} operação(ões) pendente(s) no journal.")
+        return operations
+
+    @staticmethod
+    def _replay(stations: list[Station], operations: list[dict]) -> list[Station]:
+        """
+        Reaplica as operações do journal sobre o snapshot carregado.
+        Operações que não se aplicam mais (ex: já incorporadas ao snapshot por uma
+        compactação interrompida) são ignoradas, tornando o replay idempotente.
+        """
+        by_name = {}
+        for station in stations:
+            by_name.setdefault(station.name, station)
+        removed = set() # ids dos registros removidos (filtrados no final, em uma passada)
+
+        for operation in operations:
+            if not isinstance(operation, dict):
+                continue
+            op = operation.get("op")
+            name = operation.get("name")
+            url = operation.get("url")
+            if op == "add":
+                if isinstance(name, str) and isinstance(url, str) and name and url and name not in by_name:
+                    station = Station.from_dict(operation)
+                    stations.append(station)
+                    by_name[name] = station
+            elif op == "update":
+                old_name = operation.get("old_name")
+                station = by_name.get(old_name)
+                if station is not None and name and url and (name == old_name or name not in by_name):
+                    del by_name[old_name]
+                    station.name = name
+                    station.url = url
+                    by_name[name] = station
+            elif op == "remove":
+                station = by_name.pop(name, None)
+                if station is not None:
+                    removed.add(id(station))
+            elif op == "set_buffer_profile":
+                station = by_name.get(name)
+                profile = operation.get("buffer_profile")
+                if station is not None:
+                    station.buffer_profile = profile if isinstance(profile, str) and profile in BUFFER_PROFILES else None
+            else:
+                logger.warning(f"Operação desconhecida no journal ignorada: {operation}")
+
+        if removed:
+            stations = [station for station in stations if id(station) not in removed]
+        logger.info(f"{len(operations)} operação(ões) do journal reaplicada(s).")
+        return stations
+
+
+class SqliteStationStorage(StationStorage):
+    """
+    Armazena as estações em um banco SQLite com colunas indexadas (nome, url, tags).
+
+    A ordem da lista é a ordem de inserção (coluna id); renomear uma estação
+    atualiza a linha no lugar e preserva sua posição. Na primeira execução as
+    estações do stations.json existente (ou do padrão do pacote) são migradas.
+    """
+
+    # As colunas dos campos opcionais de Station são criadas por _ensure_columns()
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS stations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            url TEXT NOT NULL,
+            tags TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_stations_url ON stations(url);
+        CREATE INDEX IF NOT EXISTS idx_stations_tags ON stations(tags);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, db_path=None, json_storage: JsonStationStorage | None = None):
+        """
+        Args:
+            db_path: Arquivo do banco (padrão: ~/.local/share/.../stations.db).
+            json_storage: Origem da migração única (padrão: JsonStationStorage()).
+        """
+        self.db_path = pathlib.Path(db_path) if db_path else get_user_data_path("stations.db")
+        self._json_storage = json_storage
+        logger.info(f"Banco de estações do usuário: {self.db_path}")
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # A conexão pode ser usada pela thread de gravação em segundo plano;
+        # o StationManager garante que apenas uma thread a use por vez
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(self.SCHEMA)
+        self._ensure_columns()
+
+        # Colunas gravadas/lidas, na ordem dos argumentos de Station
+        self._columns = ("name", "url") + Station.OPTIONAL_FIELDS
+        self._insert_sql = (
+            f"INSERT INTO stations ({', '.join(self._columns)}) "
+            f"VALUES ({', '.join('?' for _ in self._columns)})"
+        )
+
+    def _ensure_columns(self):
+        """Adiciona colunas para campos de Station que ainda não existem no banco."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(stations)")}
+        for field in Station.OPTIONAL_FIELDS:
+            if field not in existing:
+                self._conn.execute(f"ALTER TABLE stations ADD COLUMN {field}")
+                logger.info(f"Coluna '{field}' adicionada ao banco de estações.")
+        self._conn.commit()
+
+    def load(self) -> list[Station]:
+        """Carrega as estações do banco, migrando do JSON na primeira vez."""
+        if self._get_meta("json_migrated") is None:
+            self._migrate_from_json()
+        rows = self._conn.execute(f"SELECT {', '.join(self._columns)} FROM stations ORDER BY id")
+        # As linhas já foram validadas ao entrar no banco: nenhuma checagem extra no startup
+        stations = [Station(*row) for row in rows]
+        logger.info(f"{len(stations)} estações carregadas de '{self.db_path}'.")
+        return stations
+
+    def commit(self, operations: list[dict], get_stations) -> bool:
+        """Aplica as operações no banco em uma única transação (não precisa da lista)."""
+        try:
+            with self._conn: # Commit ao sair do bloco, rollback em caso de exceção
+                for operation in operations:
+                    self._execute_operation(operation)
+            logger.debug(f"{len(operations)} operação(ões) gravada(s) em '{self.db_path}'.")
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Erro do SQLite ao salvar estações em '{self.db_path}': {e}", exc_info=True)
+            return False
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+            logger.info("Conexão com o banco de estações fechada.")
+
+    def _execute_operation(self, operation: dict):
+        """Traduz uma operação em SQL (executada dentro da transação corrente)."""
+        op = operation.get("op")
+        if op == "add":
+            self._conn.execute(self._insert_sql, tuple(operation.get(column) for column in self._columns))
+        elif op == "update":
+            self._conn.execute(
+                "UPDATE stations SET name = ?, url = ? WHERE name = ?",
+                (operation["name"], operation["url"], operation["old_name"]),
+            )
+        elif op == "remove":
+            self._conn.execute("DELETE FROM stations WHERE name = ?", (operation["name"],))
+        elif op == "set_buffer_profile":
+            self._conn.execute(
+                "UPDATE stations SET buffer_profile = ? WHERE name = ?",
+                (operation.get("buffer_profile"), operation["name"]),
+            )
+        else:
+            logger.warning(f"Operação desconhecida ignorada: {operation}")
+
+    def _migrate_from_json(self):
+        """Importa uma única vez as estações do stations.json (snapshot + journal)."""
+        json_storage = self._json_storage or JsonStationStorage()
+        stations = json_storage.load()
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    self._insert_sql.replace("INSERT", "INSERT OR IGNORE", 1),
+                    (tuple(getattr(station, column) for column in self._columns) for station in stations),
+                )
+                self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', '1')")
+            logger.info(f"{len(stations)} estações migradas de '{json_storage.user_stations_path}' para '{self.db_path}'.")
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao migrar estações do JSON para o SQLite: {e}", exc_info=True)
+
+    def _get_meta(self, key: str) -> str | None:
+        """Lê um valor da tabela meta."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+
+def create_station_storage(backend: str | None = None) -> StationStorage:
+    """
+    Cria o backend de persistência pelo nome ("json" ou "sqlite").
+    Sem argumento, usa STATION_STORAGE_BACKEND de constants.py.
+    """
+    backend = (backend or STATION_STORAGE_BACKEND).lower()
+    if backend == "sqlite":
+        return SqliteStationStorage()
+    if backend != "json":
+        logger.warning(f"Backend de armazenamento desconhecido '{backend}'. Usando JSON.")
+    return JsonStationStorage(compact_format=STATIONS_COMPACT_FORMAT)
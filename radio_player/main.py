@@ -8,6 +8,8 @@ from tkinter import messagebox
 # Importar as classes principais da aplicação
 # Note os caminhos relativos agora que main.py está dentro de radio_player
 from .audio.player_handler import RadioPlayer
+from .audio.buffer_tuner import AdaptiveBufferController, BUFFER_TUNING_FILE_NAME
+from .constants import get_user_data_path
 from .ui.main_window import MainWindow
 from .core.stations import StationManager
 
@@ -26,8 +28,10 @@ def main():
     player = None # Inicializa como None
     try:
         # Inicializa os componentes principais
-        player = RadioPlayer() # Pode levantar RuntimeError
-        station_manager = StationManager() # Agora lida com caminhos de usuário/sistema
+        # O cache de rede de cada estação é ajustado pelos travamentos observados
+        buffer_tuner = AdaptiveBufferController(state_path=get_user_data_path(BUFFER_TUNING_FILE_NAME))
+        player = RadioPlayer(buffer_tuner=buffer_tuner) # Pode levantar RuntimeError
+        station_manager = StationManager(write_behind=True) # Grava em segundo plano; MainWindow faz o flush final
         logger.info("Gerenciador de estações carregado.")
 
         # Cria e executa a janela principal da UI
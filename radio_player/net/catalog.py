@@ -0,0 +1,366 @@
+# /home/marcos/projeto1/radio_player/net/catalog.py
+"""
+Catálogo local completo das estações do Radio Browser, para busca offline.
+
+O dump completo da API é baixado uma vez para um arquivo temporário, lido em
+streaming (core/importer.py) e gravado em um banco SQLite com índice de texto
+completo (FTS5) sobre nome, tags e país; se o SQLite não tiver FTS5, a busca
+usa LIKE. Depois disso, apenas as estações alteradas desde a última
+atualização são baixadas, e um dump completo é refeito periodicamente para
+remover as estações que deixaram de existir.
+"""
+import logging
+import os
+import pathlib
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+from radio_player.constants import get_user_data_path
+from radio_player.core.importer import iter_station_records
+
+logger = logging.getLogger(__name__)
+
+# Arquivo do banco (em USER_DATA_DIR)
+CATALOG_FILE_NAME = "catalog.db"
+# Intervalo entre atualizações incrementais e entre dumps completos, em segundos
+INCREMENTAL_UPDATE_INTERVAL = 60 * 60
+FULL_UPDATE_INTERVAL = 7 * 24 * 60 * 60
+# Estações gravadas por transação (a busca espera no máximo um lote)
+UPSERT_BATCH_SIZE = 2000
+# Tamanho das páginas da atualização incremental
+INCREMENTAL_PAGE_SIZE = 1000
+# Máximo de resultados de uma busca local
+SEARCH_LIMIT = 500
+
+
+class StationCatalog:
+    """Banco local com todas as estações do Radio Browser, indexado para busca."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS stations (
+            id INTEGER PRIMARY KEY,
+            stationuuid TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            url TEXT NOT NULL,
+            tags TEXT,
+            country TEXT,
+            countrycode TEXT,
+            codec TEXT,
+            bitrate INTEGER,
+            votes INTEGER,
+            changetime TEXT,
+            sync INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_catalog_votes ON stations(votes);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    # Índice de texto externo (conteúdo na tabela stations), mantido por gatilhos
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS stations_fts USING fts5(
+            name, tags, country,
+            content='stations', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS stations_ai AFTER INSERT ON stations BEGIN
+            INSERT INTO stations_fts(rowid, name, tags, country)
+            VALUES (new.id, new.name, new.tags, new.country);
+        END;
+        CREATE TRIGGER IF NOT EXISTS stations_ad AFTER DELETE ON stations BEGIN
+            INSERT INTO stations_fts(stations_fts, rowid, name, tags, country)
+            VALUES ('delete', old.id, old.name, old.tags, old.country);
+        END;
+        CREATE TRIGGER IF NOT EXISTS stations_au AFTER UPDATE OF name, tags, country ON stations BEGIN
+            INSERT INTO stations_fts(stations_fts, rowid, name, tags, country)
+            VALUES ('delete', old.id, old.name, old.tags, old.country);
+            INSERT INTO stations_fts(rowid, name, tags, country)
+            VALUES (new.id, new.name, new.tags, new.country);
+        END;
+    """
+
+    _RESULT_COLUMNS = ("stationuuid", "name", "url", "tags", "country", "countrycode", "codec", "bitrate", "votes")
+
+    def __init__(self, db_path=None):
+        """
+        Args:
+            db_path: Arquivo do banco (padrão: ~/.local/share/.../catalog.db).
+        """
+        self.db_path = pathlib.Path(db_path) if db_path else get_user_data_path(CATALOG_FILE_NAME)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # A busca roda na thread do Tkinter e a atualização na thread de update_async()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._lock = threading.RLock()
+        self._update_lock = threading.Lock() # Uma atualização por vez
+        self._closed = False
+        self._conn.executescript(self.SCHEMA)
+        try:
+            self._conn.executescript(self.FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite sem FTS5 ({e}); a busca local usará LIKE (mais lenta).")
+            self.has_fts = False
+        self._conn.commit()
+        logger.info(f"Catálogo local de estações: {self.db_path} ({self.count()} estações)")
+
+    # --- Consulta ---
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM stations").fetchone()[0]
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM stations LIMIT 1").fetchone() is None
+
+    def search(self, term: str, limit: int = SEARCH_LIMIT) -> list[dict]:
+        """
+        Busca estações cujo nome, tags ou país contenham as palavras de 'term'
+        (prefixos; maiúsculas e acentos são ignorados com FTS5). Mais votadas
+        primeiro. Retorna dicts no mesmo formato das respostas da API.
+        """
+        words = re.findall(r"\w+", term)
+        if not words:
+            return []
+        columns = ", ".join(f"s.{c}" for c in self._RESULT_COLUMNS)
+        if self.has_fts:
+            query = " ".join(f'"{word}"*' for word in words)
+            sql = (f"SELECT {columns} FROM stations_fts JOIN stations s ON s.id = stations_fts.rowid "
+                   f"WHERE stations_fts MATCH ? ORDER BY s.votes DESC LIMIT ?")
+            params = (query, limit)
+        else:
+            conditions = " AND ".join("(s.name LIKE ? ESCAPE '\\' OR s.tags LIKE ? ESCAPE '\\' OR s.country LIKE ? ESCAPE '\\')"
+                                      for _ in words)
+            params = []
+            for word in words:
+                pattern = "%" + word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                params.extend((pattern, pattern, pattern))
+            sql = f"SELECT {columns} FROM stations s WHERE {conditions} ORDER BY s.votes DESC LIMIT ?"
+            params = (*params, limit)
+
+        start = time.perf_counter()
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        logger.debug(f"Busca local '{term}': {len(rows)} resultado(s) em {(time.perf_counter() - start) * 1000:.1f} ms.")
+        return [{column: value for column, value in zip(self._RESULT_COLUMNS, row) if value is not None} for row in rows]
+
+    # --- Atualização ---
+
+    def needs_update(self) -> bool:
+        """Indica se o catálogo está vazio ou desatualizado."""
+        last_update = float(self._get_meta("last_update") or 0)
+        return self.is_empty() or time.time() - last_update > INCREMENTAL_UPDATE_INTERVAL
+
+    def update(self, client, force_full: bool = False) -> int:
+        """
+        Atualiza o catálogo a partir da API (bloqueante; chamar fora da thread do
+        Tkinter). Faz um dump completo se o catálogo estiver vazio, se o último
+        dump for antigo ou se 'force_full'; senão, uma atualização incremental.
+
+        Args:
+            client: RadioBrowserClient usado nas requisições.
+
+        Returns:
+            Número de estações gravadas (0 se outra atualização já estiver em andamento).
+        """
+        if not self._update_lock.acquire(blocking=False):
+            logger.info("Atualização do catálogo local já em andamento.")
+            return 0
+        try:
+            last_full = float(self._get_meta("last_full_update") or 0)
+            if force_full or self.is_empty() or time.time() - last_full > FULL_UPDATE_INTERVAL:
+                return self._full_update(client)
+            return self._incremental_update(client)
+        finally:
+            self._update_lock.release()
+
+    def update_async(self, client, widget, on_success=None, on_error=None, force_full: bool = False) -> Future:
+        """
+        Executa update() em uma thread própria, fora do pool do cliente: um dump
+        completo leva minutos e ocuparia um dos workers das buscas. A thread é
+        daemon, para não segurar o encerramento da aplicação durante o download.
+        O resultado é entregue na thread do Tkinter (ver RadioBrowserClient.submit).
+        """
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self.update(client, force_full))
+            except Exception as e:
+                future.set_exception(e)
+
+        client.deliver(widget, future, on_success=on_success, on_error=on_error)
+        threading.Thread(target=run, name="CatalogUpdate", daemon=True).start()
+        return future
+
+    def _full_update(self, client) -> int:
+        """Baixa o dump completo e substitui o conteúdo do catálogo."""
+        logger.info("Baixando o catálogo completo de estações do Radio Browser...")
+        start = time.monotonic()
+        fd, tmp_name = tempfile.mkstemp(prefix="catalog-", suffix=".json", dir=self.db_path.parent)
+        os.close(fd)
+        try:
+            client.download_to_file("/json/stations", tmp_name, params={"hidebroken": "true"})
+            sync = int(self._get_meta("sync") or 0) + 1
+            written = self._upsert_all(iter_station_records(tmp_name), sync)
+            with self._lock:
+                if self._closed:
+                    return written
+                # Remove as estações que não vieram no dump (saíram da API)
+                removed = self._conn.execute("DELETE FROM stations WHERE sync < ?", (sync,)).rowcount
+                self._set_meta("sync", sync)
+                now = str(time.time())
+                self._set_meta("last_full_update", now)
+                self._set_meta("last_update", now)
+                self._conn.commit()
+        finally:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+        logger.info(f"Catálogo local atualizado: {written} estações gravadas, {removed} removidas "
+                    f"em {time.monotonic() - start:.1f}s.")
+        return written
+
+    def _incremental_update(self, client) -> int:
+        """Baixa, da mais recente para a mais antiga, as estações alteradas desde a última atualização."""
+        newest_known = self._get_meta("max_changetime") or ""
+        sync = int(self._get_meta("sync") or 0)
+        written = 0
+        offset = 0
+        while not self._closed:
+            page = client.get_json("/json/stations/search", params={
+                "order": "changetimestamp", "reverse": "true", "hidebroken": "true",
+                "limit": INCREMENTAL_PAGE_SIZE, "offset": offset,
+            }, use_cache=False)
+            if not isinstance(page, list):
+                raise ValueError("Resposta inesperada da API de rádios (esperada uma lista).")
+            changed = [record for record in page if _changetime(record) > newest_known]
+            written += self._upsert_all(changed, sync)
+            if len(changed) < len(page) or len(page) < INCREMENTAL_PAGE_SIZE:
+                break # Chegou às estações que já estavam no catálogo
+            offset += INCREMENTAL_PAGE_SIZE
+        with self._lock:
+            if self._closed:
+                return written
+            self._set_meta("last_update", str(time.time()))
+            self._conn.commit()
+        logger.info(f"Catálogo local: {written} estação(ões) alterada(s) atualizada(s).")
+        return written
+
+    def _upsert_all(self, records, sync: int) -> int:
+        """Grava os registros em lotes (uma transação por lote)."""
+        written = 0
+        batch = []
+        for record in records:
+            row = _row_from_record(record, sync)
+            if row is None:
+                continue
+            batch.append(row)
+            if len(batch) >= UPSERT_BATCH_SIZE:
+                if self._closed:
+                    return written
+                written += self._upsert_batch(batch)
+                batch = []
+        if batch and not self._closed:
+            written += self._upsert_batch(batch)
+        return written
+
+    def _upsert_batch(self, rows) -> int:
+        with self._lock:
+            # Checado com a trava: close() pode ter fechado a conexão depois da checagem em _upsert_all
+            if self._closed:
+                return 0
+            self._conn.executemany(
+                "INSERT INTO stations (stationuuid, name, url, tags, country, countrycode, codec, bitrate, votes, changetime, sync) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(stationuuid) DO UPDATE SET name=excluded.name, url=excluded.url, tags=excluded.tags, "
+                "country=excluded.country, countrycode=excluded.countrycode, codec=excluded.codec, "
+                "bitrate=excluded.bitrate, votes=excluded.votes, changetime=excluded.changetime, sync=excluded.sync",
+                rows,
+            )
+            newest = max(row[9] for row in rows)
+            if newest > (self._get_meta("max_changetime") or ""):
+                self._set_meta("max_changetime", newest)
+            self._conn.commit()
+        return len(rows)
+
+    # --- Metadados ---
+
+    def _get_meta(self, key: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value):
+        """Grava um metadado (sem commit: faz parte da transação em curso)."""
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def close(self):
+        """Fecha o banco; uma atualização em andamento para no próximo lote."""
+        with self._lock:
+            self._closed = True
+            self._conn.close()
+        logger.debug("Catálogo local fechado.")
+
+
+def _changetime(record) -> str:
+    """Momento da última alteração de um registro da API, em formato ordenável."""
+    return record.get("lastchangetime_iso8601") or record.get("lastchangetime") or ""
+
+
+def _row_from_record(record, sync: int):
+    """Converte um registro da API em linha da tabela stations (None se inválido)."""
+    if not isinstance(record, dict):
+        return None
+    uuid = record.get("stationuuid")
+    name = (record.get("name") or "").strip()
+    url = (record.get("url_resolved") or record.get("url") or "").strip()
+    if not uuid or not name or not url.startswith(("http://", "https://")):
+        return None
+    bitrate = record.get("bitrate")
+    votes = record.get("votes")
+    return (
+        uuid, name, url,
+        record.get("tags") or None,
+        record.get("country") or None,
+        record.get("countrycode") or None,
+        record.get("codec") or None,
+        bitrate if isinstance(bitrate, int) and bitrate > 0 else None,
+        votes if isinstance(votes, int) else 0,
+        _changetime(record),
+        sync,
+    )
+
+
+# --- Catálogo compartilhado ---
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_default_catalog() -> StationCatalog:
+    """Retorna o catálogo compartilhado, abrindo-o na primeira chamada."""
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is None:
+            _default_catalog = StationCatalog()
+        return _default_catalog
+
+
+def shutdown_default_catalog():
+    """Fecha o catálogo compartilhado, se estiver aberto (chamar ao fechar a aplicação)."""
+    global _default_catalog
+    with _default_catalog_lock:
+        if _default_catalog is not None:
+            _default_catalog.close()
+            _default_catalog = None
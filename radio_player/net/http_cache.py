@@ -0,0 +1,202 @@
+# /home/marcos/projeto1/radio_player/net/http_cache.py
+"""
+Cache persistente de respostas HTTP (JSON) do Radio Browser.
+
+Cada resposta é gravada em um arquivo próprio dentro do diretório de dados do
+usuário, junto com o prazo de validade e os validadores (ETag/Last-Modified)
+enviados pelo servidor. Enquanto a entrada está dentro do prazo, a resposta
+é servida do disco sem acesso à rede; depois disso ela é revalidada com uma
+requisição condicional (304 renova o prazo sem baixar o corpo de novo).
+O tamanho total do diretório é limitado, removendo as entradas mais antigas.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+
+from radio_player.constants import get_user_data_path
+
+logger = logging.getLogger(__name__)
+
+# Subdiretório (em USER_DATA_DIR) onde as respostas são guardadas
+HTTP_CACHE_DIR_NAME = "http_cache"
+# Validade padrão de uma resposta, em segundos
+DEFAULT_TTL = 60 * 60
+# Tamanho máximo do cache em disco, em bytes
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+CACHE_FILE_SUFFIX = ".json"
+
+
+class CacheEntry:
+    """Resposta em cache: dados decodificados mais metadados de validade."""
+
+    __slots__ = ("url", "data", "stored_at", "expires_at", "etag", "last_modified")
+
+    def __init__(self, url: str, data, stored_at: float, expires_at: float,
+                 etag: str | None = None, last_modified: str | None = None):
+        self.url = url
+        self.data = data
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, now: float | None = None) -> bool:
+        """Indica se a entrada ainda pode ser usada sem revalidar."""
+        return (time.time() if now is None else now) < self.expires_at
+
+    def validator_headers(self) -> dict:
+        """Cabeçalhos para uma requisição condicional de revalidação."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "stored_at": self.stored_at,
+            "expires_at": self.expires_at,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "data": self.data,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CacheEntry":
+        return cls(
+            data["url"],
+            data["data"],
+            float(data["stored_at"]),
+            float(data["expires_at"]),
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+        )
+
+
+class HttpResponseCache:
+    """Cache em disco de respostas JSON, com TTL, revalidação e limite de tamanho."""
+
+    def __init__(self, cache_dir=None, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Diretório das entradas (padrão: USER_DATA_DIR/http_cache).
+            ttl: Validade padrão de uma resposta, em segundos.
+            max_bytes: Tamanho máximo do diretório; as entradas mais antigas são
+                       removidas quando o limite é ultrapassado.
+        """
+        self.cache_dir = pathlib.Path(cache_dir) if cache_dir else get_user_data_path(HTTP_CACHE_DIR_NAME)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.error(f"Não foi possível criar o diretório de cache '{self.cache_dir}': {e}")
+
+    @staticmethod
+    def make_key(url: str, params: dict | None = None) -> str:
+        """Chave estável para uma URL + parâmetros de consulta."""
+        raw = url
+        if params:
+            raw += "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> pathlib.Path:
+        return self.cache_dir / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Retorna a entrada (fresca ou vencida) para 'key', ou None."""
+        path = self._path_for(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return CacheEntry.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Entrada de cache inválida '{path.name}' descartada: {e}")
+            self._remove(path)
+            return None
+
+    def put(self, key: str, url: str, data, etag: str | None = None, last_modified: str | None = None,
+            ttl: float | None = None) -> CacheEntry | None:
+        """Grava uma resposta no cache. Retorna a entrada, ou None se a gravação falhar."""
+        now = time.time()
+        entry = CacheEntry(url, data, now, now + (self.ttl if ttl is None else ttl), etag, last_modified)
+        if not self._write(key, entry):
+            return None
+        self._evict(keep=self._path_for(key))
+        return entry
+
+    def refresh(self, key: str, entry: CacheEntry, ttl: float | None = None) -> CacheEntry:
+        """Renova o prazo de uma entrada revalidada (resposta 304)."""
+        now = time.time()
+        entry.stored_at = now
+        entry.expires_at = now + (self.ttl if ttl is None else ttl)
+        self._write(key, entry)
+        return entry
+
+    def clear(self):
+        """Remove todas as entradas."""
+        with self._lock:
+            for path in self._iter_files():
+                self._remove(path)
+
+    def _write(self, key: str, entry: CacheEntry) -> bool:
+        path = self._path_for(key)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            with self._lock:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+                os.replace(tmp_path, path)
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Não foi possível gravar a resposta de '{entry.url}' no cache: {e}")
+            self._remove(tmp_path)
+            return False
+
+    def _evict(self, keep=None):
+        """Remove as entradas mais antigas (exceto 'keep') até o cache caber em max_bytes."""
+        with self._lock:
+            files = []
+            total = 0
+            for path in self._iter_files():
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            files.sort()
+            removed = 0
+            for _, size, path in files:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                self._remove(path)
+                total -= size
+                removed += 1
+            logger.debug(f"Cache HTTP: {removed} entrada(s) antiga(s) removida(s) (total agora {total} bytes).")
+
+    def _iter_files(self):
+        try:
+            return [p for p in self.cache_dir.iterdir() if p.suffix == CACHE_FILE_SUFFIX]
+        except OSError:
+            return []
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
@@ -0,0 +1,206 @@
+# /home/marcos/projeto1/radio_player/net/mirrors.py
+"""
+Escolha do servidor (espelho) da API do Radio Browser.
+
+A API é servida por vários espelhos equivalentes. O MirrorSelector mantém a
+lista, mede a latência de todos em paralelo, ordena do mais rápido para o mais
+lento e registra falhas durante o uso (timeout/5xx), para que o cliente passe
+ao próximo espelho. O mais rápido é lembrado entre execuções (mirrors.json no
+diretório de dados do usuário).
+"""
+import json
+import logging
+import os
+import pathlib
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Espelhos conhecidos (usados quando a descoberta por DNS não está disponível)
+DEFAULT_MIRRORS = (
+    "https://de1.api.radio-browser.info",
+    "https://de2.api.radio-browser.info",
+    "https://fi1.api.radio-browser.info",
+    "https://nl1.api.radio-browser.info",
+)
+# Nome DNS que resolve para todos os espelhos ativos
+DISCOVERY_HOSTNAME = "all.api.radio-browser.info"
+# Arquivo (em USER_DATA_DIR) com o resultado da última medição
+MIRRORS_FILE_NAME = "mirrors.json"
+# Endpoint leve usado para medir a latência
+PROBE_PATH = "/json/stats"
+PROBE_TIMEOUT = 3.0
+# Intervalo entre medições completas, em segundos
+PROBE_INTERVAL = 24 * 60 * 60
+# Tempo durante o qual um espelho que falhou vai para o fim da fila
+FAILURE_COOLDOWN = 5 * 60
+
+
+def discover_mirrors(hostname: str = DISCOVERY_HOSTNAME) -> list[str]:
+    """
+    Descobre os espelhos ativos via DNS (procedimento recomendado pela API):
+    resolve todos os IPs de 'hostname' e obtém o nome de cada um por DNS reverso.
+    Retorna uma lista vazia se a descoberta falhar.
+    """
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(hostname, 443, proto=socket.IPPROTO_TCP)}
+    except OSError as e:
+        logger.debug(f"Descoberta de espelhos por DNS falhou: {e}")
+        return []
+    mirrors = set()
+    for address in addresses:
+        try:
+            name = socket.gethostbyaddr(address)[0]
+        except OSError:
+            continue
+        if name.endswith(".api.radio-browser.info"):
+            mirrors.add(f"https://{name}")
+    return sorted(mirrors)
+
+
+class MirrorSelector:
+    """Lista de espelhos ordenada por latência medida, com failover."""
+
+    def __init__(self, mirrors=None, state_path=None, probe_path: str = PROBE_PATH,
+                 probe_timeout: float = PROBE_TIMEOUT, discover: bool = False):
+        """
+        Args:
+            mirrors: URLs base dos espelhos (padrão: DEFAULT_MIRRORS).
+            state_path: Arquivo onde o ranking é persistido (None = não persiste).
+            probe_path: Caminho requisitado em cada espelho para medir a latência.
+            probe_timeout: Timeout de cada medição, em segundos.
+            discover: Se True, probe() também procura novos espelhos via DNS.
+        """
+        self._mirrors = [m.rstrip("/") for m in (mirrors or DEFAULT_MIRRORS)]
+        self.state_path = pathlib.Path(state_path) if state_path else None
+        self.probe_path = probe_path
+        self.probe_timeout = probe_timeout
+        self.discover = discover
+
+        self._lock = threading.Lock()
+        self._latencies: dict[str, float | None] = {} # Última latência medida (None = falhou)
+        self._failed_at: dict[str, float] = {} # Falhas recentes (time.monotonic())
+        self._probed_at = 0.0 # time.time() da última medição completa
+        self._load_state()
+
+    # --- Estado persistido ---
+
+    def _load_state(self):
+        if not self.state_path or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            latencies = state.get("latencies", {})
+            for mirror in state.get("mirrors", []):
+                if isinstance(mirror, str) and mirror not in self._mirrors:
+                    self._mirrors.append(mirror)
+            self._latencies = {m: latencies.get(m) for m in self._mirrors if m in latencies}
+            self._probed_at = float(state.get("probed_at", 0.0))
+            logger.debug(f"Ranking de espelhos carregado de '{self.state_path}': {self.ranked()[:1]}")
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Não foi possível ler '{self.state_path}': {e}")
+
+    def _save_state(self):
+        if not self.state_path:
+            return
+        with self._lock:
+            state = {
+                "fastest": self._ranked_locked()[0],
+                "probed_at": self._probed_at,
+                "mirrors": list(self._mirrors),
+                "latencies": dict(self._latencies),
+            }
+        tmp_path = self.state_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=4)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o ranking de espelhos em '{self.state_path}': {e}")
+
+    # --- Ordenação e failover ---
+
+    def _ranked_locked(self) -> list[str]:
+        now = time.monotonic()
+
+        def sort_key(mirror):
+            recently_failed = now - self._failed_at.get(mirror, -FAILURE_COOLDOWN) < FAILURE_COOLDOWN
+            latency = self._latencies.get(mirror)
+            # Falhas recentes por último; depois, medidos antes de não medidos/inacessíveis
+            return (recently_failed, latency is None, latency or 0.0)
+
+        return sorted(self._mirrors, key=sort_key) # sorted é estável: empates mantêm a ordem da lista
+
+    def ranked(self) -> list[str]:
+        """Espelhos na ordem em que devem ser tentados."""
+        with self._lock:
+            return self._ranked_locked()
+
+    def current(self) -> str:
+        """O espelho preferido no momento."""
+        return self.ranked()[0]
+
+    def report_success(self, mirror: str, elapsed: float):
+        """Registra uma requisição bem-sucedida (latência em segundos)."""
+        with self._lock:
+            self._failed_at.pop(mirror, None)
+            previous = self._latencies.get(mirror)
+            # Média móvel simples para não oscilar a cada requisição
+            self._latencies[mirror] = elapsed if previous is None else 0.7 * previous + 0.3 * elapsed
+
+    def report_failure(self, mirror: str):
+        """Registra uma falha (timeout, conexão recusada, 5xx); o espelho vai para o fim da fila."""
+        with self._lock:
+            self._failed_at[mirror] = time.monotonic()
+        logger.warning(f"Espelho do Radio Browser com falha: {mirror}. Tentando o próximo.")
+
+    # --- Medição ---
+
+    def needs_probe(self, max_age: float = PROBE_INTERVAL) -> bool:
+        """Indica se vale medir os espelhos de novo (há mais de um e a medição é antiga)."""
+        return (len(self._mirrors) > 1 or self.discover) and time.time() - self._probed_at > max_age
+
+    def probe(self, session) -> dict[str, float | None]:
+        """
+        Mede a latência de todos os espelhos em paralelo (bloqueia até o fim,
+        no máximo ~probe_timeout). Atualiza o ranking e o persiste.
+
+        Args:
+            session: requests.Session usada nas requisições de medição.
+
+        Returns:
+            Latência em segundos por espelho (None para os que falharam).
+        """
+        if self.discover:
+            with self._lock:
+                for mirror in discover_mirrors():
+                    if mirror not in self._mirrors:
+                        self._mirrors.append(mirror)
+        mirrors = list(self._mirrors)
+
+        def measure(mirror):
+            start = time.monotonic()
+            try:
+                response = session.get(f"{mirror}{self.probe_path}", timeout=self.probe_timeout)
+                response.raise_for_status()
+            except Exception as e:
+                logger.debug(f"Medição do espelho {mirror} falhou: {e}")
+                return None
+            return time.monotonic() - start
+
+        with ThreadPoolExecutor(max_workers=len(mirrors), thread_name_prefix="MirrorProbe") as executor:
+            results = dict(zip(mirrors, executor.map(measure, mirrors)))
+
+        with self._lock:
+            self._latencies.update(results)
+            for mirror, latency in results.items():
+                if latency is not None:
+                    self._failed_at.pop(mirror, None)
+            self._probed_at = time.time()
+        self._save_state()
+        logger.info(f"Espelhos do Radio Browser medidos; mais rápido: {self.current()}")
+        return results
@@ -0,0 +1,395 @@
+# /home/marcos/projeto1/radio_player/net/radiobrowser.py
+"""
+Cliente da API do Radio Browser (https://www.radio-browser.info).
+
+Mantém uma sessão HTTP persistente (pool de conexões com keep-alive e gzip) e
+executa as requisições em um pool de threads, entregando os resultados à
+thread do Tkinter via after(). As requisições vão para o espelho mais rápido
+da API, passando ao seguinte em caso de falha (ver net/mirrors.py); a URL base
+é configurável, o que permite testar o cliente contra servidores HTTP locais.
+Com um HttpResponseCache, as respostas também ficam guardadas em disco (ver
+net/http_cache.py).
+"""
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from radio_player.constants import VERSION, get_user_data_path
+from radio_player.core.search_index import normalize
+from radio_player.net.http_cache import HttpResponseCache
+from radio_player.net.mirrors import DEFAULT_MIRRORS, MIRRORS_FILE_NAME, MirrorSelector
+
+logger = logging.getLogger(__name__)
+
+# Servidor padrão da API (o primeiro espelho conhecido)
+DEFAULT_BASE_URL = DEFAULT_MIRRORS[0]
+USER_AGENT = f"RadioPlayerSimples/{VERSION}"
+# (conexão, leitura) em segundos
+DEFAULT_TIMEOUT = (5, 10)
+# Termos de busca mantidos no cache em memória
+SEARCH_CACHE_SIZE = 64
+
+
+class SearchResultCache:
+    """
+    Cache LRU de resultados de busca por nome, com refinamento local.
+
+    Guarda as páginas recebidas de cada termo, em sequência a partir do início,
+    e se o resultado já está completo. A busca por nome da API é por substring,
+    então o resultado completo de "rock" contém todo o resultado de "rock br":
+    um termo que contém um termo em cache completo é respondido filtrando esse
+    resultado, sem ir à rede. Um resultado amplo ainda incompleto não é usado
+    para refinar: as posições (offset) do termo estreito na API não
+    correspondem às do trecho filtrado, e a página seguinte pularia ou
+    repetiria estações.
+    Seguro para uso por várias threads.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[list[dict], bool]] = OrderedDict() # termo -> (estações, completo)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(term: str) -> str:
+        return term.strip().casefold()
+
+    def get(self, term: str) -> tuple[list[dict], bool] | None:
+        """
+        Retorna (estações, completo) para 'term', exato ou refinado de um termo
+        mais amplo já completo, ou None. Se 'completo' for False, as estações
+        são só o começo do resultado: o restante vem da API a partir de
+        len(estações).
+        """
+        key = self._key(term)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            # Entre os termos amplos completos, o mais específico
+            broader = max((cached for cached, (_, complete) in self._entries.items() if complete and cached in key),
+                          key=len, default=None)
+            if broader is None:
+                return None
+            self._entries.move_to_end(broader)
+            superset = self._entries[broader][0]
+
+        # Comparação sem acentos/pontuação, como no índice local: "radio uniao" acha "Rádio União"
+        needle = normalize(key)
+        narrowed = [station for station in superset if needle in normalize(str(station.get("name", "")))]
+        logger.debug(f"Busca '{term}' respondida pelo cache refinando '{broader}' ({len(narrowed)}/{len(superset)}).")
+        self.put(term, narrowed)
+        return narrowed, True
+
+    def put(self, term: str, stations: list[dict], complete: bool = True):
+        """Guarda o resultado de uma busca ('complete' = False se houver mais páginas no servidor)."""
+        key = self._key(term)
+        with self._lock:
+            self._entries[key] = (stations, complete)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add_page(self, term: str, offset: int, stations: list[dict], limit: int | None):
+        """
+        Acrescenta uma página recebida da API ao resultado de 'term'. Páginas
+        fora de sequência (que deixariam um buraco) são ignoradas; a página
+        menor que 'limit' completa o resultado.
+        """
+        complete = limit is None or len(stations) < limit
+        key = self._key(term)
+        with self._lock:
+            cached = self._entries.get(key)
+            if offset == 0:
+                accumulated = list(stations)
+            elif cached is not None and not cached[1] and len(cached[0]) == offset:
+                accumulated = cached[0] + stations
+            else:
+                return
+        self.put(term, accumulated, complete)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RadioBrowserClient:
+    """Cliente reutilizável da API do Radio Browser."""
+
+    def __init__(self, base_url: str | None = None, timeout=DEFAULT_TIMEOUT, max_workers: int = 2, pool_size: int = 4,
+                 http_cache: HttpResponseCache | None = None, mirrors: MirrorSelector | None = None):
+        """
+        Args:
+            base_url: Esquema + host de um único servidor (ex: "http://127.0.0.1:8080"
+                      em testes). Ignorado se 'mirrors' for informado.
+            timeout: Timeout das requisições, em segundos (número ou tupla conexão/leitura).
+            max_workers: Threads para requisições em segundo plano.
+            pool_size: Conexões mantidas abertas por host.
+            http_cache: Cache em disco das respostas (None = sem cache persistente).
+            mirrors: Espelhos a usar, com failover (padrão: apenas base_url).
+        """
+        self.mirrors = mirrors or MirrorSelector([base_url or DEFAULT_BASE_URL])
+        self.timeout = timeout
+        self.http_cache = http_cache
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({
+            "User-Agent": USER_AGENT, # A API pede um User-Agent identificável
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+
+        self.search_cache = SearchResultCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="RadioBrowser")
+        logger.debug(f"Cliente Radio Browser criado para {self.base_url}.")
+
+        if self.mirrors.needs_probe():
+            # Mede os espelhos em segundo plano; até lá vale o ranking salvo
+            self._executor.submit(self.probe_mirrors)
+
+    @property
+    def base_url(self) -> str:
+        """Espelho preferido no momento."""
+        return self.mirrors.current()
+
+    def probe_mirrors(self) -> dict:
+        """Mede a latência dos espelhos e reordena-os (bloqueante)."""
+        try:
+            return self.mirrors.probe(self._session)
+        except Exception as e:
+            logger.error(f"Erro ao medir os espelhos do Radio Browser: {e}", exc_info=True)
+            return {}
+
+    # --- Requisições síncronas (chamar fora da thread do Tkinter) ---
+
+    def get_json(self, path: str, params: dict | None = None, use_cache: bool = True):
+        """
+        Faz um GET em base_url + path e retorna o JSON decodificado.
+
+        Com cache em disco: respostas dentro do prazo são servidas sem rede;
+        vencidas são revalidadas com If-None-Match/If-Modified-Since; e, se o
+        servidor estiver inacessível, a última resposta guardada é usada.
+
+        Raises:
+            requests.exceptions.RequestException: Erros de rede/HTTP (inclui Timeout).
+            ValueError: Resposta que não é JSON válido (json.JSONDecodeError).
+        """
+        cache = self.http_cache if use_cache else None
+        key = entry = None
+        headers = {}
+        if cache is not None:
+            # A chave não inclui o espelho: todos servem os mesmos dados
+            key = cache.make_key(path, params)
+            entry = cache.get(key)
+            if entry is not None:
+                if entry.is_fresh():
+                    logger.debug(f"Resposta de {path} servida pelo cache em disco.")
+                    return entry.data
+                headers = entry.validator_headers()
+
+        try:
+            response = self._request(path, params, headers)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout, requests.exceptions.HTTPError) as e:
+            if entry is not None:
+                logger.warning(f"Servidores inacessíveis ({e}); usando resposta em cache de {path}.")
+                return entry.data
+            raise
+
+        if response.status_code == 304 and entry is not None:
+            logger.debug(f"Resposta em cache de {path} revalidada (304).")
+            return cache.refresh(key, entry).data
+        response.raise_for_status() # Levanta exceção para erros HTTP (4xx)
+        data = response.json()
+        if cache is not None:
+            cache.put(key, response.url, data,
+                      etag=response.headers.get("ETag"),
+                      last_modified=response.headers.get("Last-Modified"))
+        return data
+
+    def download_to_file(self, path: str, dest_path, params: dict | None = None, chunk_size: int = 64 * 1024) -> int:
+        """
+        Baixa base_url + path para 'dest_path' sem manter a resposta em memória
+        (usado para o dump completo de estações). Retorna o número de bytes gravados.
+
+        Raises:
+            requests.exceptions.RequestException: Erros de rede/HTTP.
+            OSError: Falha ao gravar o arquivo.
+        """
+        response = self._request(path, params, {}, stream=True)
+        with response:
+            response.raise_for_status()
+            written = 0
+            with open(dest_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size):
+                    f.write(chunk)
+                    written += len(chunk)
+        logger.info(f"Download de {path} concluído ({written} bytes).")
+        return written
+
+    def _request(self, path: str, params: dict | None, headers: dict, stream: bool = False):
+        """
+        Faz o GET no melhor espelho, passando ao próximo em caso de timeout,
+        erro de conexão ou resposta 5xx. Levanta o erro do último espelho
+        tentado se todos falharem.
+        """
+        last_error = None
+        for mirror in self.mirrors.ranked():
+            url = f"{mirror}{path}"
+            logger.debug(f"Request URL: {url} params={params}")
+            try:
+                response = self._session.get(url, params=params, headers=headers, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self.mirrors.report_failure(mirror)
+                last_error = e
+                continue
+            logger.debug(f"Response Status Code: {response.status_code}")
+            if response.status_code >= 500:
+                response.close()
+                self.mirrors.report_failure(mirror)
+                last_error = requests.exceptions.HTTPError(
+                    f"{response.status_code} Server Error for url: {url}", response=response)
+                continue
+            # Só o tempo até os cabeçalhos: o download do corpo (dumps grandes,
+            # páginas longas) mede a banda, não a latência do espelho
+            self.mirrors.report_success(mirror, response.elapsed.total_seconds())
+            return response
+        raise last_error
+
+    def search_by_name(self, term: str, use_cache: bool = True, limit: int | None = None, offset: int = 0) -> list[dict]:
+        """
+        Busca estações cujo nome contém 'term' (consultando antes os caches em memória e em disco).
+
+        Args:
+            limit: Máximo de estações da página (None = todas).
+            offset: Posição da primeira estação da página.
+
+        As páginas recebidas se acumulam no cache em memória; a parte da página
+        que já está em cache (do próprio termo ou refinada de um termo mais
+        amplo) não é pedida de novo: só o restante vai à rede.
+        """
+        head = []
+        if use_cache:
+            cached = self.search_cache.get(term)
+            if cached is not None:
+                stations, complete = cached
+                end = None if limit is None else offset + limit
+                head = stations[offset:end]
+                if complete or (end is not None and end <= len(stations)):
+                    return head
+                if head:
+                    # Página começa no cache: pede só o que falta
+                    offset = len(stations)
+                    if limit is not None:
+                        limit -= len(head)
+        params = None
+        if limit is not None:
+            params = {"limit": limit, "offset": offset}
+        elif offset:
+            params = {"offset": offset}
+        path = f"/json/stations/byname/{requests.utils.quote(term, safe='')}"
+        stations = self.get_json(path, params=params, use_cache=use_cache)
+        if not isinstance(stations, list):
+            raise ValueError("Resposta inesperada da API de rádios (esperada uma lista).")
+        self.search_cache.add_page(term, offset, stations, limit)
+        return head + stations if head else stations
+
+    def get_cached_search(self, term: str) -> tuple[list[dict], bool] | None:
+        """
+        (estações, completo) em cache para 'term', sem acesso à rede (seguro na
+        thread do Tkinter). Ver SearchResultCache.get().
+        """
+        return self.search_cache.get(term)
+
+    # --- Execução em segundo plano ---
+
+    def submit(self, widget, func, *args, on_success=None, on_error=None):
+        """
+        Executa func(*args) em uma thread do pool e entrega o resultado na thread
+        do Tkinter, via widget.after(0, ...).
+
+        Args:
+            widget: Qualquer widget Tk vivo (usado para agendar o callback).
+            on_success: Chamado como on_success(resultado).
+            on_error: Chamado como on_error(exceção).
+
+        Returns:
+            O concurrent.futures.Future da tarefa (future.cancel() descarta a
+            tarefa se ela ainda não começou; resultados de futures cancelados
+            nunca são entregues).
+        """
+        future = self._executor.submit(func, *args)
+        self.deliver(widget, future, on_success=on_success, on_error=on_error)
+        return future
+
+    def deliver(self, widget, future, on_success=None, on_error=None):
+        """
+        Entrega o resultado de um Future criado fora do pool do cliente (ex: a
+        atualização do catálogo local) na thread do Tkinter, como submit().
+        """
+        future.add_done_callback(lambda f: self._deliver(widget, f, on_success, on_error))
+
+    def search_by_name_async(self, widget, term: str, on_success, on_error=None, limit: int | None = None, offset: int = 0):
+        """Versão em segundo plano de search_by_name (ver submit())."""
+        return self.submit(widget, self.search_by_name, term, True, limit, offset, on_success=on_success, on_error=on_error)
+
+    @staticmethod
+    def _deliver(widget, future, on_success, on_error):
+        """Agenda o callback adequado na thread do Tkinter."""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            callback, value = on_error, error
+        else:
+            callback, value = on_success, future.result()
+        if callback is None:
+            if error is not None:
+                logger.error(f"Erro não tratado em requisição ao Radio Browser: {error}")
+            return
+        try:
+            widget.after(0, callback, value)
+        except Exception as e:
+            # Widget destruído ou mainloop encerrado: não há a quem entregar
+            logger.debug(f"Resultado do Radio Browser descartado: {e}")
+
+    def close(self):
+        """Cancela tarefas pendentes e fecha as conexões."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
+        logger.debug("Cliente Radio Browser encerrado.")
+
+
+# --- Cliente compartilhado ---
+# Um único cliente por processo mantém o pool de conexões aberto entre
+# aberturas do diálogo de busca.
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> RadioBrowserClient:
+    """Retorna o cliente compartilhado, criando-o na primeira chamada."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = RadioBrowserClient(
+                http_cache=HttpResponseCache(),
+                mirrors=MirrorSelector(state_path=get_user_data_path(MIRRORS_FILE_NAME), discover=True),
+            )
+        return _default_client
+
+
+def shutdown_default_client():
+    """Encerra o cliente compartilhado (chamar ao fechar a aplicação)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None:
+            _default_client.close()
+            _default_client = None
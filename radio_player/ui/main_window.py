@@ -2,6 +2,8 @@
 import tkinter as tk
 from tkinter import ttk, PhotoImage, Listbox, Scrollbar, messagebox, simpledialog
 import logging
+import queue
+import threading
 import vlc # Para verificar vlc.State
 import os # Para os.path.basename
 
@@ -12,15 +14,20 @@ except ImportError:
     sv_ttk = None
 
 # Importar componentes da aplicação
-from radio_player.audio.player_handler import RadioPlayer
+from radio_player.audio.player_handler import RadioPlayer, EVENT_BUFFERING, EVENT_META
 from radio_player.core.stations import StationManager
+from radio_player.core.search_index import StationSearchIndex
 from radio_player.constants import get_data_path # <<< Usar get_data_path para ícone/padrões
 
 # Importar diálogos customizados (com tratamento de erro)
 try:
     from .search_dialog import SearchDialog
+    from radio_player.net.radiobrowser import shutdown_default_client
+    from radio_player.net.catalog import shutdown_default_catalog
 except ImportError as e:
     SearchDialog = None
+    shutdown_default_client = None
+    shutdown_default_catalog = None
     logging.warning(f"Não foi possível importar SearchDialog: {e}. Funcionalidade de busca online desabilitada.")
 
 try:
@@ -34,6 +41,17 @@ except ImportError as e:
 
 logger = logging.getLogger(__name__)
 
+# Filtro de estações: espera (ms) após a última tecla e máximo de resultados na combobox
+STATION_FILTER_DELAY_MS = 150
+STATION_FILTER_LIMIT = 200
+# Nomes exibidos dos perfis de buffer (chaves de BUFFER_PROFILES)
+BUFFER_PROFILE_LABELS = {
+    "low-latency": "Baixa latência",
+    "balanced": "Equilibrado",
+    "flaky-network": "Rede instável",
+}
+GLOBAL_BUFFER_LABEL = "Padrão global"
+
 class MainWindow(tk.Tk):
     """Janela principal da aplicação Radio Player."""
 
@@ -50,6 +68,8 @@ class MainWindow(tk.Tk):
 
         self.player = player
         self.station_manager = station_manager
+        self.station_index = StationSearchIndex(station_manager) # Busca aproximada para o filtro
+        self.station_index.build_async() # Pronto antes da primeira tecla no filtro
 
         # --- Configuração da Janela ---
         self.title("Rádio Player Simples")
@@ -81,12 +101,20 @@ class MainWindow(tk.Tk):
         self.volume_percent_var = tk.StringVar(value=f"{self.volume_var.get()}%")
         self.status_var = tk.StringVar(value="Pronto")
         self.selected_station_var = tk.StringVar()
+        self.station_filter_var = tk.StringVar()
+        self.station_buffer_var = tk.StringVar(value=GLOBAL_BUFFER_LABEL)
+        self.global_buffer_var = tk.StringVar(value=BUFFER_PROFILE_LABELS[self.player.buffer_profile] if self.player else "")
 
         # --- Estado Interno ---
         self._is_muted = False
         self._volume_before_mute = self.volume_var.get()
-        self._status_check_job = None # ID do job 'after' para checagem de status
+        self._station_list_key = None # (geração do StationManager, filtro) exibidos na combobox
+        self._station_filter_job = None # ID do job 'after' do filtro de estações
         self._has_reached_playing = False # Flag para saber se já atingiu o estado 'Playing'
+        self._save_errors = queue.SimpleQueue() # Preenchida pela thread de gravação
+        self._closing = False # Callbacks agendados depois do fechamento não fazem nada
+        self._play_generation = None # Geração do player da estação em reprodução (ver RadioPlayer.play_generation)
+        self._playing_station = None # Nome da estação em reprodução (None se parado)
 
         # --- Criação dos Widgets ---
         self._create_widgets() # <<< Chamada para o método
@@ -97,6 +125,13 @@ class MainWindow(tk.Tk):
         self.volume_var.set(self.player.get_volume()) # Garante que o slider reflita o volume inicial do player
         self._update_volume_label() # Atualiza o label de porcentagem
 
+        # Mudanças de estado do player chegam por eventos do VLC (sem polling)
+        if self.player:
+            self.player.set_event_callback(self._on_player_events_ready)
+
+        # Falhas da gravação em segundo plano das estações chegam por callback
+        self.station_manager.set_save_error_callback(self._on_station_save_error)
+
         # Configura o fechamento da janela
         self.protocol("WM_DELETE_WINDOW", self._on_closing)
 
@@ -137,6 +172,44 @@ class MainWindow(tk.Tk):
         self.next_button = ttk.Button(nav_frame, text="Próxima ▶", command=self._select_next_station)
         self.next_button.grid(row=0, column=2, padx=(5, 0))
 
+        # Filtro da lista (aproximado, ignora acentos e maiúsculas)
+        filter_frame = ttk.Frame(nav_frame)
+        filter_frame.grid(row=1, column=1, sticky=tk.EW, padx=5, pady=(5, 0))
+        filter_frame.columnconfigure(1, weight=1)
+        ttk.Label(filter_frame, text="Filtrar:").grid(row=0, column=0, padx=(0, 5))
+        self.station_filter_entry = ttk.Entry(filter_frame, textvariable=self.station_filter_var)
+        self.station_filter_entry.grid(row=0, column=1, sticky=tk.EW)
+        self.station_filter_entry.bind("<Return>", self._apply_station_filter)
+        self.station_filter_entry.bind("<Escape>", lambda event: self.station_filter_var.set(""))
+        self.station_filter_var.trace_add("write", self._on_station_filter_changed)
+
+        # Perfil de buffer da estação selecionada e o global (usado pelas demais)
+        buffer_frame = ttk.Frame(nav_frame)
+        buffer_frame.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=(5, 0))
+        buffer_frame.columnconfigure(1, weight=1)
+        buffer_frame.columnconfigure(3, weight=1)
+        ttk.Label(buffer_frame, text="Buffer:").grid(row=0, column=0, padx=(0, 5))
+        self.station_buffer_combobox = ttk.Combobox(
+            buffer_frame,
+            textvariable=self.station_buffer_var,
+            values=[GLOBAL_BUFFER_LABEL] + list(BUFFER_PROFILE_LABELS.values()),
+            state="readonly",
+            width=14,
+        )
+        self.station_buffer_combobox.grid(row=0, column=1, sticky=tk.EW)
+        self.station_buffer_combobox.bind("<<ComboboxSelected>>", self._on_station_buffer_selected)
+        ttk.Label(buffer_frame, text="Global:").grid(row=0, column=2, padx=(10, 5))
+        self.global_buffer_combobox = ttk.Combobox(
+            buffer_frame,
+            textvariable=self.global_buffer_var,
+            values=list(BUFFER_PROFILE_LABELS.values()),
+            state="readonly",
+            width=14,
+        )
+        self.global_buffer_combobox.grid(row=0, column=3, sticky=tk.EW)
+        self.global_buffer_combobox.bind("<<ComboboxSelected>>", self._on_global_buffer_selected)
+        self.selected_station_var.trace_add("write", self._sync_station_buffer_selector)
+
 
         # --- Controles de Playback (Direto no main_frame) ---
         self.play_button = ttk.Button(main_frame, text="▶ Play", command=self._play_radio, style="Accent.TButton") # Pai é main_frame
@@ -206,16 +279,24 @@ class MainWindow(tk.Tk):
         """Atualiza a lista de estações na Combobox."""
         logger.debug("Atualizando lista de estações na Combobox.")
         current_selection = self.selected_station_var.get()
-        station_names = self.station_manager.get_station_names()
-        self.station_combobox['values'] = station_names
+        # Só reenvia a lista ao Tcl se as estações ou o filtro mudaram desde a
+        # última vez (este método também é o postcommand da combobox)
+        filter_text = self.station_filter_var.get().strip()
+        list_key = (self.station_manager.generation, filter_text)
+        if self._station_list_key != list_key:
+            if filter_text:
+                self.station_combobox['values'] = self.station_index.search(filter_text, limit=STATION_FILTER_LIMIT)
+            else:
+                self.station_combobox['values'] = self.station_manager.get_station_names()
+            self._station_list_key = list_key
 
-        if station_names:
-            if current_selection in station_names:
+        if self.station_manager.station_count:
+            if self.station_manager.has_station(current_selection):
                 # Mantém a seleção se ainda existir
                 self.selected_station_var.set(current_selection)
             elif not self.selected_station_var.get(): # Se nada estiver selecionado
                  # Seleciona a primeira estação se a lista não estiver vazia e nada selecionado
-                 self.selected_station_var.set(station_names[0])
+                 self.selected_station_var.set(self.station_manager.get_station_name_at(0))
         else:
             # Limpa a seleção se não houver estações
             self.selected_station_var.set("")
@@ -226,8 +307,7 @@ class MainWindow(tk.Tk):
 
     def _update_nav_buttons_state(self):
         """Habilita/desabilita botões de navegação Anterior/Próxima."""
-        station_names = self.station_manager.get_station_names()
-        num_stations = len(station_names)
+        num_stations = self.station_manager.station_count
         state = tk.NORMAL if num_stations > 1 else tk.DISABLED
         self.prev_button.config(state=state)
         self.next_button.config(state=state)
@@ -258,12 +338,14 @@ class MainWindow(tk.Tk):
         self.play_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
         self.station_combobox.config(state="readonly")
+        self.station_filter_entry.config(state=tk.NORMAL)
         self.add_button.config(state=tk.NORMAL)
         self.search_button.config(state=tk.NORMAL if SearchDialog else tk.DISABLED)
         self._update_management_buttons_state() # Habilita/desabilita Ed/Rm baseado na seleção
         self._update_nav_buttons_state() # Habilita/desabilita Prev/Next
         self.status_var.set("Parado")
         self._has_reached_playing = False # Reseta a flag
+        self._playing_station = None
 
 
     # --- Callbacks de Eventos ---
@@ -280,10 +362,125 @@ class MainWindow(tk.Tk):
             logger.debug("Seleção da Combobox limpa.")
             self._update_management_buttons_state() # Atualiza Ed/Rm
 
+    def _sync_station_buffer_selector(self, *args):
+        """Mostra o perfil de buffer da estação selecionada."""
+        station = self.station_manager.get_station(self.selected_station_var.get())
+        profile = station.buffer_profile if station else None
+        self.station_buffer_var.set(BUFFER_PROFILE_LABELS.get(profile, GLOBAL_BUFFER_LABEL))
+
+    def _buffer_profile_from_label(self, label: str) -> str | None:
+        for profile, profile_label in BUFFER_PROFILE_LABELS.items():
+            if profile_label == label:
+                return profile
+        return None
+
+    def _on_station_buffer_selected(self, event=None):
+        """Grava o perfil de buffer escolhido para a estação e o aplica se ela estiver tocando."""
+        station_name = self._playing_station or self.selected_station_var.get()
+        if not station_name:
+            self.station_buffer_var.set(GLOBAL_BUFFER_LABEL)
+            return
+        profile = self._buffer_profile_from_label(self.station_buffer_var.get())
+        if not self.station_manager.set_buffer_profile(station_name, profile):
+            messagebox.showerror("Erro", f"Não foi possível salvar o perfil de buffer de '{station_name}'.")
+            self._sync_station_buffer_selector()
+            return
+        self._restart_playback_for_buffer_change()
+
+    def _on_global_buffer_selected(self, event=None):
+        """Troca o perfil de buffer global (estações sem perfil próprio)."""
+        profile = self._buffer_profile_from_label(self.global_buffer_var.get())
+        if not profile or not self.player or not self.player.set_buffer_profile(profile):
+            return
+        station = self.station_manager.get_station(self._playing_station or self.selected_station_var.get())
+        if station and station.buffer_profile is None:
+            self._restart_playback_for_buffer_change()
+
+    def _restart_playback_for_buffer_change(self):
+        """O cache de rede é uma opção da mídia: reabre o stream em andamento para aplicá-lo já."""
+        if self._playing_station and self.stop_button['state'] != tk.DISABLED:
+            logger.info("Perfil de buffer alterado durante a reprodução. Reabrindo o stream.")
+            # Reabre a estação que está tocando, mesmo que a seleção tenha mudado
+            self._play_radio(self._playing_station)
+
+    def _on_station_filter_changed(self, *args):
+        """Reagenda o filtro a cada tecla (debounce)."""
+        if self._station_filter_job:
+            self.after_cancel(self._station_filter_job)
+        self._station_filter_job = self.after(STATION_FILTER_DELAY_MS, self._apply_station_filter)
+
+    def _apply_station_filter(self, event=None):
+        """Restringe a combobox às estações que correspondem ao filtro e seleciona a melhor."""
+        if self._closing:
+            return
+        if self._station_filter_job:
+            self.after_cancel(self._station_filter_job)
+        self._station_filter_job = None
+
+        self._update_station_list()
+        filter_text = self.station_filter_var.get().strip()
+        if not filter_text:
+            self.status_var.set("Filtro removido")
+            return
+        matches = self.station_combobox['values']
+        if not matches:
+            self.status_var.set(f"Nenhuma estação corresponde a '{filter_text}'")
+            return
+        # Durante a reprodução só restringe a lista: a seleção é a estação tocando
+        playback_active = self.stop_button['state'] != tk.DISABLED
+        if not playback_active and self.selected_station_var.get() not in matches:
+            self.selected_station_var.set(matches[0])
+            self._on_station_select()
+        self.status_var.set(f"{len(matches)} estação(ões) para '{filter_text}'")
+
+    def _on_station_save_error(self, message):
+        """
+        Chamado pela thread de gravação quando salvar as estações falha.
+        Enfileira a mensagem e avisa o Tkinter por uma thread auxiliar, como o
+        RadioPlayer faz com seus eventos: after() chamado fora da thread do
+        Tkinter espera o mainloop, e a thread de gravação não pode ficar presa
+        nisso (a thread principal pode estar esperando por ela).
+        """
+        self._save_errors.put(message)
+        threading.Thread(target=self._notify_station_save_error, name="SaveErrorNotify", daemon=True).start()
+
+    def _notify_station_save_error(self):
+        try:
+            self.after(0, self._process_station_save_errors)
+        except (RuntimeError, tk.TclError):
+            pass # Janela já destruída
+
+    def _process_station_save_errors(self):
+        """Mostra as falhas de gravação enfileiradas (uma janela por rajada de falhas)."""
+        if self._closing:
+            return
+        messages = []
+        while True:
+            try:
+                messages.append(self._save_errors.get_nowait())
+            except queue.Empty:
+                break
+        if messages:
+            self._show_station_save_error(messages[-1])
+
+    def _show_station_save_error(self, message):
+        """Mostra o erro de gravação das estações (executado na thread do Tkinter)."""
+        self.status_var.set("Erro ao salvar estações")
+        messagebox.showerror("Erro ao Salvar", message, parent=self)
+
     def _on_closing(self):
         """Chamado quando a janela é fechada."""
         logger.info("Sinal de fechamento da janela recebido.")
-        self._cancel_status_check() # Para a checagem de status
+        self._closing = True
+        if self._station_filter_job:
+            self.after_cancel(self._station_filter_job)
+            self._station_filter_job = None
+        if self.station_manager:
+            self.station_manager.close() # Grava o que estiver pendente e consolida o armazenamento
+        if shutdown_default_client:
+            shutdown_default_client() # Cancela buscas pendentes e fecha conexões HTTP
+        if shutdown_default_catalog:
+            shutdown_default_catalog() # Fecha o catálogo local (se foi aberto)
         if self.player:
             logger.info("Liberando recursos do player VLC...")
             self.player.release() # Libera recursos do VLC
@@ -295,15 +492,16 @@ class MainWindow(tk.Tk):
 
     # --- Ações de Playback ---
 
-    def _play_radio(self):
-        """Inicia a reprodução da estação selecionada."""
-        station_name = self.selected_station_var.get()
+    def _play_radio(self, station_name: str | None = None):
+        """Inicia a reprodução da estação indicada (padrão: a selecionada)."""
+        station_name = station_name or self.selected_station_var.get()
         if not station_name:
             messagebox.showwarning("Nenhuma Estação", "Selecione uma estação para tocar.")
             logger.warning("Tentativa de Play sem estação selecionada.")
             return
 
-        station_url = self.station_manager.get_station_url(station_name)
+        station = self.station_manager.get_station(station_name)
+        station_url = station.url if station else None
         if not station_url:
             messagebox.showerror("Erro", f"Não foi possível encontrar a URL para '{station_name}'.")
             logger.error(f"URL não encontrada para a estação '{station_name}'.")
@@ -317,6 +515,7 @@ class MainWindow(tk.Tk):
         self.play_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL) # Habilita Stop imediatamente
         self.station_combobox.config(state=tk.DISABLED)
+        self.station_filter_entry.config(state=tk.DISABLED)
         self.add_button.config(state=tk.DISABLED)
         self.edit_button.config(state=tk.DISABLED)
         self.remove_button.config(state=tk.DISABLED)
@@ -325,10 +524,11 @@ class MainWindow(tk.Tk):
         # self.next_button.config(state=tk.DISABLED) # Não desabilitar durante play
 
         try:
-            if self.player.play(station_url):
+            if self.player.play(station_url, station.buffer_profile):
+                self._play_generation = self.player.play_generation
+                self._playing_station = station_name
                 logger.info(f"Comando play enviado para VLC com URL: {station_url}")
-                # Inicia a checagem de status para atualizar a UI
-                self._schedule_status_check()
+                # O progresso (Opening/Buffering/Playing/Error) chega por _process_player_events
             else:
                 # Se player.play() retornar False imediatamente
                 raise RuntimeError("Falha ao iniciar a mídia no player VLC.")
@@ -341,7 +541,6 @@ class MainWindow(tk.Tk):
     def _stop_radio(self):
         """Para a reprodução atual."""
         logger.info("Comando Stop recebido.")
-        self._cancel_status_check() # Para a checagem de status
         if self.player:
             self.player.stop()
             logger.info("Comando stop enviado para VLC.")
@@ -400,25 +599,38 @@ class MainWindow(tk.Tk):
 
     def _select_station_by_index_offset(self, offset):
         """Seleciona e toca uma estação baseado no índice atual + offset."""
-        station_names = self.station_manager.get_station_names()
-        if len(station_names) < 2: # Não faz nada se tiver 0 ou 1 estação
+        num_stations = self.station_manager.station_count
+        if num_stations < 2: # Não faz nada se tiver 0 ou 1 estação
             logger.debug("Navegação ignorada: menos de 2 estações.")
             return
 
         current_name = self.selected_station_var.get()
-        try:
-            current_index = station_names.index(current_name)
-        except ValueError:
+        current_index = self.station_manager.index_of(current_name)
+        if current_index is None:
             # Se a estação atual não está na lista (improvável, mas seguro)
             current_index = 0 # Vai para a primeira
 
-        new_index = (current_index + offset) % len(station_names)
-        new_station_name = station_names[new_index]
+        new_index = (current_index + offset) % num_stations
+        new_station_name = self.station_manager.get_station_name_at(new_index)
 
         logger.info(f"Navegando para estação índice {new_index}: '{new_station_name}'")
         self.selected_station_var.set(new_station_name)
         self._play_radio() # Toca a nova estação selecionada
 
+    def _prewarm_neighbor_stations(self):
+        """Pré-aquece a próxima e a anterior da lista para o Anterior/Próxima trocar sem espera."""
+        num_stations = self.station_manager.station_count
+        current_index = self.station_manager.index_of(self.selected_station_var.get())
+        if num_stations < 2 or current_index is None:
+            return
+        candidates = []
+        for offset in (1, -1): # Próxima primeiro: é a direção mais comum de zapping
+            name = self.station_manager.get_station_name_at((current_index + offset) % num_stations)
+            station = self.station_manager.get_station(name)
+            if station:
+                candidates.append((station.url, station.bitrate, station.buffer_profile))
+        self.player.prewarm(candidates)
+
     def _select_prev_station(self):
         """Seleciona a estação anterior."""
         logger.debug("Botão Anterior pressionado.")
@@ -430,119 +642,93 @@ class MainWindow(tk.Tk):
         self._select_station_by_index_offset(1)
 
 
-    # --- Checagem de Status do Player ---
+    # --- Eventos do Player ---
 
-    def _schedule_status_check(self):
-        """Agenda a próxima verificação de status do player."""
-        # Cancela qualquer job anterior para evitar duplicação
-        self._cancel_status_check()
-        # Agenda para rodar _check_playback_status após 1000ms (1 segundo)
-        self._status_check_job = self.after(1000, self._check_playback_status)
-        logger.debug(f"Checagem de status agendada. Job ID: {self._status_check_job}")
-
-    def _cancel_status_check(self):
-        """Cancela a verificação de status agendada, se houver."""
-        if self._status_check_job:
-            logger.debug(f"Cancelando checagem de status agendada. Job ID: {self._status_check_job}")
-            self.after_cancel(self._status_check_job)
-            self._status_check_job = None
+    def _on_player_events_ready(self):
+        """
+        Chamado pelo RadioPlayer (na sua thread de aviso, nunca na do VLC)
+        quando há eventos novos. Agenda o consumo da fila na thread do Tkinter.
+        """
+        try:
+            self.after(0, self._process_player_events)
+        except (RuntimeError, tk.TclError):
+            pass # Janela já destruída
 
-    def _check_playback_status(self):
-        """Verifica o status do player e atualiza a UI. Reagenda se necessário."""
+    def _process_player_events(self):
+        """Consome os eventos do player e atualiza a UI (thread do Tkinter)."""
         if not self.player:
-            logger.warning("Checagem de status abortada: player não existe.")
-            self._reset_ui_to_stopped_state()
             return
+        for generation, kind, value in self.player.drain_events():
+            try:
+                self._handle_player_event(generation, kind, value)
+            except Exception as e:
+                logger.error(f"Erro ao tratar evento do player ({kind}, {value}): {e}", exc_info=True)
+                self._reset_ui_to_stopped_state()
 
-        try:
-            current_state = self.player.get_state()
-            logger.debug(f"Checando status do player. Estado atual: {current_state}")
-
-            # Atualiza o texto da barra de status
-            self._update_status_text(current_state)
-
-            # Lógica de reagendamento e UI
-            active_states = {
-                vlc.State.Playing,
-                vlc.State.Buffering,
-                vlc.State.Opening
-            }
-
-            if current_state in active_states:
-                # Se atingiu o estado Playing pela primeira vez, ajusta o volume inicial
-                if current_state == vlc.State.Playing and not self._has_reached_playing:
-                    logger.info("Estado 'Playing' detectado pela primeira vez. Ajustando volume inicial.")
-                    self._set_volume(self.volume_var.get()) # Aplica o volume do slider
-                    self._has_reached_playing = True
-
-                # Continua tocando ou tentando, reagenda a verificação
-                self._schedule_status_check()
-            else:
-                # Estado não ativo (Stopped, Ended, Error, etc.)
-                logger.info(f"Player não está mais em estado ativo ({current_state}). Parando checagem de status.")
-                if current_state == vlc.State.Error:
-                    logger.error("Player VLC reportou estado de Erro.")
-                    messagebox.showerror("Erro de Reprodução", "Ocorreu um erro durante a reprodução da estação.")
-                elif current_state != vlc.State.Stopped: # Se parou por outro motivo (Ended, etc)
-                    logger.info(f"Playback finalizado com estado: {current_state}")
-
-                # Para a checagem e reseta a UI (exceto se já foi explicitamente parado)
-                # Verifica se o botão stop já está desabilitado para evitar reset duplo
-                if self.stop_button['state'] != tk.DISABLED:
-                     self._reset_ui_to_stopped_state()
+    def _handle_player_event(self, generation, kind, value):
+        """Reage a uma transição de estado, progresso de buffer ou novos metadados."""
+        # Eventos da mídia anterior (ainda na fila quando outra estação foi aberta) são descartados
+        if generation != self._play_generation:
+            return
+        # Eventos que chegam depois de um Stop (ou antes de qualquer Play) são ignorados
+        playback_active = self.stop_button['state'] != tk.DISABLED
+        if not playback_active:
+            return
 
-        except Exception as e:
-            logger.error(f"Erro durante a checagem de status do player: {e}", exc_info=True)
-            # Para a checagem em caso de erro e reseta a UI
-            self._reset_ui_to_stopped_state()
+        if kind == EVENT_BUFFERING:
+            if not self._has_reached_playing:
+                station_name = self._playing_station or self.selected_station_var.get()
+                self.status_var.set(f"Bufferizando {station_name}... {value:.0f}%")
+            return
+        if kind == EVENT_META:
+            if self._has_reached_playing:
+                self._update_status_text(vlc.State.Playing)
+            return
 
+        state = value
+        logger.debug(f"Evento de estado do player: {state}")
+        if state == vlc.State.Playing:
+            if not self._has_reached_playing:
+                # Atingiu o estado Playing pela primeira vez: ajusta o volume inicial
+                logger.info("Estado 'Playing' detectado pela primeira vez. Ajustando volume inicial.")
+                self._set_volume(self.volume_var.get()) # Aplica o volume do slider
+                self._has_reached_playing = True
+                self._prewarm_neighbor_stations()
+            self._update_status_text(state)
+        elif state in (vlc.State.Opening, vlc.State.Paused):
+            self._update_status_text(state)
+        elif state == vlc.State.Error:
+            logger.error("Player VLC reportou estado de Erro.")
+            self.player.clear_prewarm()
+            self._reset_ui_to_stopped_state()
+            self._update_status_text(state)
+            messagebox.showerror("Erro de Reprodução", "Ocorreu um erro durante a reprodução da estação.")
+        elif state == vlc.State.Ended:
+            logger.info(f"Playback finalizado com estado: {state}")
+            self.player.clear_prewarm()
+            self._reset_ui_to_stopped_state()
+            self._update_status_text(state)
+        # Stopped: só ocorre por Stop (a UI já foi resetada) ou na troca de estação
 
     def _update_status_text(self, state):
         """Atualiza o texto da barra de status baseado no estado do VLC."""
-        station_name = self.selected_station_var.get()
+        station_name = self._playing_station or self.selected_station_var.get()
         status_text = "Status desconhecido"
 
         if state == vlc.State.Opening:
             status_text = f"Abrindo {station_name}..."
         elif state == vlc.State.Buffering:
-            # Tenta obter a porcentagem do buffer (pode não funcionar sempre)
-            try:
-                media = self.player._player.get_media()
-                if media:
-                    # A forma de obter buffer pode variar; get_stats() pode ser útil
-                    # Exemplo: stats = media.get_stats(); buffer_percent = stats.demux_read_bytes # Ajustar
-                    status_text = f"Bufferizando {station_name}..." # Simplificado por enquanto
-                else:
-                    status_text = f"Bufferizando {station_name}..."
-            except Exception:
-                 status_text = f"Bufferizando {station_name}..."
+            status_text = f"Bufferizando {station_name}..."
         elif state == vlc.State.Playing:
-            # Tenta obter metadados (título da música, etc.)
-            metadata = "Metadados não disponíveis"
+            # Metadados (título da música, etc.), quando o stream os fornece
             try:
-                media = self.player._player.get_media()
-                if media:
-                    # media.parse_if_needed() # Removido
-                    title = media.get_meta(vlc.Meta.Title)
-                    artist = media.get_meta(vlc.Meta.Artist)
-                    now_playing = media.get_meta(vlc.Meta.NowPlaying) # Comum em streams
-
-                    if now_playing:
-                        metadata = now_playing
-                    elif title and artist:
-                        metadata = f"{artist} - {title}"
-                    elif title:
-                        metadata = title
-                    else:
-                         # Tenta pegar o nome do arquivo/URL como fallback
-                         mrl = media.get_mrl()
-                         if mrl:
-                             metadata = os.path.basename(mrl) # Mostra nome do arquivo ou URL
-
-                status_text = f"Tocando: {station_name} ({metadata})"
-
+                metadata = self.player.get_now_playing()
             except Exception as e:
                 logger.warning(f"Não foi possível obter metadados: {e}")
+                metadata = None
+            if metadata:
+                status_text = f"Tocando: {station_name} ({metadata})"
+            else:
                 status_text = f"Tocando: {station_name}"
 
         elif state == vlc.State.Paused: # Embora não tenhamos botão de pause
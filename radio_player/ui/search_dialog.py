@@ -1,14 +1,39 @@
 # /home/marcos/projeto1/radio_player/ui/search_dialog.py
 import tkinter as tk
 from tkinter import ttk, messagebox, Listbox, Scrollbar, END
+import bisect
 import logging
-import requests # Para fazer as requisições HTTP
-import json # Para tratar possíveis erros de JSON
+import sqlite3
+import requests # Para identificar os erros de rede
+
+from radio_player.core.importer import station_from_record
+from radio_player.core.station import Station
+from radio_player.net.catalog import get_default_catalog
+from radio_player.net.radiobrowser import get_default_client
 
 logger = logging.getLogger(__name__)
 
-# URL base da API do Radio Browser
-RADIO_BROWSER_API_URL = "https://de1.api.radio-browser.info/json/stations/byname/"
+# Busca enquanto digita: espera (ms) após a última tecla e tamanho mínimo do termo
+LIVE_SEARCH_DELAY_MS = 400
+LIVE_SEARCH_MIN_CHARS = 3
+# Linhas inseridas na Listbox por fatia (entre fatias o Tk processa eventos)
+RESULTS_RENDER_CHUNK = 250
+# Estações pedidas à API por página; a próxima página é pedida ao rolar perto do fim
+SEARCH_PAGE_SIZE = 100
+LOAD_MORE_THRESHOLD = 0.9 # Fração da lista visível a partir da qual carrega mais
+
+# Campos da API guardados por resultado (o restante da resposta é descartado)
+RESULT_FIELDS = ("stationuuid", "name", "url", "tags", "country", "countrycode", "codec", "bitrate", "votes", "lastcheckok")
+
+# Ordenações da lista de resultados: rótulo -> chave de ordenação (None = ordem da API)
+SORT_OPTIONS = {
+    "Relevância": None,
+    "Nome": lambda station: station.get('name', '').casefold(),
+    "Bitrate": lambda station: -(station.get('bitrate') or 0),
+    "Votos": lambda station: -(station.get('votes') or 0),
+    "País": lambda station: (not station.get('countrycode'), station.get('countrycode') or '',
+                             station.get('name', '').casefold()),
+}
 
 class SearchDialog(tk.Toplevel):
     """Janela de diálogo para buscar e adicionar estações de rádio online."""
@@ -23,6 +48,7 @@ class SearchDialog(tk.Toplevel):
         """
         super().__init__(parent)
         self.parent = parent # Referência à MainWindow
+        self._client = get_default_client() # Cliente HTTP compartilhado (pool de conexões)
         self.title("Buscar Rádios Online")
         # Manter altura aumentada por enquanto
         self.geometry("500x430")
@@ -30,6 +56,15 @@ class SearchDialog(tk.Toplevel):
         # Variável para status da busca
         self.status_var = tk.StringVar(value="")
 
+        # Controle das buscas em segundo plano: só o resultado da geração atual é aplicado
+        self._search_generation = 0
+        self._search_future = None # Future da busca em andamento (None se nenhuma)
+        self._live_search_job = None # ID do job 'after' da busca enquanto digita
+
+        # Busca local: consulta o catálogo offline em vez da API
+        self.local_search_var = tk.BooleanVar(value=False)
+        self._catalog = None # Aberto ao ativar a busca local
+
         # Frame principal
         main_frame = ttk.Frame(self, padding="10")
         main_frame.pack(expand=True, fill=tk.BOTH)
@@ -48,11 +83,20 @@ class SearchDialog(tk.Toplevel):
         # Usar grid - Coluna 1, sticky=EW para preencher horizontalmente
         self.search_entry.grid(row=0, column=1, padx=(0, 5), sticky=tk.EW)
         self.search_entry.bind("<Return>", self._perform_search) # Permite buscar com Enter
+        # Busca enquanto digita (com espera após a última tecla)
+        self.search_var.trace_add("write", self._on_search_text_changed)
 
-        self.search_button = ttk.Button(search_frame, text="Buscar", command=self._perform_search)
+        # Vira "Cancelar" enquanto uma busca está em andamento
+        self.search_button = ttk.Button(search_frame, text="Buscar", command=self._on_search_button)
         # Usar grid - Coluna 2
         self.search_button.grid(row=0, column=2)
 
+        # Catálogo offline (baixado uma vez e atualizado em segundo plano)
+        self.local_search_check = ttk.Checkbutton(search_frame, text="Busca local (catálogo offline)",
+                                                  variable=self.local_search_var,
+                                                  command=self._on_local_search_toggled)
+        self.local_search_check.grid(row=1, column=1, columnspan=2, pady=(5, 0), sticky=tk.W)
+
         # Configurar a coluna 1 (do Entry) para expandir
         search_frame.columnconfigure(1, weight=1)
 
@@ -62,16 +106,27 @@ class SearchDialog(tk.Toplevel):
         results_frame.grid(row=1, column=0, sticky=tk.NSEW)
 
         # Listbox para exibir resultados (dentro do results_frame)
-        self.results_listbox = Listbox(results_frame, height=15)
+        # Seleção estendida (Shift/Ctrl) para adicionar várias estações de uma vez
+        self.results_listbox = Listbox(results_frame, height=15, selectmode=tk.EXTENDED)
         self.results_listbox.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
 
         # Scrollbar para a Listbox (dentro do results_frame)
-        scrollbar = Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results_listbox.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.results_listbox.config(yscrollcommand=scrollbar.set)
-
-        # Armazenar os dados completos das estações encontradas (nome -> url)
-        self._search_results_data = {}
+        self.results_scrollbar = Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results_listbox.yview)
+        self.results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        # Além de mover a barra, detecta quando o usuário chega perto do fim da lista
+        self.results_listbox.config(yscrollcommand=self._on_results_scrolled)
+
+        # Resultados válidos na ordem da API (registros compactos com os campos de
+        # RESULT_FIELDS; reordenados localmente, sem nova busca)
+        self._search_results = []
+        self._result_names = set() # Nomes já na lista (evita duplicatas visuais)
+        self._render_generation = 0 # Invalida a renderização em fatias anterior
+        self._render_pending = False # Ainda há fatias a inserir
+        self._displayed_rows = [] # Resultados na ordem em que aparecem na lista
+        # Paginação da busca online atual
+        self._search_term = ""
+        self._next_offset = 0
+        self._has_more_results = False
 
         # --- Botões de Ação ---
         action_frame = ttk.Frame(main_frame)
@@ -79,10 +134,18 @@ class SearchDialog(tk.Toplevel):
         action_frame.grid(row=2, column=0, sticky=tk.EW, pady=(10, 5))
 
 
-        self.add_button = ttk.Button(action_frame, text="Adicionar Selecionada", command=self._add_selected_station)
+        self.add_button = ttk.Button(action_frame, text="Adicionar Selecionadas", command=self._add_selected_stations)
         self.add_button.pack(side=tk.LEFT, padx=5)
         self.add_button.config(state=tk.DISABLED) # Habilitar apenas quando algo for selecionado
 
+        # Ordenação local dos resultados
+        self.sort_var = tk.StringVar(value="Relevância")
+        self.sort_combobox = ttk.Combobox(action_frame, textvariable=self.sort_var, values=list(SORT_OPTIONS),
+                                          state="readonly", width=11)
+        self.sort_combobox.pack(side=tk.LEFT, padx=(10, 5))
+        self.sort_combobox.bind("<<ComboboxSelected>>", lambda event: self._render_results())
+        ttk.Label(action_frame, text="Ordenar:").pack(side=tk.LEFT, before=self.sort_combobox)
+
         self.close_button = ttk.Button(action_frame, text="Fechar", command=self.destroy)
         self.close_button.pack(side=tk.RIGHT, padx=5)
 
@@ -101,93 +164,350 @@ class SearchDialog(tk.Toplevel):
         # Foco inicial no campo de busca
         self.search_entry.focus_set()
 
-    def _perform_search(self, event=None):
-        """Executa a busca na API do Radio Browser."""
+    def _on_search_button(self):
+        """Botão Buscar/Cancelar."""
+        if self._search_future is not None:
+            self._cancel_search()
+        else:
+            self._perform_search()
+
+    def _on_local_search_toggled(self):
+        """Ativa/desativa a busca no catálogo local, atualizando-o se necessário."""
+        if not self.local_search_var.get():
+            return
+        try:
+            if self._catalog is None:
+                self._catalog = get_default_catalog()
+            needs_update = self._catalog.needs_update()
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Não foi possível abrir o catálogo local: {e}", exc_info=True)
+            self.local_search_var.set(False)
+            messagebox.showerror("Erro no Catálogo", f"Não foi possível abrir o catálogo local:\n{e}", parent=self)
+            return
+        if needs_update:
+            if self._catalog.is_empty():
+                self.status_var.set("Baixando catálogo de estações (a busca será online até terminar)...")
+            logger.info("Atualizando o catálogo local em segundo plano.")
+            self._catalog.update_async(self._client, self.parent,
+                                       on_success=self._on_catalog_updated,
+                                       on_error=self._on_catalog_update_error)
+
+    def _on_catalog_updated(self, written):
+        """Fim da atualização do catálogo (executado na thread do Tkinter)."""
+        if self.winfo_exists() and self._search_future is None:
+            self.status_var.set(f"Catálogo local atualizado ({self._catalog.count()} estações).")
+
+    def _on_catalog_update_error(self, error):
+        """Falha na atualização do catálogo: a busca local segue com os dados que houver."""
+        logger.error(f"Erro ao atualizar o catálogo local: {error}", exc_info=error)
+        if self.winfo_exists():
+            self.status_var.set("Não foi possível atualizar o catálogo local.")
+
+    def _search_catalog(self, search_term) -> list[dict] | None:
+        """Busca no catálogo local; None se a busca local estiver desligada ou indisponível."""
+        if not self.local_search_var.get() or self._catalog is None:
+            return None
+        try:
+            if self._catalog.is_empty():
+                return None # Ainda baixando: usa a API
+            return self._catalog.search(search_term)
+        except sqlite3.Error as e:
+            logger.error(f"Erro na busca local por '{search_term}': {e}. Usando a busca online.")
+            return None
+
+    def _on_search_text_changed(self, *args):
+        """Reagenda a busca automática a cada tecla (debounce)."""
+        if self._live_search_job:
+            self.after_cancel(self._live_search_job)
+        self._live_search_job = self.after(LIVE_SEARCH_DELAY_MS, self._live_search)
+
+    def _live_search(self):
+        """Busca automática disparada após uma pausa na digitação."""
+        self._live_search_job = None
+        if len(self.search_var.get().strip()) >= LIVE_SEARCH_MIN_CHARS:
+            self._perform_search(interactive=False)
+
+    def _perform_search(self, event=None, interactive=True):
+        """
+        Dispara a busca na API do Radio Browser em segundo plano.
+        Uma nova busca substitui a anterior: o resultado da antiga é descartado.
+        Com a busca local ativa, o catálogo offline responde na hora; senão,
+        termos já buscados (ou refinamentos deles) são respondidos pelo cache
+        do cliente, sem acesso à rede.
+
+        Args:
+            interactive: False para a busca enquanto digita (sem caixas de mensagem).
+        """
+        if self._live_search_job:
+            # Busca explícita (Enter/botão) substitui a automática agendada
+            self.after_cancel(self._live_search_job)
+            self._live_search_job = None
+
         search_term = self.search_var.get().strip()
         if not search_term:
-            messagebox.showwarning("Busca Vazia", "Por favor, digite um nome para buscar.", parent=self)
+            if interactive:
+                messagebox.showwarning("Busca Vazia", "Por favor, digite um nome para buscar.", parent=self)
             return
 
-        logger.info(f"Buscando estações online com termo: '{search_term}'")
-        self.status_var.set("Buscando...") # Atualiza status
-        self.search_button.config(state=tk.DISABLED)
-        self.results_listbox.delete(0, END) # Limpa resultados anteriores
-        self._search_results_data.clear()
-        self.add_button.config(state=tk.DISABLED)
+        self._cancel_pending_search()
+        self._search_generation += 1
+        generation = self._search_generation
 
-        response = None # Inicializa response para o finally
-        try:
-            # Monta a URL da API
-            api_url = f"{RADIO_BROWSER_API_URL}{requests.utils.quote(search_term)}"
-            headers = {'User-Agent': 'RadioPlayerApp/1.0'} # Boa prática incluir User-Agent
-            logger.debug(f"Request URL: {api_url}")
+        self._clear_results() # Limpa resultados anteriores
+
+        local = self._search_catalog(search_term)
+        if local is not None:
+            logger.info(f"Busca '{search_term}' respondida pelo catálogo local (busca #{generation}).")
+            self._on_search_results(generation, search_term, local, interactive)
+            return
+
+        self._search_term = search_term
+        cached = self._client.get_cached_search(search_term)
+        if cached is not None and (cached[1] or cached[0]):
+            stations, complete = cached
+            logger.info(f"Busca '{search_term}' respondida pelo cache (busca #{generation}).")
+            # Resultado parcial: o restante é pedido à API ao rolar a lista, como uma página seguinte
+            self._on_search_results(generation, search_term, stations, interactive,
+                                    limit=None if complete else len(stations))
+            return
 
-            response = requests.get(api_url, headers=headers, timeout=10) # Timeout de 10s
-            logger.debug(f"Response Status Code: {response.status_code}")
-            response.raise_for_status() # Levanta exceção para erros HTTP (4xx, 5xx)
+        logger.info(f"Buscando estações online com termo: '{search_term}' (busca #{generation})")
+        self.status_var.set("Buscando...") # Atualiza status
+        self._request_page(generation, search_term, 0, interactive)
+
+    def _request_page(self, generation, search_term, offset, interactive):
+        """Pede uma página de resultados à API em segundo plano."""
+        self.search_button.config(text="Cancelar")
+        # A requisição roda no pool de threads do cliente; o resultado volta via after()
+        # agendado na janela principal (que sobrevive ao fechamento deste diálogo)
+        self._search_future = self._client.search_by_name_async(
+            self.parent,
+            search_term,
+            on_success=lambda stations: self._on_search_results(generation, search_term, stations, interactive,
+                                                                offset=offset, limit=SEARCH_PAGE_SIZE),
+            on_error=lambda error: self._on_search_error(generation, search_term, error, interactive),
+            limit=SEARCH_PAGE_SIZE,
+            offset=offset,
+        )
+
+    def _on_results_scrolled(self, first, last):
+        """yscrollcommand da lista: move a barra e carrega a próxima página perto do fim."""
+        self.results_scrollbar.set(first, last)
+        if float(last) >= LOAD_MORE_THRESHOLD:
+            self._load_more_results()
+
+    def _load_more_results(self):
+        """Pede a próxima página da busca atual, se houver e nenhuma estiver a caminho."""
+        if not self._has_more_results or self._search_future is not None:
+            return
+        logger.info(f"Carregando mais resultados para '{self._search_term}' (a partir de {self._next_offset}).")
+        self.status_var.set(f"{len(self._search_results)} estações; carregando mais...")
+        self._request_page(self._search_generation, self._search_term, self._next_offset, interactive=False)
+
+    def _cancel_pending_search(self):
+        """Descarta a busca em andamento, se houver (o resultado será ignorado)."""
+        if self._search_future is not None:
+            # Cancela se ainda estiver na fila; se já estiver em execução, o
+            # resultado será descartado pela checagem de geração
+            self._search_future.cancel()
+            self._search_future = None
+            self._search_generation += 1
+
+    def _cancel_search(self):
+        """Cancela a busca em andamento a pedido do usuário."""
+        logger.info("Busca cancelada pelo usuário.")
+        self._cancel_pending_search()
+        self._finish_search()
+        self.status_var.set("Busca cancelada.")
+
+    def _finish_search(self):
+        """Volta o botão ao estado 'Buscar' após o fim (ou cancelamento) da busca."""
+        self._search_future = None
+        self.search_button.config(text="Buscar")
+
+    def _is_current_search(self, generation) -> bool:
+        """Indica se o resultado pertence à busca atual (e se o diálogo ainda existe)."""
+        if generation != self._search_generation:
+            logger.debug(f"Resultado da busca #{generation} descartado (obsoleto).")
+            return False
+        return bool(self.winfo_exists())
+
+    def _on_search_results(self, generation, search_term, stations, interactive=True, offset=0, limit=None):
+        """
+        Preenche a lista com os resultados da busca (executado na thread do Tkinter).
 
-            stations = response.json()
+        Args:
+            offset: Posição da página recebida (0 = primeira página: substitui a lista).
+            limit: Tamanho de página pedido (None = resultado completo, sem mais páginas).
+        """
+        if not self._is_current_search(generation):
+            return
+        self._finish_search()
+        # Página cheia: provavelmente há mais resultados no servidor
+        self._has_more_results = limit is not None and len(stations) >= limit
+        self._next_offset = offset + len(stations)
+        if offset > 0:
+            self._append_results(search_term, stations)
+            return
 
-            if not stations:
+        if not stations:
+            if interactive:
                 messagebox.showinfo("Nenhum Resultado", f"Nenhuma estação encontrada para '{search_term}'.", parent=self)
-                self.status_var.set(f"Nenhum resultado para '{search_term}'")
-                logger.info("Nenhuma estação encontrada.")
-                # Não precisa de return aqui, o finally cuidará do botão
-            else:
-                logger.info(f"Encontradas {len(stations)} estações.")
-                count = 0
-                for station in stations:
-                    # Pega nome e URL (ignora estações sem URL válida)
-                    name = station.get('name', '').strip()
-                    # Tenta url_resolved primeiro, depois url normal
-                    url = station.get('url_resolved') or station.get('url')
-
-                    if name and url and url.startswith(('http://', 'https://')):
-                        # Adiciona à lista visível (evita duplicatas de nome na exibição)
-                        # Verifica se o nome já existe nos dados para evitar duplicatas visuais
-                        if name not in self._search_results_data:
-                             display_text = f"{name}"
-                             # Opcional: adicionar mais info como país ou tags
-                             country = station.get('countrycode')
-                             # tags = station.get('tags') # Descomente se quiser mostrar tags
-                             if country:
-                                 display_text += f" ({country})"
-                             # if tags:
-                             #     display_text += f" [{tags[:30]}]" # Limita tamanho das tags
-                             self.results_listbox.insert(END, display_text)
-                             # Armazena URL associada ao nome exato
-                             self._search_results_data[name] = url
-                             count += 1
-
-                logger.info(f"{count} estações válidas adicionadas aos resultados.")
-                self.status_var.set(f"{count} estações encontradas para '{search_term}'.")
-                if count == 0 and stations: # Se houve resposta mas nenhuma válida
-                     messagebox.showinfo("Nenhum Resultado Válido", "Nenhuma estação com URL válida encontrada nos resultados.", parent=self)
-
-
-        except requests.exceptions.Timeout:
-            logger.error(f"Timeout ao buscar estações: {search_term}", exc_info=True)
+            self.status_var.set(f"Nenhum resultado para '{search_term}'")
+            logger.info("Nenhuma estação encontrada.")
+            return
+
+        logger.info(f"Encontradas {len(stations)} estações.")
+        results = self._valid_results(stations)
+        count = len(results)
+        self._search_results = results
+        self._render_results()
+        logger.info(f"{count} estações válidas adicionadas aos resultados.")
+        self._update_results_status(search_term)
+        if count == 0 and interactive and not self._has_more_results: # Se houve resposta mas nenhuma válida
+             messagebox.showinfo("Nenhum Resultado Válido", "Nenhuma estação com URL válida encontrada nos resultados.", parent=self)
+        elif self._has_more_results and float(self.results_listbox.yview()[1]) >= 1.0:
+            # A primeira página não encheu a lista: não haverá rolagem para pedir a próxima
+            self._load_more_results()
+
+    def _valid_results(self, stations) -> list[dict]:
+        """
+        Filtra as estações com nome e URL válidos, ainda não presentes na lista,
+        reduzindo cada uma a um registro compacto (campos de RESULT_FIELDS).
+        """
+        results = []
+        for station in stations:
+            # Pega nome e URL (ignora estações sem URL válida)
+            name = (station.get('name') or '').strip()
+            # Tenta url_resolved primeiro, depois url normal
+            url = station.get('url_resolved') or station.get('url')
+
+            if name and url and url.startswith(('http://', 'https://')):
+                # Adiciona à lista visível (evita duplicatas de nome na exibição)
+                if name not in self._result_names:
+                    record = {field: station[field] for field in RESULT_FIELDS if station.get(field) not in (None, '')}
+                    record['name'] = name
+                    record['url'] = url
+                    results.append(record)
+                    self._result_names.add(name)
+        return results
+
+    def _append_results(self, search_term, stations):
+        """Acrescenta uma página seguinte aos resultados já exibidos."""
+        new_results = self._valid_results(stations)
+        logger.info(f"Página com {len(stations)} estações ({len(new_results)} novas) para '{search_term}'.")
+        self._search_results.extend(new_results)
+        sort_key = SORT_OPTIONS.get(self.sort_var.get())
+        if sort_key is None:
+            # Ordem da API: as linhas exibidas são a própria lista de resultados, então
+            # uma renderização em andamento já alcança as novas; senão, insere no fim
+            if not self._render_pending:
+                self._render_chunk(self._render_generation, new_results, 0)
+        elif self._render_pending:
+            self._render_results()
+        else:
+            # Insere cada nova linha na posição da ordenação (mantém a rolagem)
+            for station in new_results:
+                index = bisect.bisect_right(self._displayed_rows, sort_key(station), key=sort_key)
+                self._displayed_rows.insert(index, station)
+                self.results_listbox.insert(index, self._format_result(station))
+        self._update_results_status(search_term)
+
+    def _update_results_status(self, search_term):
+        count = len(self._search_results)
+        if self._has_more_results:
+            self.status_var.set(f"{count} estações para '{search_term}' (role para carregar mais).")
+        else:
+            self.status_var.set(f"{count} estações encontradas para '{search_term}'.")
+
+    @staticmethod
+    def _format_result(station) -> str:
+        """Texto exibido na lista para um resultado."""
+        display_text = station.get('name', '').strip()
+        # Opcional: adicionar mais info como país ou tags
+        country = station.get('countrycode')
+        # tags = station.get('tags') # Descomente se quiser mostrar tags
+        if country:
+            display_text += f" ({country})"
+        # if tags:
+        #     display_text += f" [{tags[:30]}]" # Limita tamanho das tags
+        return display_text
+
+    def _clear_results(self):
+        """Esvazia a lista de resultados e interrompe uma renderização em andamento."""
+        self._render_generation += 1
+        self._render_pending = False
+        self._displayed_rows = []
+        self._has_more_results = False
+        self._next_offset = 0
+        self.results_listbox.delete(0, END)
+        self._search_results = []
+        self._result_names.clear()
+        self.add_button.config(state=tk.DISABLED)
+
+    def _render_results(self):
+        """
+        (Re)exibe os resultados na ordem escolhida. As linhas são inseridas em
+        fatias agendadas com after_idle, para que milhares de resultados não
+        travem o diálogo enquanto a lista é preenchida.
+        """
+        self._render_generation += 1
+        self.results_listbox.delete(0, END)
+        self.add_button.config(state=tk.DISABLED)
+        sort_key = SORT_OPTIONS.get(self.sort_var.get())
+        rows = sorted(self._search_results, key=sort_key) if sort_key else self._search_results
+        self._displayed_rows = rows
+        self._render_chunk(self._render_generation, rows, 0)
+
+    def _render_chunk(self, generation, rows, start):
+        """Insere uma fatia de linhas (uma única chamada ao Tcl) e agenda a próxima."""
+        if generation != self._render_generation or not self.winfo_exists():
+            return # Nova busca/ordenação ou diálogo fechado
+        chunk = rows[start:start + RESULTS_RENDER_CHUNK]
+        if chunk:
+            self.results_listbox.insert(END, *[self._format_result(station) for station in chunk])
+        self._render_pending = start + RESULTS_RENDER_CHUNK < len(rows)
+        if self._render_pending:
+            self.after_idle(self._render_chunk, generation, rows, start + RESULTS_RENDER_CHUNK)
+
+    def _on_search_error(self, generation, search_term, error, interactive=True):
+        """Trata falhas da busca (executado na thread do Tkinter)."""
+        if not self._is_current_search(generation):
+            return
+        # Garante que o botão volte a ser "Buscar"
+        self._finish_search()
+        if not interactive:
+            # Busca enquanto digita: apenas registra e mostra na barra de status
+            logger.warning(f"Falha na busca automática por '{search_term}': {error}")
+            self.status_var.set("Erro ao buscar. Pressione Enter para tentar de novo.")
+            return
+
+        if isinstance(error, ValueError): # Inclui json.JSONDecodeError
+             logger.error(f"Erro ao decodificar resposta JSON da API: {error}", exc_info=error)
+             self.status_var.set("Erro ao processar resposta da API.")
+             messagebox.showerror("Erro de API", "A resposta da API de rádios não é válida.", parent=self)
+        elif isinstance(error, requests.exceptions.Timeout):
+            logger.error(f"Timeout ao buscar estações: {search_term}", exc_info=error)
             self.status_var.set("Tempo esgotado ao buscar.")
             messagebox.showerror("Erro de Rede", "A busca demorou muito para responder (timeout). Tente novamente.", parent=self)
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Erro de rede ao buscar estações: {e}", exc_info=True)
+        elif isinstance(error, requests.exceptions.RequestException):
+            logger.error(f"Erro de rede ao buscar estações: {error}", exc_info=error)
             self.status_var.set("Erro de rede ao buscar.")
-            messagebox.showerror("Erro de Rede", f"Não foi possível conectar à API de rádios:\n{e}", parent=self)
-        except json.JSONDecodeError as e:
-             logger.error(f"Erro ao decodificar resposta JSON da API: {e}", exc_info=True)
-             # Verifica se response existe antes de acessar .text
-             raw_text = response.text[:500] + "..." if response else "N/A"
-             logger.debug(f"Raw response text: {raw_text}")
-             self.status_var.set("Erro ao processar resposta da API.")
-             messagebox.showerror("Erro de API", "A resposta da API de rádios não é válida.", parent=self)
-        except Exception as e:
-            logger.error(f"Erro inesperado durante a busca: {e}", exc_info=True)
+            messagebox.showerror("Erro de Rede", f"Não foi possível conectar à API de rádios:\n{error}", parent=self)
+        else:
+            logger.error(f"Erro inesperado durante a busca: {error}", exc_info=error)
             self.status_var.set("Erro inesperado durante a busca.")
-            messagebox.showerror("Erro Inesperado", f"Ocorreu um erro:\n{e}", parent=self)
-        finally:
-            # Garante que o botão de busca seja reabilitado
-            self.search_button.config(state=tk.NORMAL)
+            messagebox.showerror("Erro Inesperado", f"Ocorreu um erro:\n{error}", parent=self)
+
 
+    def destroy(self):
+        """Fecha o diálogo descartando a busca em andamento."""
+        if self._live_search_job:
+            self.after_cancel(self._live_search_job)
+            self._live_search_job = None
+        self._cancel_pending_search()
+        self._render_generation += 1
+        super().destroy()
 
     def _on_result_select(self, event=None):
         """Chamado quando um item é selecionado na lista de resultados."""
@@ -196,40 +516,67 @@ class SearchDialog(tk.Toplevel):
         else:
             self.add_button.config(state=tk.DISABLED)
 
-    def _add_selected_station(self):
-        """Adiciona a estação selecionada ao StationManager."""
-        selected_indices = self.results_listbox.curselection()
-        if not selected_indices:
+    def _selected_stations(self) -> list[Station]:
+        """
+        Estações das linhas selecionadas, na ordem da lista, com os metadados do
+        resultado (tags, país, codec, bitrate, uuid). A linha é associada ao
+        registro pela posição na lista, não pelo texto exibido.
+        """
+        selected = []
+        for selected_index in self.results_listbox.curselection():
+            if selected_index >= len(self._displayed_rows):
+                logger.error(f"Linha {selected_index} selecionada sem registro correspondente.")
+                continue
+            station = station_from_record(self._displayed_rows[selected_index])
+            if station is None:
+                logger.error(f"Registro inválido na linha {selected_index}: {self._displayed_rows[selected_index]}")
+                continue
+            selected.append(station)
+        return selected
+
+    def _add_selected_stations(self):
+        """
+        Adiciona as estações selecionadas ao StationManager com uma única
+        gravação (batch) e uma única atualização da janela principal.
+        """
+        if not self.results_listbox.curselection():
             return # Nada selecionado
 
-        selected_index = selected_indices[0]
-        # Pega o texto exibido na listbox
-        display_text = self.results_listbox.get(selected_index)
-
-        # Extrai o nome real (antes do parêntese, se houver)
-        station_name = display_text.split(' (')[0].strip()
-
-        # Pega a URL correspondente do nosso dicionário interno
-        station_url = self._search_results_data.get(station_name)
-
-        if not station_url:
-            logger.error(f"URL não encontrada nos dados internos para '{station_name}' (Texto: {display_text})")
+        stations = self._selected_stations()
+        if not stations:
             messagebox.showerror("Erro Interno", "Não foi possível obter a URL para a estação selecionada.", parent=self)
             return
 
-        logger.info(f"Tentando adicionar estação via busca: Nome='{station_name}', URL='{station_url}'")
+        station_manager = self.parent.station_manager
+        duplicates = [station.name for station in stations if station_manager.has_station(station.name)]
+        logger.info(f"Tentando adicionar {len(stations)} estação(ões) via busca ({len(duplicates)} já na lista).")
+
+        # Usa o station_manager da janela pai para adicionar (uma gravação para todas)
+        added = station_manager.add_stations(stations)
+        if not station_manager.last_batch_saved:
+            logger.error(f"Falha ao salvar {added} estação(ões) via diálogo de busca.")
+            messagebox.showerror("Erro ao Salvar", "Não foi possível salvar as estações selecionadas. Verifique os logs.", parent=self)
+            return
 
-        # Usa o station_manager da janela pai para adicionar
-        if self.parent.station_manager.add_station(station_name, station_url):
-            logger.info(f"Estação '{station_name}' adicionada com sucesso pelo diálogo de busca.")
-            messagebox.showinfo("Estação Adicionada", f"A estação '{station_name}' foi adicionada à sua lista.", parent=self)
-            # Atualiza a lista na janela principal!
+        if added:
+            # Atualiza a lista na janela principal (uma vez só)!
             self.parent._update_station_list()
-            # Opcional: fechar o diálogo após adicionar?
-            # self.destroy()
-            # Opcional: Limpar seleção e desabilitar botão Add após adicionar
+            self.parent._update_nav_buttons_state()
+            # Limpar seleção e desabilitar botão Add após adicionar
             self.results_listbox.selection_clear(0, END)
             self.add_button.config(state=tk.DISABLED)
-        else:
-            logger.error(f"Falha ao salvar a estação '{station_name}' via diálogo de busca.")
-            messagebox.showerror("Erro ao Salvar", f"Não foi possível salvar a estação '{station_name}'. Verifique os logs.", parent=self)
+
+        if len(stations) == 1:
+            station_name = stations[0].name
+            if added:
+                logger.info(f"Estação '{station_name}' adicionada com sucesso pelo diálogo de busca.")
+                messagebox.showinfo("Estação Adicionada", f"A estação '{station_name}' foi adicionada à sua lista.", parent=self)
+            else:
+                messagebox.showwarning("Estação Existente", f"A estação '{station_name}' já está na sua lista.", parent=self)
+            return
+
+        message = f"{added} estação(ões) adicionada(s) à sua lista."
+        if duplicates:
+            message += f"\n{len(duplicates)} já estava(m) na lista e foi(ram) ignorada(s)."
+        logger.info(message.replace("\n", " "))
+        messagebox.showinfo("Estações Adicionadas", message, parent=self)
@@ -0,0 +1,25 @@
+import pathlib
+import sys
+
+import pytest
+
+# Os testes nunca usam o libVLC de verdade: radio_player.audio importa este substituto
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent))
+import fake_vlc # noqa: E402
+from http_stub import StubServer # noqa: E402
+
+sys.modules["vlc"] = fake_vlc
+
+
+@pytest.fixture
+def stub_server():
+    """Fábrica de servidores HTTP locais (ver http_stub.StubServer), fechados ao fim do teste."""
+    servers = []
+
+    def create(handler=None):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+    yield create
+    for server in servers:
+        server.close()
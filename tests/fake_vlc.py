@@ -0,0 +1,175 @@
+"""
+Substituto mínimo do módulo vlc (python-vlc) para os testes.
+
+Reproduz o que importa para o RadioPlayer: contagem de referências nativas de
+Media (media_new/set_media/get_media/release), o memoize_parameterless de
+event_manager() e o registro de callbacks do EventManager. Os objetos vivos
+ficam visíveis em NATIVE_MEDIA / NATIVE_PLAYERS / WRAPPERS.
+"""
+import enum
+import functools
+import types
+import weakref
+
+NATIVE_MEDIA = set() # ids de Media com referência nativa > 0
+NATIVE_PLAYERS = set() # ids de MediaPlayer não liberados
+WRAPPERS = weakref.WeakSet() # Objetos Python (Media, MediaPlayer, EventManager) ainda vivos
+
+
+class State(enum.Enum):
+    NothingSpecial = 0
+    Opening = 1
+    Buffering = 2
+    Playing = 3
+    Paused = 4
+    Stopped = 5
+    Ended = 6
+    Error = 7
+
+
+class EventType:
+    MediaMetaChanged = 0
+    MediaPlayerOpening = 258
+    MediaPlayerBuffering = 259
+    MediaPlayerPlaying = 260
+    MediaPlayerPaused = 261
+    MediaPlayerStopped = 262
+    MediaPlayerEndReached = 265
+    MediaPlayerEncounteredError = 266
+
+
+class Meta:
+    Title = 0
+    Artist = 1
+    NowPlaying = 12
+
+
+class memoize_parameterless(object):
+    """Cópia do decorador do python-vlc (o cache nunca é limpo)."""
+
+    def __init__(self, func):
+        self.func = func
+        self._cache = {}
+
+    def __call__(self, obj):
+        try:
+            return self._cache[obj]
+        except KeyError:
+            v = self._cache[obj] = self.func(obj)
+            return v
+
+    def __get__(self, obj, objtype):
+        return functools.partial(self.__call__, obj)
+
+
+class EventManager:
+    def __init__(self):
+        self._callbacks = {}
+        WRAPPERS.add(self)
+
+    def event_attach(self, eventtype, callback, *args, **kwds):
+        self._callbacks[eventtype] = (callback, args, kwds)
+        return 0
+
+    def event_detach(self, eventtype):
+        self._callbacks.pop(eventtype, None)
+
+    def fire(self, eventtype, **fields):
+        """Simula uma notificação do libVLC."""
+        if eventtype in self._callbacks:
+            call, args, kwds = self._callbacks[eventtype]
+            event = types.SimpleNamespace(type=eventtype, u=types.SimpleNamespace(**fields))
+            call(event, *args, **kwds)
+
+
+class Media:
+    def __init__(self, mrl):
+        self.mrl = mrl
+        self.options = []
+        self.meta = {}
+        self._refs = 1
+        NATIVE_MEDIA.add(id(self))
+        WRAPPERS.add(self)
+
+    @memoize_parameterless
+    def event_manager(self):
+        return EventManager()
+
+    def add_option(self, option):
+        self.options.append(option)
+
+    def get_meta(self, key):
+        return self.meta.get(key)
+
+    def retain(self):
+        self._refs += 1
+
+    def release(self):
+        assert self._refs > 0, "Media liberada mais vezes do que retida"
+        self._refs -= 1
+        if self._refs == 0:
+            NATIVE_MEDIA.discard(id(self))
+
+
+class MediaPlayer:
+    def __init__(self):
+        self._media = None
+        self.state = State.NothingSpecial
+        self.volume = 100
+        self.muted = False
+        NATIVE_PLAYERS.add(id(self))
+        WRAPPERS.add(self)
+
+    @memoize_parameterless
+    def event_manager(self):
+        return EventManager()
+
+    def set_media(self, media):
+        if media is not None:
+            media.retain()
+        if self._media is not None:
+            self._media.release()
+        self._media = media
+
+    def get_media(self):
+        if self._media is not None:
+            self._media.retain() # Como no libVLC: o chamador recebe uma referência
+        return self._media
+
+    def play(self):
+        self.state = State.Playing
+        return 0
+
+    def stop(self):
+        self.state = State.Stopped
+
+    def get_state(self):
+        return self.state
+
+    def audio_set_volume(self, volume):
+        self.volume = volume
+        return 0
+
+    def audio_get_volume(self):
+        return self.volume
+
+    def audio_set_mute(self, muted):
+        self.muted = muted
+
+    def release(self):
+        self.set_media(None)
+        NATIVE_PLAYERS.discard(id(self))
+
+
+class Instance:
+    def __init__(self, *args):
+        pass
+
+    def media_new(self, mrl):
+        return Media(mrl)
+
+    def media_player_new(self):
+        return MediaPlayer()
+
+    def release(self):
+        pass
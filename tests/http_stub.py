@@ -0,0 +1,70 @@
+"""
+Servidor HTTP local para os testes de rede (um por espelho simulado).
+
+Cada requisição é registrada em 'requests' e respondida por 'handler'
+(função (path, params, headers) -> (status, headers, corpo)); 'delay' atrasa
+as respostas, 'body_delay' atrasa só o corpo (depois dos cabeçalhos) e
+'status', se definido, força esse código (ex: 503).
+"""
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def json_response(data, status=200, headers=None):
+    return status, dict(headers or {}), json.dumps(data).encode("utf-8")
+
+
+class StubServer:
+    def __init__(self, handler=None):
+        self.handler = handler or (lambda path, params, headers: json_response({}))
+        self.delay = 0.0
+        self.body_delay = 0.0
+        self.status = None
+        self.requests = [] # (path, params, headers)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urllib.parse.urlsplit(self.path)
+                path = urllib.parse.unquote(parsed.path)
+                params = dict(urllib.parse.parse_qsl(parsed.query))
+                headers = dict(self.headers)
+                stub.requests.append((path, params, headers))
+                if stub.delay:
+                    time.sleep(stub.delay)
+                if stub.status is not None:
+                    status, extra, body = stub.status, {}, b""
+                else:
+                    status, extra, body = stub.handler(path, params, headers)
+                self.send_response(status)
+                for name, value in extra.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if stub.body_delay:
+                    self.wfile.flush()
+                    time.sleep(stub.body_delay)
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def paths(self) -> list[str]:
+        return [path for path, _, _ in self.requests]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
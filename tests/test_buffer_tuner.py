@@ -0,0 +1,34 @@
+from radio_player.audio.buffer_tuner import RAISE_FACTOR, AdaptiveBufferController
+
+
+def _session(tuner, url, buffering):
+    tuner.start_session(url, 1000)
+    tuner.on_opening()
+    tuner.on_playing()
+    for percent in buffering:
+        tuner.on_buffering(percent)
+    tuner.end_session()
+
+
+def test_initial_fill_after_playing_is_not_a_stall():
+    tuner = AdaptiveBufferController()
+    _session(tuner, "http://radio.test/a", [12.0, 55.0, 100.0])
+    assert tuner.stats("http://radio.test/a").underruns == 0
+    assert tuner.caching_for("http://radio.test/a", 1000) == 1000
+
+
+def test_drop_after_full_buffer_raises_caching():
+    tuner = AdaptiveBufferController()
+    _session(tuner, "http://radio.test/a", [40.0, 100.0, 20.0, 80.0, 100.0])
+    assert tuner.stats("http://radio.test/a").underruns == 1
+    assert tuner.caching_for("http://radio.test/a", 1000) == int(1000 * RAISE_FACTOR)
+
+
+def test_learned_value_persists(tmp_path):
+    path = tmp_path / "buffer_tuning.json"
+    tuner = AdaptiveBufferController(state_path=path)
+    _session(tuner, "http://radio.test/a", [100.0, 10.0, 100.0])
+    reloaded = AdaptiveBufferController(state_path=path)
+    assert reloaded.caching_for("http://radio.test/a", 1000) == int(1000 * RAISE_FACTOR)
+    # Outro perfil para a estação: recomeça do valor do perfil
+    assert reloaded.caching_for("http://radio.test/a", 150) == 150
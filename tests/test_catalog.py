@@ -0,0 +1,94 @@
+import json
+import queue
+import threading
+
+import pytest
+
+from http_stub import json_response
+from radio_player.net import catalog as catalog_module
+from radio_player.net.catalog import StationCatalog
+from radio_player.net.radiobrowser import RadioBrowserClient
+
+
+def records(count, start=0):
+    return [{"stationuuid": f"u{i}", "name": f"Radio {i}", "url": f"http://radio.test/{i}",
+             "votes": i, "lastchangetime_iso8601": f"2026-01-01T00:00:{i % 60:02d}Z"} for i in range(start, start + count)]
+
+
+class FakeWidget:
+    def __init__(self):
+        self.calls = queue.SimpleQueue()
+
+    def after(self, delay, callback, *args):
+        self.calls.put((callback, args))
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    catalog = StationCatalog(tmp_path / "catalog.db")
+    yield catalog
+    catalog.close()
+
+
+def test_full_update_and_search(stub_server, catalog):
+    api = stub_server(lambda path, params, headers: json_response(records(50)))
+    client = RadioBrowserClient(base_url=api.url)
+    try:
+        assert catalog.update(client) == 50
+        assert [station["name"] for station in catalog.search("radio 4", limit=3)][0] == "Radio 49"
+        assert not catalog.needs_update()
+    finally:
+        client.close()
+
+
+def test_update_runs_outside_the_client_pool(stub_server, catalog):
+    release = threading.Event()
+
+    def api(path, params, headers):
+        if path == "/json/stations":
+            release.wait(5) # Dump completo "demorado"
+            return json_response(records(10))
+        return json_response([{"name": "Jazz 1", "url": "http://jazz"}])
+
+    server = stub_server(api)
+    client = RadioBrowserClient(base_url=server.url, max_workers=1)
+    widget = FakeWidget()
+    try:
+        updated = []
+        catalog.update_async(client, widget, on_success=updated.append)
+        # Com o único worker do cliente livre, a busca não espera o dump
+        client.search_by_name_async(widget, "jazz", on_success=lambda stations: None)
+        callback, args = widget.calls.get(timeout=2)
+        assert args[0][0]["name"] == "Jazz 1"
+
+        release.set()
+        callback, args = widget.calls.get(timeout=5)
+        callback(*args)
+        assert updated == [10]
+    finally:
+        release.set()
+        client.close()
+
+
+def test_close_during_update_stops_writing(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_module, "UPSERT_BATCH_SIZE", 10)
+    catalog = StationCatalog(tmp_path / "catalog.db")
+    original = catalog._upsert_batch
+    batches = []
+
+    def upsert_then_close(rows):
+        batches.append(len(rows))
+        written = original(rows)
+        if len(batches) == 2:
+            catalog.close() # Fecha entre a checagem de _upsert_all e o próximo lote
+        return written
+
+    class Client:
+        def download_to_file(self, path, dest_path, params=None):
+            with open(dest_path, "w") as f:
+                json.dump(records(100), f)
+
+    monkeypatch.setattr(catalog, "_upsert_batch", upsert_then_close)
+    assert catalog.update(Client()) == 20
+    # Depois de fechado, um lote que já passou pela checagem não chega à conexão
+    assert original([catalog_module._row_from_record(records(1)[0], 1)]) == 0
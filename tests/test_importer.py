@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+from radio_player.core import importer
+from radio_player.core.importer import iter_station_records, station_from_record
+from radio_player.core.station import Station
+from radio_player.core.stations import StationManager
+from radio_player.core.storage import JsonStationStorage
+
+# Registros com o que costuma cair na fronteira de um bloco: aspas e colchetes
+# escapados em strings, objetos aninhados, caracteres fora do ASCII
+RECORDS = [
+    {"name": 'Rádio "São" [1], {x}', "url": "http://a/ç?a=1,2", "tags": "a]b"},
+    {"name": "B", "url": "http://b", "nested": {"k": [1, {"z": "}"}]}},
+    5,
+    "texto",
+    {"name": "C 🎵", "url": "https://c"},
+]
+DICTS = [record for record in RECORDS if isinstance(record, dict)]
+
+
+@pytest.mark.parametrize("prefix", ["", "\ufeff", " " * 40 + "\n"])
+@pytest.mark.parametrize("separator", [",", " ,\n  "])
+def test_json_array_across_every_chunk_boundary(tmp_path, prefix, separator):
+    path = tmp_path / "dump.json"
+    path.write_text(prefix + "[ " + separator.join(json.dumps(r, ensure_ascii=False) for r in RECORDS) + " ]\n",
+                    encoding="utf-8")
+    for chunk_size in range(1, 80):
+        assert list(iter_station_records(path, chunk_size=chunk_size)) == DICTS, chunk_size
+
+
+def test_empty_and_unterminated_arrays(tmp_path):
+    path = tmp_path / "dump.json"
+    path.write_text(" [ \n ] ")
+    assert list(iter_station_records(path, chunk_size=2)) == []
+    path.write_text('[{"name": "A", "url": "http://a"}, {"name": "B"')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_station_records(path, chunk_size=8))
+
+
+def test_record_larger_than_limit_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(importer, "MAX_RECORD_SIZE", 64)
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps([{"name": "A" * 200, "url": "http://a"}]))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_station_records(path, chunk_size=16))
+
+
+def test_ndjson_skips_invalid_lines(tmp_path):
+    path = tmp_path / "dump.ndjson"
+    path.write_text('{"name": "A", "url": "http://a"}\n\nnot json\n[1]\n{"name": "B", "url": "http://b"}')
+    assert [record["name"] for record in iter_station_records(path)] == ["A", "B"]
+
+
+def test_object_files_are_ndjson_or_stations_json(tmp_path):
+    ndjson = tmp_path / "dump.txt"
+    ndjson.write_text('{"name": "A", "url": "http://a"}\n{"name": "B", "url": "http://b"}\n')
+    assert [record["name"] for record in iter_station_records(ndjson)] == ["A", "B"]
+
+    # A primeira linha decide, mesmo sem URL nela (ex: registro inválido no início)
+    ndjson.write_text('{"name": "A", "homepage": "http://a"}\n{"name": "B", "url": "http://b"}\n')
+    assert [record["name"] for record in iter_station_records(ndjson)] == ["A", "B"]
+
+    single = tmp_path / "single.txt"
+    single.write_text('{"name": "A", "url": "http://a"}\n')
+    assert list(iter_station_records(single)) == [{"name": "A", "url": "http://a"}]
+
+    envelope = tmp_path / "stations.json"
+    envelope.write_text(json.dumps({"schema_version": 2, "stations": {"A": "http://a"}}))
+    assert list(iter_station_records(envelope)) == [Station("A", "http://a")]
+    envelope.write_text(json.dumps({"schema_version": 2, "stations": {"A": "http://a"}}, indent=2))
+    assert list(iter_station_records(envelope)) == [Station("A", "http://a")]
+
+
+def test_radio_browser_records_are_mapped():
+    station = station_from_record({"name": " X ", "url": "http://x", "url_resolved": "https://x/live",
+                                   "countrycode": "BR", "stationuuid": "u1", "bitrate": 0, "tags": ""})
+    assert station == Station("X", "https://x/live", country="BR", uuid="u1")
+    assert station_from_record({"name": "Y", "url": "rtsp://y"}) is None
+
+
+def test_import_in_batches_dedupes_names_and_urls(tmp_path):
+    records = [{"name": f"S{i}", "url": f"http://s{i % 7}"} for i in range(20)] + [{"name": "S1", "url": "http://new"}]
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(records))
+    storage = JsonStationStorage(tmp_path / "stations.json", tmp_path / "missing.json")
+    manager = StationManager(storage)
+    progress = []
+    added, skipped = manager.import_stations(path, batch_size=3, progress_callback=lambda *counts: progress.append(counts))
+    assert (added, skipped) == (7, 14)
+    assert manager.get_station_names() == [f"S{i}" for i in range(7)]
+    assert progress[-1] == (7, 14)
+    manager.close()
+    assert [station.name for station in JsonStationStorage(tmp_path / "stations.json").load()] == manager.get_station_names()
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_import_compacts_the_journal_once(tmp_path, monkeypatch, write_behind):
+    monkeypatch.setattr(JsonStationStorage, "JOURNAL_COMPACT_THRESHOLD", 5)
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps([{"name": f"S{i}", "url": f"http://s{i}"} for i in range(40)]))
+    storage = JsonStationStorage(tmp_path / "stations.json", tmp_path / "missing.json")
+    snapshots = []
+    original = storage.save_snapshot
+    monkeypatch.setattr(storage, "save_snapshot", lambda stations: snapshots.append(len(stations)) or original(stations))
+    manager = StationManager(storage, write_behind=write_behind, save_delay=60)
+
+    assert manager.import_stations(path, batch_size=3) == (40, 0)
+    assert snapshots == [40]
+    assert not (tmp_path / "stations.journal").exists()
+    manager.close()
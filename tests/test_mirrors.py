@@ -0,0 +1,102 @@
+import pytest
+import requests
+
+from http_stub import json_response
+from radio_player.net.mirrors import MirrorSelector
+from radio_player.net.radiobrowser import RadioBrowserClient
+
+
+def stats_api(path, params, headers):
+    return json_response({"stations": 1})
+
+
+@pytest.fixture
+def mirrors(stub_server):
+    return [stub_server(stats_api) for _ in range(3)]
+
+
+def make_client(servers, **kwargs):
+    selector = MirrorSelector([server.url for server in servers])
+    selector._probed_at = float("inf") # Sem medição em segundo plano durante o teste
+    return RadioBrowserClient(mirrors=selector, **kwargs)
+
+
+def test_5xx_fails_over_to_next_mirror(mirrors):
+    first, second, _ = mirrors
+    first.status = 503
+    client = make_client(mirrors)
+    try:
+        assert client.get_json("/json/stats") == {"stations": 1}
+        assert first.paths() == ["/json/stats"] and second.paths() == ["/json/stats"]
+        # O espelho com falha vai para o fim da fila nas próximas requisições
+        assert client.mirrors.ranked()[-1] == first.url
+        client.get_json("/json/stats")
+        assert len(first.requests) == 1
+    finally:
+        client.close()
+
+
+def test_timeout_fails_over_to_next_mirror(mirrors):
+    first, second, _ = mirrors
+    first.delay = 1.0
+    client = make_client(mirrors, timeout=(1, 0.2))
+    try:
+        assert client.get_json("/json/stats") == {"stations": 1}
+        assert len(second.requests) == 1
+        assert client.base_url == second.url
+    finally:
+        client.close()
+
+
+def test_latency_excludes_body_download(mirrors):
+    first = mirrors[0]
+    first.body_delay = 0.5
+    client = make_client(mirrors)
+    try:
+        assert client.get_json("/json/stats") == {"stations": 1}
+        assert client.mirrors._latencies[first.url] < 0.25
+    finally:
+        client.close()
+
+
+def test_all_mirrors_failing_raises_last_error(mirrors):
+    for server in mirrors:
+        server.status = 503
+    client = make_client(mirrors)
+    try:
+        with pytest.raises(requests.exceptions.HTTPError, match="503"):
+            client.get_json("/json/stats")
+        assert all(len(server.requests) == 1 for server in mirrors)
+    finally:
+        client.close()
+
+
+def test_4xx_does_not_fail_over(mirrors):
+    first, second, _ = mirrors
+    first.status = 404
+    client = make_client(mirrors)
+    try:
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get_json("/json/stats")
+        assert second.requests == []
+        assert client.base_url == first.url
+    finally:
+        client.close()
+
+
+def test_probe_ranking_is_persisted(mirrors, tmp_path):
+    slow, broken, fast = mirrors
+    slow.delay = 0.2
+    broken.status = 503
+    state_path = tmp_path / "mirrors.json"
+    selector = MirrorSelector([server.url for server in mirrors], state_path=state_path)
+    assert selector.needs_probe()
+
+    with requests.Session() as session:
+        latencies = selector.probe(session)
+    assert latencies[broken.url] is None
+    assert selector.ranked() == [fast.url, slow.url, broken.url]
+
+    reloaded = MirrorSelector([slow.url], state_path=state_path)
+    assert reloaded.ranked() == [fast.url, slow.url, broken.url]
+    assert not reloaded.needs_probe()
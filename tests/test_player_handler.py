@@ -0,0 +1,96 @@
+import gc
+
+import fake_vlc
+import pytest
+
+from radio_player.audio.player_handler import EVENT_STATE, RadioPlayer
+from radio_player.constants import BUFFER_PROFILES
+
+
+def _memo_size(cls):
+    return len(cls.__dict__["event_manager"]._cache)
+
+
+@pytest.fixture
+def player():
+    player = RadioPlayer(media_cache_size=4)
+    yield player
+    player.release()
+
+
+def test_native_objects_stay_flat_across_switches(player):
+    urls = [f"http://radio.test/{i}" for i in range(40)]
+
+    def zap(count, start):
+        index = start
+        for step in range(count):
+            index = (index + (1, -1, 7)[step % 3]) % len(urls)
+            assert player.play(urls[index], (None, "low-latency")[step % 2])
+            neighbours = [urls[(index + 1) % len(urls)], urls[(index - 1) % len(urls)]]
+            player.prewarm([(url, 128, None) for url in neighbours])
+        return index
+
+    index = zap(200, 0)
+    gc.collect()
+    baseline = (len(fake_vlc.WRAPPERS), _memo_size(fake_vlc.Media), _memo_size(fake_vlc.MediaPlayer))
+
+    zap(2000, index)
+    gc.collect()
+    counts = player.native_object_counts()
+    assert counts["players"] == len(fake_vlc.NATIVE_PLAYERS) <= 1 + player.prewarm_slots
+    assert counts["media"] == len(fake_vlc.NATIVE_MEDIA)
+    assert counts["media"] <= player.media_cache_size + counts["players"]
+    assert counts["media_cached"] == player.media_cache_size
+    # Nem os objetos Python (memoizados pelo python-vlc) se acumulam
+    assert (len(fake_vlc.WRAPPERS), _memo_size(fake_vlc.Media), _memo_size(fake_vlc.MediaPlayer)) <= baseline
+
+
+def test_release_frees_everything():
+    player = RadioPlayer(media_cache_size=4)
+    for i in range(10):
+        player.play(f"http://radio.test/{i}")
+        player.prewarm([(f"http://radio.test/{i + 1}", None, None)])
+    player.release()
+    gc.collect()
+    assert player.native_object_counts()["players"] == 0
+    assert player.native_object_counts()["media"] == 0
+    assert not fake_vlc.NATIVE_MEDIA and not fake_vlc.NATIVE_PLAYERS
+    assert _memo_size(fake_vlc.Media) == 0 and _memo_size(fake_vlc.MediaPlayer) == 0
+
+
+def test_events_of_previous_media_keep_their_generation(player):
+    player.play("http://radio.test/a")
+    first = player.play_generation
+    player._player.event_manager().fire(fake_vlc.EventType.MediaPlayerEncounteredError)
+    player.play("http://radio.test/b")
+    player._player.event_manager().fire(fake_vlc.EventType.MediaPlayerPlaying)
+    events = player.drain_events()
+    assert events == [
+        (first, EVENT_STATE, fake_vlc.State.Error),
+        (player.play_generation, EVENT_STATE, fake_vlc.State.Playing),
+    ]
+    assert player.play_generation != first
+
+
+def _caching_option(player):
+    return [option for option in player._player_media[id(player._player)].options if option.startswith(":network")]
+
+
+def test_warm_player_is_promoted_only_with_the_same_buffer_options(player):
+    player.play("http://radio.test/a")
+    player.prewarm([("http://radio.test/b", None, None), ("http://radio.test/c", None, None)])
+
+    warm_b = player._warm["http://radio.test/b"][0]
+    assert player.play("http://radio.test/b")
+    assert player._player is warm_b
+
+    # Perfil diferente do usado no pré-aquecimento: abre do zero com o cache pedido
+    warm_c = player._warm["http://radio.test/c"][0]
+    assert player.play("http://radio.test/c", "low-latency")
+    assert player._player is not warm_c
+    assert "http://radio.test/c" not in player._warm
+    assert _caching_option(player) == [f":network-caching={BUFFER_PROFILES['low-latency']}"]
+
+    # O prewarm() também reabre um slot aberto com outro perfil
+    player.prewarm([("http://radio.test/b", None, "low-latency")])
+    assert player._warm["http://radio.test/b"][0] is not warm_b
@@ -0,0 +1,154 @@
+import queue
+
+import pytest
+import requests
+
+from http_stub import json_response
+from radio_player.net.http_cache import HttpResponseCache
+from radio_player.net.radiobrowser import RadioBrowserClient, SearchResultCache
+
+PAGE = 100
+# Como na API: busca por substring, ordenada por nome
+NAMES = sorted([f"{i:03d} Rock" for i in range(230)] + [f"{i:03d} Rock Br" for i in range(0, 230, 5)] + ["Jazz 1"])
+
+
+def search_api(path, params, headers):
+    term = path.rsplit("/", 1)[-1].casefold()
+    matches = [{"name": name, "url": f"http://radio.test/{i}"}
+               for i, name in enumerate(NAMES) if term in name.casefold()]
+    offset = int(params.get("offset", 0))
+    limit = int(params.get("limit", len(matches)))
+    return json_response(matches[offset:offset + limit])
+
+
+def expected(term):
+    return [name for name in NAMES if term.casefold() in name.casefold()]
+
+
+@pytest.fixture
+def api(stub_server):
+    return stub_server(search_api)
+
+
+@pytest.fixture
+def client(api):
+    client = RadioBrowserClient(base_url=api.url)
+    yield client
+    client.close()
+
+
+def fetch_all(client, term):
+    stations = []
+    while True:
+        page = client.search_by_name(term, limit=PAGE, offset=len(stations))
+        stations.extend(page)
+        if len(page) < PAGE:
+            return [station["name"] for station in stations]
+
+
+def test_broad_term_pages_are_cached(api, client):
+    assert [s["name"] for s in client.search_by_name("rock", limit=PAGE)] == expected("rock")[:PAGE]
+    assert client.search_cache.get("rock") is not None
+    api.requests.clear()
+
+    # A primeira página não vai de novo à rede; as seguintes continuam de onde o cache parou
+    assert fetch_all(client, "rock") == expected("rock")
+    assert [params["offset"] for _, params, _ in api.requests] == ["100", "200"]
+    assert client.search_cache.get("rock")[1] # Última página curta: resultado completo
+
+    api.requests.clear()
+    assert fetch_all(client, "ROCK") == expected("rock")
+    assert api.requests == []
+
+
+def test_partial_broad_result_is_not_narrowed(api, client):
+    client.search_by_name("rock", limit=PAGE)
+    api.requests.clear()
+
+    # As posições de "rock br" na API não são as do trecho filtrado de "rock"
+    assert client.get_cached_search("rock br") is None
+    assert fetch_all(client, "rock br") == expected("rock br")
+    assert api.requests[0][1]["offset"] == "0"
+
+
+def test_narrowing_ignores_accents():
+    cache = SearchResultCache()
+    cache.put("uni", [{"name": "Rádio União"}, {"name": "Unico FM"}])
+    assert cache.get("radio uniao") == ([{"name": "Rádio União"}], True)
+
+
+def test_complete_broad_result_answers_narrower_term_offline(api, client):
+    fetch_all(client, "rock")
+    api.requests.clear()
+    assert fetch_all(client, "rock br") == expected("rock br")
+    assert client.get_cached_search("rock br")[1]
+    assert api.requests == []
+
+
+def versioned_api(path, params, headers):
+    if headers.get("If-None-Match") == '"v1"':
+        return 304, {"ETag": '"v1"'}, b""
+    return json_response([{"name": "Jazz 1"}], headers={"ETag": '"v1"'})
+
+
+@pytest.fixture
+def http_cache(tmp_path):
+    return HttpResponseCache(tmp_path / "http_cache", ttl=0)
+
+
+def test_stale_cache_entry_is_revalidated_with_etag(stub_server, http_cache):
+    server = stub_server(versioned_api)
+    client = RadioBrowserClient(base_url=server.url, http_cache=http_cache)
+    try:
+        assert client.get_json("/json/stations/byname/jazz") == [{"name": "Jazz 1"}]
+        assert client.get_json("/json/stations/byname/jazz") == [{"name": "Jazz 1"}]
+        assert [headers.get("If-None-Match") for _, _, headers in server.requests] == [None, '"v1"']
+
+        # Revalidada, a entrada volta a valer pelo prazo do cache sem ir à rede
+        http_cache.ttl = 60
+        client.get_json("/json/stations/byname/jazz")
+        client.get_json("/json/stations/byname/jazz")
+        assert len(server.requests) == 3
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize("failure", ["503", "timeout"])
+def test_stale_cache_entry_is_used_when_server_fails(stub_server, http_cache, failure):
+    server = stub_server(versioned_api)
+    client = RadioBrowserClient(base_url=server.url, http_cache=http_cache, timeout=(1, 0.2))
+    try:
+        client.get_json("/json/stations/byname/jazz")
+        if failure == "503":
+            server.status = 503
+        else:
+            server.delay = 1.0
+        assert client.get_json("/json/stations/byname/jazz") == [{"name": "Jazz 1"}]
+        with pytest.raises(requests.exceptions.RequestException):
+            client.get_json("/json/stations/byname/rock") # Sem entrada em cache: o erro chega ao chamador
+    finally:
+        client.close()
+
+
+class FakeWidget:
+    def __init__(self):
+        self.calls = queue.SimpleQueue()
+
+    def after(self, delay, callback, *args):
+        self.calls.put((callback, args))
+
+
+def test_async_results_are_delivered_through_after(api, client):
+    widget = FakeWidget()
+    results = []
+    client.search_by_name_async(widget, "jazz", on_success=results.append)
+    callback, args = widget.calls.get(timeout=5)
+    callback(*args)
+    assert [station["name"] for station in results[0]] == ["Jazz 1"]
+
+    api.status = 503
+    errors = []
+    client.search_by_name_async(widget, "pop", on_success=results.append, on_error=errors.append)
+    callback, args = widget.calls.get(timeout=5)
+    callback(*args)
+    assert isinstance(errors[0], requests.exceptions.HTTPError)
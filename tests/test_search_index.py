@@ -0,0 +1,79 @@
+import pytest
+
+from radio_player.core import search_index
+from radio_player.core.search_index import StationSearchIndex, trigrams
+from radio_player.core.stations import StationManager
+from radio_player.core.storage import JsonStationStorage
+
+
+@pytest.fixture
+def manager(tmp_path):
+    storage = JsonStationStorage(tmp_path / "stations.json", tmp_path / "missing.json")
+    manager = StationManager(storage)
+    for name in ["Radio lufad", "Rádio FM Brasil", "Radio Rock", "Jazz FM", "Rock Jazz Web", "Música Boa"]:
+        manager.add_station(name, f"http://radio.test/{len(name)}")
+    yield manager
+    manager.close()
+
+
+def _count_builds(index, monkeypatch):
+    builds = []
+    original = index._build
+
+    def counting_build():
+        builds.append(1)
+        original()
+    monkeypatch.setattr(index, "_build", counting_build)
+    return builds
+
+
+def test_last_query_word_may_be_partial(manager):
+    index = StationSearchIndex(manager)
+    assert " f " not in trigrams("radio f", partial_last=True)
+    assert index.search("radio f")[0] == "Rádio FM Brasil"
+    # Nomes que começam pela busca vêm antes dos que só contêm trechos parecidos
+    assert index.search("rad")[:2] == ["Radio Rock", "Radio lufad"]
+    assert index.search("rock jaz")[0] == "Rock Jazz Web"
+    assert index.search("musica")[0] == "Música Boa"
+
+
+def test_typos_in_common_words_still_match(manager, monkeypatch):
+    # Todos os trigramas de "rok" e "radoi" são comuns demais: o limite de candidatos vale para eles
+    monkeypatch.setattr(search_index, "MAX_CANDIDATES", 1)
+    index = StationSearchIndex(manager)
+    assert index.search("rok") in (["Radio Rock"], ["Rock Jazz Web"])
+    assert len(index.search("radoi")) == 1
+
+
+def test_changes_are_applied_without_rebuilding(manager, monkeypatch):
+    index = StationSearchIndex(manager)
+    index.search("radio")
+    builds = _count_builds(index, monkeypatch)
+
+    manager.add_station("Radio Nova", "http://radio.test/nova")
+    manager.update_station("Radio Rock", "Rock Brasil", "http://radio.test/rock")
+    manager.remove_station("Jazz FM")
+
+    assert index.search("radio nov")[0] == "Radio Nova"
+    assert "Radio Rock" not in index.search("radio rock")
+    assert index.search("rock bra")[0] == "Rock Brasil"
+    assert "Jazz FM" not in index.search("jazz")
+    assert builds == []
+
+
+def test_missed_changes_trigger_a_full_rebuild(manager, monkeypatch):
+    index = StationSearchIndex(manager)
+    index.search("radio")
+    builds = _count_builds(index, monkeypatch)
+
+    manager._rebuild_index() # Geração muda sem notificação
+    assert index.search("jazz fm")[0] == "Jazz FM"
+    assert builds == [1]
+
+
+def test_background_build_keeps_changes_made_meanwhile(manager):
+    index = StationSearchIndex(manager)
+    index.build_async()
+    manager.add_station("Radio Nova", "http://radio.test/nova")
+    assert index.search("nova")[0] == "Radio Nova"
+    assert index._generation == manager.generation
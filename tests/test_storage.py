@@ -0,0 +1,111 @@
+import json
+
+import pytest
+
+from radio_player.core.station import Station
+from radio_player.core.stations import StationManager
+from radio_player.core.storage import JsonStationStorage
+
+
+@pytest.fixture
+def paths(tmp_path):
+    snapshot = tmp_path / "stations.json"
+    snapshot.write_text(json.dumps([{"name": "A", "url": "http://a"}, {"name": "B", "url": "http://b"}]))
+    return snapshot, tmp_path / "stations.journal"
+
+
+def open_storage(paths, **kwargs):
+    snapshot, journal = paths
+    return JsonStationStorage(snapshot, snapshot.with_name("missing.json"), journal, **kwargs)
+
+
+def describe(stations):
+    return [(station.name, station.url, station.buffer_profile) for station in stations]
+
+
+def test_mutations_are_journaled_and_replayed(paths):
+    snapshot, journal = paths
+    before = snapshot.read_bytes()
+    manager = StationManager(open_storage(paths))
+    manager.add_station("C", "http://c")
+    manager.update_station("A", "A2", "http://a2")
+    manager.remove_station("B")
+    manager.set_buffer_profile("C", "low-latency")
+
+    assert snapshot.read_bytes() == before # Nada reescrito: só o journal cresce
+    assert [json.loads(line)["op"] for line in journal.read_text().splitlines()] == \
+        ["add", "update", "remove", "set_buffer_profile"]
+
+    expected = [("A2", "http://a2", None), ("C", "http://c", "low-latency")]
+    assert describe(open_storage(paths).load()) == expected
+    assert describe(manager.stations) == expected
+
+
+def test_truncated_last_journal_line_is_ignored(paths):
+    _, journal = paths
+    journal.write_text(json.dumps({"op": "add", "name": "C", "url": "http://c"}) + "\n" + '{"op": "add", "na')
+    assert [station.name for station in open_storage(paths).load()] == ["A", "B", "C"]
+
+
+def test_journal_is_compacted_at_threshold(paths, monkeypatch):
+    snapshot, journal = paths
+    monkeypatch.setattr(JsonStationStorage, "JOURNAL_COMPACT_THRESHOLD", 5)
+    manager = StationManager(open_storage(paths))
+    for i in range(4):
+        manager.add_station(f"S{i}", f"http://s{i}")
+    assert len(journal.read_text().splitlines()) == 4
+
+    manager.add_station("S4", "http://s4")
+    assert not journal.exists()
+    names = [station.name for station in JsonStationStorage.parse_stations_data(json.loads(snapshot.read_text()))]
+    assert names == ["A", "B", "S0", "S1", "S2", "S3", "S4"]
+
+
+def test_replay_is_idempotent_after_interrupted_compaction(paths):
+    snapshot, journal = paths
+    manager = StationManager(open_storage(paths))
+    manager.add_station("C", "http://c")
+    manager.update_station("A", "A2", "http://a2")
+    manager.remove_station("B")
+    # Queda entre gravar o snapshot e apagar o journal: as operações já estão no snapshot
+    leftover = journal.read_text()
+    manager.close()
+    journal.write_text(leftover)
+
+    assert describe(open_storage(paths).load()) == [("A2", "http://a2", None), ("C", "http://c", None)]
+
+
+def test_close_compacts_pending_journal(paths):
+    snapshot, journal = paths
+    manager = StationManager(open_storage(paths), write_behind=True, save_delay=60)
+    manager.add_station("C", "http://c")
+    manager.close()
+    assert not journal.exists()
+    stations = JsonStationStorage.parse_stations_data(json.loads(snapshot.read_text()))
+    assert stations == [Station("A", "http://a"), Station("B", "http://b"), Station("C", "http://c")]
+
+
+def test_snapshot_defaults_to_the_legacy_list(paths):
+    snapshot, _ = paths
+    manager = StationManager(open_storage(paths, use_journal=False))
+    manager.add_station("C", "http://c", tags="rock")
+    manager.close()
+    data = json.loads(snapshot.read_text())
+    # A validação das versões antigas: lista de dicts com "name" e "url"
+    assert isinstance(data, list) and all(isinstance(item, dict) and "name" in item and "url" in item for item in data)
+    assert data[-1] == {"name": "C", "url": "http://c", "tags": "rock"}
+
+
+def test_compact_format_is_opt_in_and_both_formats_load(paths):
+    snapshot, _ = paths
+    compact = open_storage(paths, use_journal=False, compact_format=True)
+    stations = compact.load() + [Station("C", "http://c", tags="rock")]
+    assert compact.save_snapshot(stations)
+    assert json.loads(snapshot.read_text())["schema_version"] == JsonStationStorage.SCHEMA_VERSION
+
+    # Um stations.json compacto continua legível e volta à lista na próxima gravação
+    legacy = open_storage(paths, use_journal=False)
+    assert legacy.load() == stations
+    assert legacy.save_snapshot(stations)
+    assert isinstance(json.loads(snapshot.read_text()), list)
+    assert legacy.load() == stations